@@ -0,0 +1,208 @@
+"""
+Analytics engine - Vectorized dashboard metrics over poll and message columns
+database.get_analytics_data fetches each table's columns once; everything here
+works on whole NumPy arrays instead of looping over topics: per-topic counts are
+one bincount over (topic, level) codes, scores and flags are array expressions
+and rankings are argmax/argmin. Polls are the non-zero cells of the sparse
+student x topic matrix, so per-student aggregates (students who marked 'none'
+on many topics) cost one more bincount, not a query or loop per student.
+Final values go through Python round(), so the numbers match the per-topic loop
+this replaced.
+"""
+
+from itertools import chain
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+# Level codes, as selected by database.get_analytics_data
+COMPLETE, PARTIAL, NONE = 0, 1, 2
+LEVEL_COUNT = 3
+
+# A topic needs attention when its clarity score (share of 'complete') is below
+# ATTENTION_CLARITY, or when more than ATTENTION_NONE_PERCENT of its votes are 'none'
+ATTENTION_CLARITY = 50
+ATTENTION_NONE_PERCENT = 30
+
+# Students who marked 'none' on at least STRUGGLING_MIN_TOPICS topics, and on more
+# than ATTENTION_NONE_PERCENT of the topics they voted on, need help; the most
+# affected STRUGGLING_LIMIT are listed
+STRUGGLING_MIN_TOPICS = 3
+STRUGGLING_LIMIT = 20
+
+TOPIC_FIELDS = ("thread_id", "topic", "title", "announcement_title", "announcement_id")
+
+
+def int_columns(rows: Sequence[tuple], width: int) -> np.ndarray:
+    """(width, len(rows)) int64 array from fetchall() rows of integers, without a Python object per value"""
+    values = np.fromiter(chain.from_iterable(rows), dtype=np.int64, count=len(rows) * width)
+    return values.reshape(len(rows), width).T
+
+
+def positions(keys: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Index of each value in keys (unique), or -1 where the value is not a key"""
+    if len(keys) == 0:
+        return np.full(len(values), -1, dtype=np.int64)
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    found = np.minimum(np.searchsorted(sorted_keys, values), len(keys) - 1)
+    return np.where(sorted_keys[found] == values, order[found], -1)
+
+
+def percent(part: np.ndarray, whole, where: np.ndarray) -> np.ndarray:
+    """part / whole * 100 where `where` holds, else 0 (same operation order as the scalar formula)"""
+    share = np.divide(part, whole, out=np.zeros(len(part)), where=where)
+    return share * 100
+
+
+def rounded(values: np.ndarray) -> List[float]:
+    """Python round(value, 1) of every value (np.round can differ in the last digit)"""
+    return [round(value, 1) for value in values.tolist()]
+
+
+def first_extreme(values: np.ndarray, candidates: np.ndarray, largest: bool):
+    """Index of the first candidate with the largest/smallest value, like max()/min() over a list"""
+    if len(candidates) == 0:
+        return None
+    pick = np.argmax if largest else np.argmin
+    return int(candidates[pick(values[candidates])])
+
+
+def compute_analytics(topic_rows: Sequence[tuple], message_counts: np.ndarray, polls: np.ndarray,
+                      students: Sequence[tuple], total_announcements: int) -> Dict:
+    """
+    Dashboard analytics from columns fetched once
+
+    Args:
+        topic_rows: (thread_id, topic, title, announcement_title, announcement_id) per topic, in display order
+        message_counts: (thread_id, message_count) columns, as from int_columns
+        polls: (thread_id, student_id, level code) columns for every poll
+        students: (id, name) of every student
+        total_announcements: Number of announcements
+
+    Returns:
+        The /api/analytics payload
+    """
+    topic_count = len(topic_rows)
+    thread_ids = np.fromiter((row[0] for row in topic_rows), dtype=np.int64, count=topic_count)
+    total_students = len(students)
+
+    # Per-topic counts: one bincount over (topic, level) cells
+    message_count = np.zeros(topic_count, dtype=np.int64)
+    message_topic = positions(thread_ids, message_counts[0])
+    known = message_topic >= 0
+    message_count[message_topic[known]] = message_counts[1][known]
+
+    poll_topic = positions(thread_ids, polls[0])
+    on_topic = poll_topic >= 0
+    topic_level = poll_topic[on_topic] * LEVEL_COUNT + polls[2][on_topic]
+    level_counts = np.bincount(topic_level, minlength=topic_count * LEVEL_COUNT).reshape(topic_count, LEVEL_COUNT)
+    votes = level_counts.sum(axis=1)
+    voted = votes > 0
+
+    clarity = percent(level_counts[:, COMPLETE], votes, voted)
+    participation = percent(votes, total_students, np.full(topic_count, total_students > 0))
+    none_share = percent(level_counts[:, NONE], votes, voted)
+    needs_attention = voted & ((clarity < ATTENTION_CLARITY) | (none_share > ATTENTION_NONE_PERCENT))
+
+    clarity_scores = rounded(clarity)
+    participation_rates = rounded(participation)
+    columns = zip(
+        message_count.tolist(), level_counts[:, COMPLETE].tolist(), level_counts[:, PARTIAL].tolist(),
+        level_counts[:, NONE].tolist(), votes.tolist(), clarity_scores, participation_rates,
+        needs_attention.tolist()
+    )
+    topics_data = [
+        {
+            **dict(zip(TOPIC_FIELDS, row)),
+            "message_count": messages,
+            "complete_count": complete,
+            "partial_count": partial,
+            "none_count": none,
+            "total_votes": topic_votes,
+            "clarity_score": clarity_score,
+            "participation_rate": participation_rate,
+            "needs_attention": attention
+        }
+        for row, (messages, complete, partial, none, topic_votes, clarity_score, participation_rate, attention)
+        in zip(topic_rows, columns)
+    ]
+
+    # Rankings compare the rounded scores, as the dashboard shows them
+    scores = np.array(clarity_scores)
+    with_votes = np.flatnonzero(voted)
+    every_topic = np.arange(topic_count)
+    most_understood = first_extreme(scores, with_votes, largest=True)
+    least_understood = first_extreme(scores, with_votes, largest=False)
+    most_active = first_extreme(message_count, every_topic, largest=True)
+    least_active = first_extreme(message_count, every_topic, largest=False) if topic_count > 1 else None
+
+    totals = level_counts.sum(axis=0)
+    total_votes = int(votes.sum())
+    overall_understanding_rate = totals[COMPLETE] / total_votes * 100 if total_votes > 0 else 0
+    avg_participation = sum(participation_rates) / topic_count if topic_count else 0
+    attention_topics = [topics_data[i] for i in np.flatnonzero(needs_attention).tolist()]
+    students_needing_help = struggling_students(students, polls[1][on_topic], polls[2][on_topic])
+
+    return {
+        'summary': {
+            'total_students': total_students,
+            'students_participated': int(np.unique(polls[1]).size),
+            'total_announcements': total_announcements,
+            'total_threads': topic_count,
+            'total_votes': total_votes,
+            'overall_understanding_rate': round(float(overall_understanding_rate), 1),
+            'topics_needing_attention_count': len(attention_topics),
+            'avg_participation_rate': round(avg_participation, 1),
+            'students_needing_help_count': students_needing_help["count"]
+        },
+        'topics': topics_data,
+        'topics_needing_attention': attention_topics,
+        'most_understood': None if most_understood is None else topics_data[most_understood],
+        'least_understood': None if least_understood is None else topics_data[least_understood],
+        'most_active_thread': None if most_active is None else topics_data[most_active],
+        'least_active_thread': None if least_active is None else topics_data[least_active],
+        'overall_distribution': {
+            'complete': int(totals[COMPLETE]),
+            'partial': int(totals[PARTIAL]),
+            'none': int(totals[NONE])
+        },
+        'students_needing_help': students_needing_help["students"]
+    }
+
+
+def struggling_students(students: Sequence[tuple], poll_student: np.ndarray, poll_level: np.ndarray) -> Dict:
+    """
+    Students who marked 'none' on many topics, from the rows of the student x topic poll matrix
+
+    Returns:
+        {"count", "students": the STRUGGLING_LIMIT most affected, as
+        {student_id, name, none_count, votes, none_rate}, most 'none' votes first}
+    """
+    student_ids = np.fromiter((row[0] for row in students), dtype=np.int64, count=len(students))
+    row = positions(student_ids, poll_student)
+    is_student = row >= 0
+    votes = np.bincount(row[is_student], minlength=len(students))
+    none = np.bincount(row[is_student & (poll_level == NONE)], minlength=len(students))
+    none_rate = percent(none, votes, votes > 0)
+
+    struggling = np.flatnonzero((none >= STRUGGLING_MIN_TOPICS) & (none_rate > ATTENTION_NONE_PERCENT))
+    # Most 'none' votes first, then highest share, then student id
+    order = np.lexsort((student_ids[struggling], -none_rate[struggling], -none[struggling]))
+    top = struggling[order[:STRUGGLING_LIMIT]]
+    return {
+        "count": len(struggling),
+        "students": [
+            {
+                "student_id": student_id,
+                "name": students[i][1],
+                "none_count": none_count,
+                "votes": student_votes,
+                "none_rate": rate
+            }
+            for i, student_id, none_count, student_votes, rate in zip(
+                top.tolist(), student_ids[top].tolist(), none[top].tolist(), votes[top].tolist(),
+                rounded(none_rate[top])
+            )
+        ]
+    }
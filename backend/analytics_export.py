@@ -0,0 +1,324 @@
+"""
+Analytics export - Columnar bulk export of poll, message and dimension tables
+Copies the live database to a snapshot with SQLite's online backup API, then
+writes each table from the snapshot in fetchmany batches: CSV, or Parquet when
+pyarrow is installed. Incremental runs export only rows past each table's
+watermark from the previous run (kept in OUT_DIR/manifest.json) as new part
+files, so offline analysis loads files instead of scraping /api/analytics and
+never queries the live database. A full run (--full) replaces a table's earlier
+part files instead of adding to them.
+
+Usage (from backend/):
+    python analytics_export.py OUT_DIR [--format csv|parquet] [--full] [--tables topic_polls messages]
+"""
+
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional
+
+import database as db
+import tracing
+
+try:
+    import pyarrow
+    import pyarrow.parquet as parquet
+except ImportError:  # CSV only
+    pyarrow = None
+
+# Rows read per fetchmany call and written per CSV writerows / Parquet row group
+EXPORT_BATCH_ROWS = int(os.environ.get("EXPORT_BATCH_ROWS", "50000"))
+
+# Timestamp watermarks stop this many seconds before the snapshot, so a write
+# that took its timestamp just before the snapshot but committed after it is
+# picked up by the next run instead of being skipped. Writers take the timestamp
+# after BEGIN IMMEDIATE (see database.create_or_update_poll), so this only has to
+# cover a transaction's own run time, not a wait of up to database.BUSY_TIMEOUT
+# for the write lock
+WATERMARK_LAG_SECONDS = 5
+
+MANIFEST_NAME = "manifest.json"
+
+# Per table: source table, exported columns as (name, SQL expression, type) and
+# the watermark column. 'id' watermarks suit append-only tables; topic_polls
+# rows change when a student re-votes, so they follow updated_at_epoch and a
+# re-vote appears again in a later part (keep the latest row per id).
+# Message text and user names/contacts are left out.
+EXPORT_TABLES = {
+    "topic_polls": {
+        "table": "topic_polls",
+        "columns": [
+            ("id", "id", "int64"),
+            ("thread_id", "thread_id", "int64"),
+            ("student_id", "student_id", "int64"),
+            ("understanding_level", "understanding_level", "string"),
+            ("created_at_epoch", "created_at_epoch", "int64"),
+            ("updated_at_epoch", "updated_at_epoch", "int64"),
+        ],
+        "watermark": "updated_at_epoch"
+    },
+    "messages": {
+        "table": "messages",
+        "columns": [
+            ("id", "id", "int64"),
+            ("thread_id", "thread_id", "int64"),
+            ("user_id", "user_id", "int64"),
+            ("sender_type", "sender_type", "string"),
+            ("content_chars", "length(content)", "int64"),
+            ("created_at_epoch", "created_at_epoch", "int64"),
+        ],
+        "watermark": "id"
+    },
+    "threads": {
+        "table": "threads",
+        "columns": [
+            ("id", "id", "int64"),
+            ("announcement_id", "announcement_id", "int64"),
+            ("title", "title", "string"),
+            ("topic", "topic", "string"),
+            ("created_at", "created_at", "string"),
+        ],
+        "watermark": "id"
+    },
+    "announcements": {
+        "table": "announcements",
+        "columns": [
+            ("id", "id", "int64"),
+            ("teacher_id", "teacher_id", "int64"),
+            ("title", "title", "string"),
+            ("pdf_filename", "pdf_filename", "string"),
+            ("has_topics", "has_topics", "int64"),
+            ("created_at", "created_at", "string"),
+        ],
+        "watermark": "id"
+    },
+    "users": {
+        "table": "users",
+        "columns": [
+            ("id", "id", "int64"),
+            ("role", "role", "string"),
+            ("created_at", "created_at", "string"),
+        ],
+        "watermark": "id"
+    },
+}
+
+FORMATS = ("csv", "parquet")
+
+
+def snapshot_database(snapshot_path: str):
+    """Copy the live database to snapshot_path with SQLite's online backup API"""
+    if os.path.exists(snapshot_path):
+        os.remove(snapshot_path)
+    source = db.get_connection()
+    target = sqlite3.connect(snapshot_path)
+    try:
+        # One step: in WAL mode that is a single read transaction, so writers carry on
+        # (a copy in several steps restarts whenever another connection writes)
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+
+def load_manifest(out_dir: str) -> Dict:
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {"watermarks": {}, "runs": []}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(out_dir: str, manifest: Dict):
+    """Write the manifest atomically, so a crashed run leaves the previous watermarks"""
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+
+def _select(spec: Dict, since, cutoff: int) -> tuple:
+    """SQL and parameters for the rows of a table past its watermark"""
+    columns = ", ".join(f"{expression} AS {name}" for name, expression, _ in spec["columns"])
+    watermark = spec["watermark"]
+    sql = f"SELECT {columns} FROM {spec['table']}"
+    if watermark == "id":
+        return f"{sql} WHERE id > ? ORDER BY id", (since or 0,)
+    # Rows without a timestamp (never backfilled) count as time 0: exported by the first and full runs
+    return (f"{sql} WHERE ({watermark} >= ? AND {watermark} < ?) OR ({watermark} IS NULL AND ? = 0) "
+            f"ORDER BY {watermark}, id", (since or 0, cutoff, since or 0))
+
+
+class CsvPartWriter:
+    """One CSV part file; each batch goes out in a single writerows call"""
+
+    extension = "csv"
+
+    def __init__(self, path: str, spec: Dict):
+        self.file = open(path, "w", newline="")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow([name for name, _, _ in spec["columns"]])
+
+    def write_batch(self, rows: List[tuple]):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetPartWriter:
+    """One Parquet part file; each batch is transposed to typed columns and written as a row group"""
+
+    extension = "parquet"
+
+    def __init__(self, path: str, spec: Dict):
+        self.schema = pyarrow.schema([(name, getattr(pyarrow, kind)()) for name, _, kind in spec["columns"]])
+        self.writer = parquet.ParquetWriter(path, self.schema)
+
+    def write_batch(self, rows: List[tuple]):
+        columns = list(zip(*rows))
+        arrays = [pyarrow.array(column, type=field.type) for column, field in zip(columns, self.schema)]
+        self.writer.write_table(pyarrow.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+PART_WRITERS = {"csv": CsvPartWriter, "parquet": ParquetPartWriter}
+
+
+def export_table(conn: sqlite3.Connection, name: str, out_dir: str, run_id: str, fmt: str,
+                 since, cutoff: int) -> Dict:
+    """
+    Write the rows of one table past `since` to OUT_DIR/<name>/<name>-<run_id>.<ext>
+
+    Returns:
+        {"rows", "file" (None when nothing was new), "watermark"} where watermark is
+        the value to resume from next time
+    """
+    spec = EXPORT_TABLES[name]
+    sql, params = _select(spec, since, cutoff)
+    watermark_index = [column for column, _, _ in spec["columns"]].index("id") if spec["watermark"] == "id" else None
+
+    cursor = conn.cursor()
+    cursor.execute(sql, params)
+    writer = None
+    path = None
+    count = 0
+    watermark = since
+    try:
+        while True:
+            rows = cursor.fetchmany(EXPORT_BATCH_ROWS)
+            if not rows:
+                break
+            if writer is None:
+                os.makedirs(os.path.join(out_dir, name), exist_ok=True)
+                writer_class = PART_WRITERS[fmt]
+                path = os.path.join(out_dir, name, f"{name}-{run_id}.{writer_class.extension}")
+                writer = writer_class(path, spec)
+            writer.write_batch(rows)
+            count += len(rows)
+            if watermark_index is not None:
+                watermark = rows[-1][watermark_index]
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if spec["watermark"] != "id":
+        # Everything before the cutoff has been exported, whether or not it changed
+        watermark = cutoff
+    return {"rows": count, "file": os.path.relpath(path, out_dir) if path else None, "watermark": watermark}
+
+
+def remove_old_parts(out_dir: str, name: str, keep: Optional[str]):
+    """Delete the part files of a table except `keep` (relative to out_dir), after a full run replaced them"""
+    table_dir = os.path.join(out_dir, name)
+    if not os.path.isdir(table_dir):
+        return
+    for filename in os.listdir(table_dir):
+        path = os.path.join(name, filename)
+        is_part = filename.startswith(f"{name}-") and filename.endswith(tuple(f".{fmt}" for fmt in FORMATS))
+        if is_part and path != keep:
+            os.remove(os.path.join(out_dir, path))
+
+
+def export_analytics(out_dir: str, fmt: str = "csv", full: bool = False, tables: Optional[List[str]] = None,
+                     keep_snapshot: bool = False) -> Dict:
+    """
+    Snapshot the database and export tables past their watermarks
+
+    Args:
+        out_dir: Export directory (part files per table and manifest.json)
+        fmt: 'csv' or 'parquet' (needs pyarrow)
+        full: Ignore watermarks and export every row; the run's parts replace the
+              tables' earlier part files, which are deleted once the manifest is saved
+        tables: Subset of EXPORT_TABLES (default: all)
+        keep_snapshot: Leave the snapshot database in OUT_DIR/snapshot.db for ad-hoc SQL
+
+    Returns:
+        The run's manifest entry: {"run_id", "snapshot_epoch", "full", "format", "tables": {...}}
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Invalid format '{fmt}'. Use one of: {', '.join(FORMATS)}")
+    if fmt == "parquet" and pyarrow is None:
+        raise ValueError("Parquet export needs pyarrow (pip install pyarrow); use --format csv")
+    tables = tables or list(EXPORT_TABLES)
+    unknown = [name for name in tables if name not in EXPORT_TABLES]
+    if unknown:
+        raise ValueError(f"Unknown tables: {', '.join(unknown)}. Use: {', '.join(EXPORT_TABLES)}")
+
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = load_manifest(out_dir)
+    snapshot_path = os.path.join(out_dir, "snapshot.db")
+
+    started = time.perf_counter()
+    snapshot_epoch = db.get_epoch_time()
+    snapshot_database(snapshot_path)
+    # Run number first: part files sort in export order and never collide
+    run_id = f"{len(manifest['runs']) + 1:05d}-{time.strftime('%Y%m%dT%H%M%S', time.gmtime(snapshot_epoch))}"
+    cutoff = snapshot_epoch - WATERMARK_LAG_SECONDS
+
+    run = {"run_id": run_id, "snapshot_epoch": snapshot_epoch, "full": full, "format": fmt, "tables": {}}
+    conn = sqlite3.connect(snapshot_path)
+    try:
+        for name in tables:
+            since = None if full else manifest["watermarks"].get(name)
+            table_start = time.perf_counter()
+            result = export_table(conn, name, out_dir, run_id, fmt, since, cutoff)
+            run["tables"][name] = {"rows": result["rows"], "file": result["file"], "since": since,
+                                   "watermark": result["watermark"]}
+            manifest["watermarks"][name] = result["watermark"]
+            tracing.log_event("analytics_export.table", table=name, rows=result["rows"], format=fmt,
+                              incremental=since is not None,
+                              duration_ms=round((time.perf_counter() - table_start) * 1000, 1))
+    finally:
+        conn.close()
+        if not keep_snapshot:
+            os.remove(snapshot_path)
+
+    manifest["runs"].append(run)
+    save_manifest(out_dir, manifest)
+    if full:
+        # Only now: a crash before the manifest is saved leaves the earlier parts and watermarks intact
+        for name, table in run["tables"].items():
+            remove_old_parts(out_dir, name, table["file"])
+    tracing.log_event("analytics_export.done", run_id=run_id, tables=len(tables),
+                      rows=sum(table["rows"] for table in run["tables"].values()),
+                      duration_ms=round((time.perf_counter() - started) * 1000, 1))
+    return run
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export analytics tables as CSV/Parquet part files")
+    parser.add_argument("out_dir")
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--full", action="store_true", help="ignore watermarks and export every row")
+    parser.add_argument("--tables", nargs="+", choices=list(EXPORT_TABLES))
+    parser.add_argument("--keep-snapshot", action="store_true", help="keep OUT_DIR/snapshot.db for ad-hoc SQL")
+    args = parser.parse_args()
+    result = export_analytics(args.out_dir, args.format, args.full, args.tables, args.keep_snapshot)
+    for name, table in result["tables"].items():
+        print(f"{name:14} {table['rows']:9d} rows  {table['file'] or '-'}")
@@ -0,0 +1,131 @@
+"""
+Artifacts - Course material derived once at ingestion instead of on every question
+For each announcement PDF we store the cleaned text, its chunk boundaries and,
+per chunk, a token count and keyword set. Answer prompts then pick material by
+chunk (most relevant first when it does not all fit) without re-tokenizing the
+whole document. Bump ARTIFACT_VERSION whenever cleaning, chunking, token
+counting or keyword extraction changes: stale artifacts are rebuilt on next use.
+"""
+
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+
+import pdf_processor
+import text_processing
+import tokenizer
+
+ARTIFACT_VERSION = 2
+
+# Characters per chunk (ending at a sentence where possible) and keywords kept per chunk
+CHUNK_LENGTH = 2000
+KEYWORDS_PER_CHUNK = 12
+
+# Placed between non-adjacent chunks, and after the selection when material was left out
+CHUNK_SEPARATOR = "\n\n[...]\n\n"
+TRUNCATION_MARKER = "\n\n[Course material truncated]"
+
+_WORD = re.compile(r"[a-z][a-z0-9\-]{3,}")
+
+STOPWORDS = frozenset("""
+    about above after again against also among because been before being below between both cannot could
+    does doing down during each every from further have having here into itself just more most much must
+    only other over same should some such than that their them then there these they this those through
+    under until very were what when where which while will with within would your yours
+""".split())
+
+
+def extract_keywords(text: str, limit: int = KEYWORDS_PER_CHUNK) -> List[str]:
+    """Most frequent content words (4+ letters, stopwords removed)"""
+    counts = Counter(word for word in _WORD.findall(text.lower()) if word not in STOPWORDS)
+    return [word for word, _ in counts.most_common(limit)]
+
+
+def build_artifacts(pdf_text: str, model: str) -> Dict:
+    """
+    Derive prompt-ready material from extracted PDF text
+
+    Args:
+        pdf_text: Text from pdf_processor.extract_text_from_pdf
+        model: Model whose tokenizer the token counts are for
+
+    Returns:
+        Dict with version, model_family, cleaned_text, total_tokens and chunks
+        (each chunk: start, end, tokens, keywords)
+    """
+    cleaned_text = pdf_processor.clean_text(pdf_text)
+    chunks = []
+    for start, end in text_processing.iter_chunk_spans(cleaned_text, CHUNK_LENGTH, boundary="sentence"):
+        chunk = cleaned_text[start:end]
+        chunks.append({
+            "start": start,
+            "end": end,
+            "tokens": tokenizer.count_tokens(chunk, model),
+            "keywords": extract_keywords(chunk)
+        })
+
+    return {
+        "version": ARTIFACT_VERSION,
+        "model_family": tokenizer.get_model_profile(model).family,
+        "cleaned_text": cleaned_text,
+        "total_tokens": sum(chunk["tokens"] for chunk in chunks),
+        "chunks": chunks
+    }
+
+
+def is_current(artifacts: Optional[Dict], model: str) -> bool:
+    """True if stored artifacts were built by this pipeline version for this model family"""
+    return (
+        artifacts is not None
+        and artifacts["version"] == ARTIFACT_VERSION
+        and artifacts["model_family"] == tokenizer.get_model_profile(model).family
+    )
+
+
+def select_material(artifacts: Dict, max_tokens: int, query: str, model: str) -> str:
+    """
+    Course material for a prompt within max_tokens
+
+    Everything is used when it fits. Otherwise chunks sharing the most keywords
+    with the query (thread topic and question) are taken first, earlier chunks
+    breaking ties, and the selection is joined back in document order.
+    """
+    text = artifacts["cleaned_text"]
+    chunks = artifacts["chunks"]
+    if artifacts["total_tokens"] <= max_tokens:
+        return text
+    if not chunks or max_tokens <= 0:
+        return ""
+
+    query_keywords = set(extract_keywords(query, limit=50))
+    ranked = sorted(
+        range(len(chunks)),
+        key=lambda index: (-len(query_keywords.intersection(chunks[index]["keywords"])), index)
+    )
+
+    separator_tokens = tokenizer.count_tokens(CHUNK_SEPARATOR, model)
+    selected = []
+    used = tokenizer.count_tokens(TRUNCATION_MARKER, model)
+    for index in ranked:
+        cost = chunks[index]["tokens"] + separator_tokens
+        if used + cost <= max_tokens:
+            selected.append(index)
+            used += cost
+
+    if not selected:
+        # Budget smaller than any chunk: cut the most relevant one
+        best = chunks[ranked[0]]
+        best_text = tokenizer.TokenizedText(text[best["start"]:best["end"]], model).truncate(max_tokens - used)
+        return best_text + TRUNCATION_MARKER
+
+    parts = []
+    previous = None
+    for index in sorted(selected):
+        if previous is not None and index != previous + 1:
+            parts.append(CHUNK_SEPARATOR)
+        elif previous is not None:
+            parts.append(" ")
+        parts.append(text[chunks[index]["start"]:chunks[index]["end"]])
+        previous = index
+    parts.append(TRUNCATION_MARKER)
+    return "".join(parts)
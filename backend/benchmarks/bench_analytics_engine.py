@@ -0,0 +1,256 @@
+"""
+Benchmark - Vectorized analytics (analytics_engine) vs. the per-topic loop
+
+Bulk-fills a database with topics, messages and polls, then for growing topic
+counts times the /api/analytics computation two ways:
+    loop     one joined GROUP BY query, then a Python loop and max/min/sum passes per topic
+    engine   columns fetched once (database.get_analytics_data), metrics in NumPy
+The engine's time is split into fetching columns and computing. Outputs are
+checked to be identical (the engine only adds the per-student fields).
+
+Usage (from backend/):
+    python benchmarks/bench_analytics_engine.py [--topics 50 200 800] [--students 500] [--messages-per-topic 50]
+"""
+
+import argparse
+import random
+import time
+
+from common import use_temp_database, db
+
+import analytics_engine
+
+LEVELS = ["complete", "partial", "none"]
+ENGINE_ONLY_KEYS = ("students_needing_help", "students_needing_help_count")
+
+
+def add_topics(count: int, students: list, messages_per_topic: int, vote_rate: float, rng: random.Random):
+    """Bulk insert an announcement per 5 topics, with messages and polls (same created_at per announcement)"""
+    epoch = db.get_epoch_time()
+    conn = db.get_connection()
+    cursor = conn.cursor()
+    for first in range(0, count, 5):
+        cursor.execute("INSERT INTO announcements (teacher_id, title, content, has_topics) VALUES (1, ?, 'Slides', 1)",
+                       (f"Lecture {rng.randint(1, 10 ** 6)}",))
+        announcement_id = cursor.lastrowid
+        created_at = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(epoch - rng.randint(0, 10 ** 6)))
+        for _ in range(min(5, count - first)):
+            cursor.execute("INSERT INTO threads (announcement_id, title, topic, created_at) VALUES (?, ?, ?, ?)",
+                           (announcement_id, "Discussion", f"Topic {rng.randint(1, 10 ** 6)}", created_at))
+            thread_id = cursor.lastrowid
+            cursor.executemany(
+                "INSERT INTO messages (thread_id, user_id, sender_type, content, created_at_epoch) VALUES (?, ?, 'student', 'Question', ?)",
+                [(thread_id, rng.choice(students), epoch) for _ in range(rng.randint(0, messages_per_topic * 2))]
+            )
+            # Some students struggle everywhere, so the per-student list is not empty
+            cursor.executemany(
+                "INSERT INTO topic_polls (thread_id, student_id, understanding_level, created_at_epoch, updated_at_epoch) VALUES (?, ?, ?, ?, ?)",
+                [(thread_id, student_id, "none" if student_id % 17 == 0 else rng.choices(LEVELS, [0.5, 0.3, 0.2])[0], epoch, epoch)
+                 for student_id in students if rng.random() < vote_rate]
+            )
+    conn.commit()
+    conn.close()
+
+
+def legacy_analytics() -> dict:
+    """database.get_analytics_data before analytics_engine"""
+    conn = db.get_connection()
+    cursor = conn.cursor()
+
+    # Get total counts
+    cursor.execute("SELECT COUNT(DISTINCT id) FROM users WHERE role = 'student'")
+    total_students = cursor.fetchone()[0]
+
+    cursor.execute("SELECT COUNT(*) FROM announcements")
+    total_announcements = cursor.fetchone()[0]
+
+    cursor.execute("SELECT COUNT(*) FROM threads WHERE announcement_id IS NOT NULL")
+    total_threads = cursor.fetchone()[0]
+
+    cursor.execute("SELECT COUNT(DISTINCT student_id) FROM topic_polls")
+    students_participated = cursor.fetchone()[0]
+
+    # Get per-topic breakdown with all metrics
+    cursor.execute("""
+        SELECT 
+            t.id as thread_id,
+            t.topic,
+            t.title,
+            a.title as announcement_title,
+            a.id as announcement_id,
+            COUNT(DISTINCT m.id) as message_count,
+            COUNT(DISTINCT CASE WHEN tp.understanding_level = 'complete' THEN tp.student_id END) as complete_count,
+            COUNT(DISTINCT CASE WHEN tp.understanding_level = 'partial' THEN tp.student_id END) as partial_count,
+            COUNT(DISTINCT CASE WHEN tp.understanding_level = 'none' THEN tp.student_id END) as none_count,
+            COUNT(DISTINCT tp.student_id) as total_votes
+        FROM threads t
+        LEFT JOIN announcements a ON t.announcement_id = a.id
+        LEFT JOIN messages m ON t.id = m.thread_id
+        LEFT JOIN topic_polls tp ON t.id = tp.thread_id
+        WHERE t.announcement_id IS NOT NULL
+        GROUP BY t.id, t.topic, t.title, a.title, a.id
+        ORDER BY t.created_at DESC
+    """)
+    rows = cursor.fetchall()
+
+    topics_data = []
+    total_complete = 0
+    total_partial = 0
+    total_none = 0
+    total_votes = 0
+
+    for row in rows:
+        topic = dict(row)
+        votes = topic['total_votes']
+
+        # Calculate clarity score
+        if votes > 0:
+            clarity_score = (topic['complete_count'] / votes) * 100
+        else:
+            clarity_score = 0
+
+        # Calculate participation rate
+        if total_students > 0:
+            participation_rate = (votes / total_students) * 100
+        else:
+            participation_rate = 0
+
+        topic['clarity_score'] = round(clarity_score, 1)
+        topic['participation_rate'] = round(participation_rate, 1)
+
+        # Determine if needs attention (clarity < 50% OR none_votes > 30% of total)
+        needs_attention = False
+        if votes > 0:
+            none_percentage = (topic['none_count'] / votes) * 100
+            if clarity_score < 50 or none_percentage > 30:
+                needs_attention = True
+
+        topic['needs_attention'] = needs_attention
+        topics_data.append(topic)
+
+        # Accumulate totals
+        total_complete += topic['complete_count']
+        total_partial += topic['partial_count']
+        total_none += topic['none_count']
+        total_votes += votes
+
+    # Calculate overall understanding rate
+    if total_votes > 0:
+        overall_understanding_rate = (total_complete / total_votes) * 100
+    else:
+        overall_understanding_rate = 0
+
+    # Find most and least understood topics
+    topics_with_votes = [t for t in topics_data if t['total_votes'] > 0]
+
+    most_understood = None
+    least_understood = None
+    if topics_with_votes:
+        most_understood = max(topics_with_votes, key=lambda x: x['clarity_score'])
+        least_understood = min(topics_with_votes, key=lambda x: x['clarity_score'])
+
+    # Find most and least active threads
+    most_active = None
+    least_active = None
+    if topics_data:
+        most_active = max(topics_data, key=lambda x: x['message_count'])
+        if len(topics_data) > 1:
+            least_active = min(topics_data, key=lambda x: x['message_count'])
+
+    # Topics needing attention
+    topics_needing_attention = [t for t in topics_data if t['needs_attention']]
+
+    # Calculate average participation rate
+    if topics_data:
+        avg_participation = sum(t['participation_rate'] for t in topics_data) / len(topics_data)
+    else:
+        avg_participation = 0
+
+    conn.close()
+
+    return {
+        'summary': {
+            'total_students': total_students,
+            'students_participated': students_participated,
+            'total_announcements': total_announcements,
+            'total_threads': total_threads,
+            'total_votes': total_votes,
+            'overall_understanding_rate': round(overall_understanding_rate, 1),
+            'topics_needing_attention_count': len(topics_needing_attention),
+            'avg_participation_rate': round(avg_participation, 1)
+        },
+        'topics': topics_data,
+        'topics_needing_attention': topics_needing_attention,
+        'most_understood': most_understood,
+        'least_understood': least_understood,
+        'most_active_thread': most_active,
+        'least_active_thread': least_active,
+        'overall_distribution': {
+            'complete': total_complete,
+            'partial': total_partial,
+            'none': total_none
+        }
+    }
+
+
+def best_ms(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def compute_only_ms(repeat: int) -> float:
+    """analytics_engine.compute_analytics alone, on columns captured from one get_analytics_data call"""
+    captured = {}
+    compute = analytics_engine.compute_analytics
+
+    def capture(*args):
+        captured["args"] = args
+        return compute(*args)
+
+    analytics_engine.compute_analytics = capture
+    try:
+        db.get_analytics_data()
+    finally:
+        analytics_engine.compute_analytics = compute
+    return best_ms(lambda: compute(*captured["args"]), repeat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topics", type=int, nargs="+", default=[50, 200, 800])
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--messages-per-topic", type=int, default=50)
+    parser.add_argument("--vote-rate", type=float, default=0.8)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    use_temp_database("forum-analytics-engine-")
+    students = [db.create_user(f"student{i}", "student") for i in range(args.students)]
+    rng = random.Random(42)
+    total = 0
+
+    print(f"{args.students} students, ~{args.messages_per_topic} messages per topic")
+    print(f"{'topics':>7} {'polls':>8} {'loop ms':>9} {'engine ms':>10} {'compute ms':>11} {'speedup':>8} {'struggling':>11}")
+    for size in sorted(args.topics):
+        add_topics(size - total, students, args.messages_per_topic, args.vote_rate, rng)
+        total = size
+        new = db.get_analytics_data()
+        old = legacy_analytics()
+        shared = {key: value for key, value in new.items() if key not in ENGINE_ONLY_KEYS}
+        shared["summary"] = {key: value for key, value in new["summary"].items() if key not in ENGINE_ONLY_KEYS}
+        assert shared == old, "engine output differs from the per-topic loop"
+
+        loop_ms = best_ms(legacy_analytics, args.repeat)
+        engine_ms = best_ms(db.get_analytics_data, args.repeat)
+        compute_ms = compute_only_ms(args.repeat)
+        polls = sum(topic["total_votes"] for topic in new["topics"])
+        print(f"{size:7} {polls:8} {loop_ms:9.1f} {engine_ms:10.1f} {compute_ms:11.1f} {loop_ms / engine_ms:7.1f}x "
+              f"{new['summary']['students_needing_help_count']:11}")
+
+
+if __name__ == "__main__":
+    main()
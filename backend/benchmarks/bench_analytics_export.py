@@ -0,0 +1,92 @@
+"""
+Benchmark - Columnar analytics export: full vs. incremental runs
+
+Fills a database with datagen.py, then times analytics_export runs:
+    full          every row of every table (first run)
+    incremental   after a small batch of new messages and re-votes
+    incremental   with nothing new (only the snapshot is paid)
+and compares the rows/s of batched writes (one writerows per fetchmany batch)
+with writing the same CSV row by row.
+
+Usage (from backend/):
+    python benchmarks/bench_analytics_export.py [--students 200] [--messages-per-thread 100] [--format csv]
+"""
+
+import argparse
+import csv
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from common import use_temp_database, db
+
+import analytics_export
+import datagen
+
+
+def timed_run(out_dir: str, fmt: str) -> tuple:
+    start = time.perf_counter()
+    run = analytics_export.export_analytics(out_dir, fmt)
+    return time.perf_counter() - start, sum(table["rows"] for table in run["tables"].values())
+
+
+def row_by_row_csv(snapshot_path: str, out_path: str) -> float:
+    """The messages table written one writerow per row, for comparison"""
+    spec = analytics_export.EXPORT_TABLES["messages"]
+    sql, params = analytics_export._select(spec, None, 0)
+    conn = sqlite3.connect(snapshot_path)
+    start = time.perf_counter()
+    with open(out_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        for row in conn.execute(sql, params):
+            writer.writerow(row)
+    conn.close()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    datagen.add_scale_arguments(parser)
+    parser.add_argument("--format", choices=analytics_export.FORMATS, default="csv")
+    parser.add_argument("--new-messages", type=int, default=200)
+    args = parser.parse_args()
+
+    workdir = use_temp_database("forum-analytics-export-")
+    ids = datagen.generate(**datagen.scale_from_args(args))
+    out_dir = os.path.join(workdir, "export")
+    analytics_export.WATERMARK_LAG_SECONDS = 0
+
+    print(f"{'run':14} {'rows':>9} {'seconds':>8} {'rows/s':>10}")
+    seconds, rows = timed_run(out_dir, args.format)
+    print(f"{'full':14} {rows:9} {seconds:8.2f} {rows / seconds:10.0f}")
+
+    # New activity one second later, so it falls after the topic_polls watermark
+    time.sleep(1.1)
+    rng = random.Random(7)
+    for _ in range(args.new_messages):
+        db.create_message(rng.choice(ids["thread_ids"]), "student", "Follow-up question", rng.choice(ids["student_ids"]))
+        db.create_or_update_poll(rng.choice(ids["thread_ids"]), rng.choice(ids["student_ids"]), "partial")
+    time.sleep(1.1)
+    seconds, rows = timed_run(out_dir, args.format)
+    print(f"{'incremental':14} {rows:9} {seconds:8.2f} {rows / seconds:10.0f}")
+    seconds, rows = timed_run(out_dir, args.format)
+    print(f"{'nothing new':14} {rows:9} {seconds:8.2f} {'-':>10}")
+
+    # Batched vs row-by-row writes of the messages table
+    snapshot_path = os.path.join(tempfile.mkdtemp(), "snapshot.db")
+    analytics_export.snapshot_database(snapshot_path)
+    conn = sqlite3.connect(snapshot_path)
+    message_rows = conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+    start = time.perf_counter()
+    analytics_export.export_table(conn, "messages", tempfile.mkdtemp(), "bench", "csv", None, 0)
+    batched = time.perf_counter() - start
+    conn.close()
+    single = row_by_row_csv(snapshot_path, os.path.join(tempfile.mkdtemp(), "messages.csv"))
+    print(f"\nmessages CSV, {message_rows} rows: batched {message_rows / batched:.0f} rows/s, "
+          f"row by row {message_rows / single:.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
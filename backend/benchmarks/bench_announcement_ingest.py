@@ -0,0 +1,114 @@
+"""
+Benchmark - Announcement ingest: per-row commits vs one transaction
+
+Times creating an announcement with its topic threads and course artifacts:
+    per-row       create_announcement, create_thread per topic, save_announcement_artifacts,
+                  then get_announcement_with_text / get_threads_by_announcement (the old endpoint flow)
+    transaction   create_announcement_with_threads (one commit, rows built from the inserts)
+
+Then checks crash consistency: a child process is killed (os._exit) part way
+through each flow, and the database is checked for announcements left without
+their threads or artifacts. Exits non-zero if the transactional flow leaves any.
+
+Usage (from backend/):
+    python benchmarks/bench_announcement_ingest.py [--announcements 200] [--topics 6]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+import common
+import database as db
+
+ARTIFACTS = {"version": 1, "model_family": "bench", "cleaned_text": "lorem ipsum " * 500,
+             "total_tokens": 1500, "chunks": [{"text": "lorem ipsum", "tokens": 2}] * 10}
+
+
+def per_row(teacher_id: int, topics: list, crash_after_threads: int = -1):
+    announcement_id = db.create_announcement(teacher_id, "Lecture", "Slides", pdf_text="lorem ipsum", has_topics=True)
+    for i, topic in enumerate(topics):
+        if i == crash_after_threads:
+            os._exit(1)
+        db.create_thread(f"Discussion: {topic}", topic, announcement_id)
+    db.save_announcement_artifacts(announcement_id, ARTIFACTS)
+    return db.get_announcement_with_text(announcement_id), db.get_threads_by_announcement(announcement_id)
+
+
+def transaction(teacher_id: int, topics: list, crash_after_threads: int = -1):
+    if crash_after_threads >= 0:
+        # Same writes as create_announcement_with_threads, dying before the commit
+        with db.transaction() as uow:
+            announcement = uow.add_announcement(teacher_id, "Lecture", "Slides", pdf_text="lorem ipsum", has_topics=True)
+            uow.add_threads(announcement["id"], [(f"Discussion: {topic}", topic) for topic in topics[:crash_after_threads]])
+            os._exit(1)
+    created = db.create_announcement_with_threads(teacher_id, "Lecture", "Slides", topics, pdf_text="lorem ipsum",
+                                                  artifacts=ARTIFACTS, teacher_name="bench-teacher")
+    return created["announcement"], created["threads"]
+
+
+FLOWS = {"per-row": per_row, "transaction": transaction}
+
+
+def incomplete_announcements() -> int:
+    """Announcements with topics but missing threads or artifacts"""
+    conn = db.get_connection()
+    count = conn.execute("""
+        SELECT COUNT(*) FROM announcements a
+        WHERE a.has_topics = 1
+          AND (NOT EXISTS (SELECT 1 FROM threads t WHERE t.announcement_id = a.id)
+               OR NOT EXISTS (SELECT 1 FROM announcement_artifacts x WHERE x.announcement_id = a.id))
+    """).fetchone()[0]
+    conn.close()
+    return count
+
+
+def crash_check(name: str, teacher_id: int, topics: list, trials: int) -> int:
+    """Kill a child mid-flow `trials` times; return announcements left incomplete"""
+    before = incomplete_announcements()
+    context = multiprocessing.get_context("fork")
+    for trial in range(trials):
+        child = context.Process(target=FLOWS[name], args=(teacher_id, topics, trial % len(topics)))
+        child.start()
+        child.join()
+    return incomplete_announcements() - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--announcements", type=int, default=200)
+    parser.add_argument("--topics", type=int, default=6)
+    parser.add_argument("--crashes", type=int, default=20)
+    args = parser.parse_args()
+
+    common.use_temp_database("forum-ingest-")
+    teacher_id = db.create_user("bench-teacher", "teacher")
+    topics = [f"Topic {i}" for i in range(args.topics)]
+
+    print(f"{args.announcements} announcements x {args.topics} threads")
+    print(f"{'flow':12} {'ms/announcement':>16} {'commits':>8} {'incomplete after crashes':>25}")
+    failed = False
+    for name, flow in FLOWS.items():
+        start = time.perf_counter()
+        for _ in range(args.announcements):
+            flow(teacher_id, topics)
+        elapsed = time.perf_counter() - start
+        commits = 1 if name == "transaction" else args.topics + 2
+        incomplete = crash_check(name, teacher_id, topics, args.crashes)
+        print(f"{name:12} {elapsed / args.announcements * 1000:16.2f} {commits:8} "
+              f"{incomplete:>14} of {args.crashes}")
+        failed |= name == "transaction" and incomplete > 0
+
+    # Returned rows must match what a fresh read sees
+    announcement, threads = transaction(teacher_id, topics)
+    db.announcement_cache.clear()
+    assert announcement == db.get_announcement_with_text(announcement["id"]), "announcement row differs from database"
+    assert threads == db.get_threads_by_announcement(announcement["id"]), "thread rows differ from database"
+    print("\nreturned rows match a re-read")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Benchmark - bytes and server CPU saved by conditional GETs on repeated polls
+
+Usage (from backend/):
+    python benchmarks/bench_conditional_get.py [--requests 200] [--messages 500]
+"""
+
+import argparse
+import time
+
+from common import use_temp_database, seed_thread
+
+
+def measure(client, url: str, requests: int, conditional: bool):
+    """Poll url repeatedly; return (wire bytes, CPU seconds)"""
+    etag = None
+    total_bytes = 0
+    cpu_start = time.process_time()
+    for _ in range(requests):
+        headers = {"If-None-Match": etag} if conditional and etag else {}
+        response = client.get(url, headers=headers)
+        total_bytes += len(response.content)
+        etag = response.headers.get("etag", etag)
+    return total_bytes, time.process_time() - cpu_start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--messages", type=int, default=500)
+    args = parser.parse_args()
+
+    use_temp_database()
+    thread_id = seed_thread(args.messages)
+
+    from fastapi.testclient import TestClient
+    import main
+
+    endpoints = [
+        "/api/announcements",
+        f"/api/threads/{thread_id}/messages",
+        f"/api/topics/{thread_id}/poll?student_id=2",
+        "/api/analytics",
+    ]
+
+    print(f"{'endpoint':45} {'full KB':>10} {'cond KB':>10} {'full CPU s':>11} {'cond CPU s':>11}")
+    with TestClient(main.app) as client:
+        for url in endpoints:
+            full_bytes, full_cpu = measure(client, url, args.requests, conditional=False)
+            cond_bytes, cond_cpu = measure(client, url, args.requests, conditional=True)
+            print(f"{url:45} {full_bytes / 1024:10.1f} {cond_bytes / 1024:10.1f} {full_cpu:11.3f} {cond_cpu:11.3f}")
+
+
+if __name__ == "__main__":
+    main()
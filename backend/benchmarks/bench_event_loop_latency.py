@@ -0,0 +1,96 @@
+"""
+Benchmark - tail latency of fast requests while a slow query is running
+
+Makes get_analytics_data deliberately slow (a long recursive CTE), starts
+several /api/analytics requests, and measures latency of many concurrent
+fast poll reads. Exits non-zero if the fast p99 exceeds the bound, which is
+what happens when database calls block the event loop.
+
+Usage (from backend/):
+    python benchmarks/bench_event_loop_latency.py [--slow-seconds 2] [--fast 300] [--bound-ms 500]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+from common import use_temp_database, seed_thread, db
+
+
+def make_slow(func, rows: int):
+    """Wrap func so it first runs a CPU-heavy query inside SQLite"""
+    def slow(*args, **kwargs):
+        conn = db.get_connection()
+        conn.execute(
+            "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < ?) SELECT SUM(x) FROM c",
+            (rows,)
+        ).fetchone()
+        conn.close()
+        return func(*args, **kwargs)
+    slow.__name__ = func.__name__
+    return slow
+
+
+def calibrate_rows(seconds: float) -> int:
+    """Find a CTE row count that takes roughly the requested time"""
+    rows = 100000
+    conn = db.get_connection()
+    start = time.perf_counter()
+    conn.execute("WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < ?) SELECT SUM(x) FROM c", (rows,)).fetchone()
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return int(rows * seconds / max(elapsed, 1e-6))
+
+
+async def run(args) -> int:
+    import httpx
+    import main
+
+    use_temp_database()
+    thread_id = seed_thread(50)
+    db.get_analytics_data = make_slow(db.get_analytics_data, calibrate_rows(args.slow_seconds))
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        async def timed(path):
+            start = time.perf_counter()
+            response = await client.get(path)
+            response.raise_for_status()
+            return time.perf_counter() - start
+
+        slow_tasks = [asyncio.create_task(timed("/api/analytics")) for _ in range(args.slow)]
+        await asyncio.sleep(0.05)  # Let the slow queries start first
+
+        fast_latencies = []
+        for _ in range(args.fast // args.concurrency):
+            batch = await asyncio.gather(*(timed(f"/api/topics/{thread_id}/poll") for _ in range(args.concurrency)))
+            fast_latencies.extend(batch)
+        slow_latencies = await asyncio.gather(*slow_tasks)
+
+    fast_latencies.sort()
+    p50 = fast_latencies[len(fast_latencies) // 2] * 1000
+    p99 = fast_latencies[int(len(fast_latencies) * 0.99) - 1] * 1000
+    print(f"slow requests: {len(slow_latencies)}, max {max(slow_latencies) * 1000:.0f} ms")
+    print(f"fast requests: {len(fast_latencies)}, p50 {p50:.1f} ms, p99 {p99:.1f} ms (bound {args.bound_ms} ms)")
+
+    if p99 > args.bound_ms:
+        print("FAIL: fast requests were blocked by the slow query")
+        return 1
+    print("OK")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--slow-seconds", type=float, default=2.0)
+    parser.add_argument("--slow", type=int, default=2, help="concurrent slow requests")
+    parser.add_argument("--fast", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--bound-ms", type=float, default=500)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark - Streaming thread export vs. building the whole response
+
+For growing thread sizes, encodes a full thread history two ways:
+    buffered   get_messages_by_thread + one dumps of the payload (the messages endpoint)
+    streamed   iter_thread_messages (fetchmany) + iter_json_document, as /api/export/threads/{id}
+and reports time and peak Python memory. Streamed peak memory should stay flat
+as the thread grows; buffered grows with it.
+
+Usage (from backend/):
+    python benchmarks/bench_export_streaming.py [--sizes 5000 20000 80000]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from common import use_temp_database, seed_thread, db
+
+import serialization
+
+
+def add_messages(thread_id: int, count: int):
+    """Bulk insert messages straight into the table (rollups are irrelevant here)"""
+    epoch = db.get_epoch_time()
+    conn = db.get_connection()
+    conn.executemany(
+        "INSERT INTO messages (thread_id, user_id, sender_type, content, created_at_epoch) VALUES (?, ?, 'student', ?, ?)",
+        [(thread_id, 2 + i % 30, f"Question {i} about routing tables, convergence and count-to-infinity", epoch)
+         for i in range(count)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def buffered(thread_id: int) -> int:
+    payload = {"thread_id": thread_id, "messages": db.get_messages_by_thread(thread_id)}
+    return len(serialization.dumps(payload))
+
+
+def streamed(thread_id: int) -> int:
+    head = {"thread_id": thread_id}
+    return sum(len(chunk) for chunk in serialization.iter_json_document(head, "messages", db.iter_thread_messages(thread_id)))
+
+
+def measure(func, thread_id: int):
+    """(seconds, peak bytes, output bytes)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = func(thread_id)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5000, 20000, 80000])
+    args = parser.parse_args()
+
+    use_temp_database("forum-export-")
+    thread_id = seed_thread(0)
+    total = 0
+
+    print(f"{'messages':>9} {'output MB':>10} {'buffered s':>11} {'peak MB':>8} {'streamed s':>11} {'peak MB':>8}")
+    for size in sorted(args.sizes):
+        add_messages(thread_id, size - total)
+        total = size
+        buffered_s, buffered_peak, buffered_bytes = measure(buffered, thread_id)
+        streamed_s, streamed_peak, streamed_bytes = measure(streamed, thread_id)
+        print(f"{size:9} {streamed_bytes / 1e6:10.1f} {buffered_s:11.2f} {buffered_peak / 1e6:8.1f} "
+              f"{streamed_s:11.2f} {streamed_peak / 1e6:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
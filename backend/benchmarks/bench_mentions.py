@@ -0,0 +1,125 @@
+"""
+Benchmark - @AI mention detection and topic parsing on large message batches
+
+Compares the previous should_ai_respond + str.replace loop (and the
+uncompiled-pattern parse_topics) with mentions.parse_message and the current
+llm_service.parse_topics. Messages are a realistic mix: most have no '@' at
+all, some mention @AI / @ai-ta / @summary, a few contain emails.
+
+Usage (from backend/):
+    python benchmarks/bench_mentions.py [--messages 200000] [--mention-rate 0.15] [--repeat 3]
+"""
+
+import argparse
+import random
+import re
+import time
+
+import common  # noqa: F401  (puts backend/ on sys.path)
+import llm_service
+import mentions
+
+LEGACY_AI_TRIGGERS = ['@ai', '@ ai', '@AI', '@ AI', '@ai-assistant', '@ai-ta']
+
+WORDS = "how does the congestion window grow during slow start and why is the router dropping packets".split()
+MENTIONS = ["@AI", "@ai", "@ AI", "@ai-ta", "@AI-assistant", "@summary", "@quiz"]
+
+
+def legacy_parse(message: str):
+    """should_ai_respond plus the trigger replace loop in ask_question, before mentions.py"""
+    message_lower = message.lower()
+    should_respond = any(trigger in message_lower for trigger in LEGACY_AI_TRIGGERS)
+    clean_question = message
+    if should_respond:
+        for trigger in ['@AI', '@ai', '@ AI', '@ ai']:
+            clean_question = clean_question.replace(trigger, '').strip()
+    return should_respond, clean_question
+
+
+def legacy_parse_topics(response: str) -> list:
+    """llm_service.parse_topics before the pattern was precompiled"""
+    topics = []
+    lines = response.split("\n")
+    for line in lines:
+        line = line.strip()
+        match = re.match(r'^[\d\-\*\•]+[\.\)]\s*(.+)$', line)
+        if match:
+            topic = match.group(1).strip()
+            if topic and len(topic) > 3:
+                topics.append(topic)
+    if not topics:
+        topics = [line.strip() for line in lines if line.strip() and len(line.strip()) > 3]
+    return topics
+
+
+def make_messages(count: int, mention_rate: float, seed: int = 11) -> list:
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(count):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(5, 40))]
+        roll = rng.random()
+        if roll < mention_rate:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(MENTIONS))
+        elif roll < mention_rate + 0.02:
+            words.append("mail me at student@iitgn.ac.in")
+        messages.append(" ".join(words) + "?")
+    return messages
+
+
+def make_topic_responses(count: int, seed: int = 5) -> list:
+    rng = random.Random(seed)
+    responses = []
+    for _ in range(count):
+        lines = ["Here are the key topics:", ""]
+        for i in range(rng.randint(2, 8)):
+            lines.append(f"  {i + 1}. {' '.join(rng.choice(WORDS).title() for _ in range(rng.randint(2, 6)))}")
+        responses.append("\n".join(lines))
+    return responses
+
+
+def best_of(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200000)
+    parser.add_argument("--mention-rate", type=float, default=0.15)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    messages = make_messages(args.messages, args.mention_rate)
+    responses = make_topic_responses(max(1, args.messages // 20))
+
+    legacy_hits = sum(legacy_parse(message)[0] for message in messages)
+    new_hits = sum(mentions.parse_message(message).mentions_ai for message in messages)
+    legacy_topics = [legacy_parse_topics(response) for response in responses]
+    same_topics = legacy_topics == [llm_service.parse_topics(response) for response in responses]
+
+    cases = [
+        (f"mentions ({len(messages)} messages)",
+         lambda: [legacy_parse(message) for message in messages],
+         lambda: [mentions.parse_message(message) for message in messages]),
+        (f"parse_topics ({len(responses)} responses)",
+         lambda: [legacy_parse_topics(response) for response in responses],
+         lambda: [llm_service.parse_topics(response) for response in responses]),
+    ]
+
+    print(f"{'case':36} {'legacy ms':>10} {'new ms':>8} {'speedup':>8}")
+    for name, legacy, new in cases:
+        legacy_ms = best_of(legacy, args.repeat)
+        new_ms = best_of(new, args.repeat)
+        print(f"{name:36} {legacy_ms:10.1f} {new_ms:8.1f} {legacy_ms / new_ms:7.1f}x")
+
+    print(f"\n@AI detected: legacy {legacy_hits}, new {new_hits} "
+          f"(new ignores @summary/@quiz-only messages and never matches inside emails)")
+    print(f"parse_topics results identical: {'yes' if same_topics else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark - PDF extractor backends: pages/sec and extraction quality
+
+Runs every installed pdf_extractors backend over a corpus and reports speed
+(with and without heading detection) and quality per page:
+    word recall   share of expected words found (multiset)
+    order         difflib similarity of the word sequences (reading order)
+    heading P/R   precision / recall of detected headings (slide titles)
+
+By default the corpus is generated with pdf_fixtures.py, whose ground truth is
+exact. With --corpus DIR, PDFs that have a PDF.json ground truth file use it;
+the rest are scored against the pdfplumber output.
+
+Usage (from backend/):
+    python benchmarks/bench_pdf_extractors.py [--documents 6] [--pages 20] [--repeat 3]
+    python benchmarks/bench_pdf_extractors.py --corpus path/to/pdfs
+"""
+
+import argparse
+import difflib
+import re
+import tempfile
+import time
+from collections import Counter
+
+import common  # noqa: F401  (puts backend/ on sys.path)
+import pdf_extractors
+import pdf_fixtures
+
+_WORD = re.compile(r"\w+")
+
+
+def words(text: str) -> list:
+    return _WORD.findall(text.lower())
+
+
+def normalize_heading(text: str) -> str:
+    return " ".join(words(text))
+
+
+def score_page(expected_text: str, expected_headings: list, page: pdf_extractors.PageText, with_headings: bool) -> dict:
+    expected_words = words(expected_text)
+    found_words = words(page.text)
+    overlap = sum((Counter(expected_words) & Counter(found_words)).values())
+    scores = {
+        "recall": overlap / len(expected_words) if expected_words else 1.0,
+        "order": difflib.SequenceMatcher(None, expected_words, found_words, autojunk=False).ratio()
+    }
+    if with_headings:
+        expected = {normalize_heading(text) for text in expected_headings}
+        found = {normalize_heading(heading["text"]) for heading in page.headings}
+        scores["heading_precision"] = len(expected & found) / len(found) if found else float(not expected)
+        scores["heading_recall"] = len(expected & found) / len(expected) if expected else 1.0
+    return scores
+
+
+def run_backend(name: str, corpus: list, with_headings: bool, repeat: int):
+    """Best total time over repeat runs and the pages of the last run (per document)"""
+    extractor = pdf_extractors.EXTRACTORS[name]
+    best = float("inf")
+    results = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [list(extractor.iter_pages(document["path"], with_headings)) for document in corpus]
+        best = min(best, time.perf_counter() - start)
+    return best, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="Directory of PDFs (default: generated fixtures)")
+    parser.add_argument("--documents", type=int, default=6)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.corpus:
+        corpus = pdf_fixtures.load_corpus(args.corpus)
+    else:
+        corpus = pdf_fixtures.make_corpus(tempfile.mkdtemp(prefix="pdf-fixtures-"), args.documents, args.pages)
+    if not corpus:
+        raise SystemExit("No PDFs in corpus")
+
+    backends = [name for name, extractor in pdf_extractors.EXTRACTORS.items() if extractor.available()]
+    missing = [name for name in pdf_extractors.EXTRACTORS if name not in backends]
+
+    # Documents without ground truth are scored against pdfplumber
+    if any(document["pages"] is None for document in corpus):
+        _, reference = run_backend("pdfplumber", corpus, True, 1)
+        for document, pages in zip(corpus, reference):
+            if document["pages"] is None:
+                document["pages"] = [{"text": page.text, "headings": [h["text"] for h in page.headings]} for page in pages]
+
+    total_pages = sum(len(document["pages"]) for document in corpus)
+    print(f"corpus: {len(corpus)} PDFs, {total_pages} pages"
+          + (f"; not installed: {', '.join(missing)}" if missing else ""))
+    print(f"{'backend':12} {'pages/s':>8} {'+headings':>10} {'recall':>7} {'order':>7} {'head P':>7} {'head R':>7}")
+
+    for name in backends:
+        text_seconds, _ = run_backend(name, corpus, False, args.repeat)
+        heading_seconds, results = run_backend(name, corpus, True, args.repeat)
+
+        totals = Counter()
+        scored = 0
+        for document, pages in zip(corpus, results):
+            for truth, page in zip(document["pages"], pages):
+                totals.update(score_page(truth["text"], truth["headings"], page, True))
+                scored += 1
+            # Pages the backend did not return at all score zero
+            scored += max(0, len(document["pages"]) - len(pages))
+
+        averages = {key: value / scored for key, value in totals.items()}
+        print(f"{name:12} {total_pages / text_seconds:8.0f} {total_pages / heading_seconds:10.0f} "
+              f"{averages['recall']:7.3f} {averages['order']:7.3f} "
+              f"{averages['heading_precision']:7.3f} {averages['heading_recall']:7.3f}")
+
+    print(f"\nauto order: {', '.join(extractor.name for extractor in pdf_extractors.get_extractors('auto'))}")
+
+
+if __name__ == "__main__":
+    main()
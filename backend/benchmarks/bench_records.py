@@ -0,0 +1,110 @@
+"""
+Benchmark - Record rows vs dict(row) copies: memory and throughput
+
+Loads a thread's messages (the get_messages_by_thread query) two ways:
+    dict      sqlite3.Row, then [dict(row) for row in rows] (the previous data-access layer)
+    records   records.Message built by the row factory
+and reports fetch time, memory held by the result, encode time, and peak
+memory of encoding the list in one call vs. streaming it with
+serialization.iter_json_array.
+
+Usage (from backend/):
+    python benchmarks/bench_records.py [--messages 10000] [--repeat 5]
+"""
+
+import argparse
+import sqlite3
+import time
+import tracemalloc
+
+from common import use_temp_database, seed_thread, db
+
+import records
+import serialization
+
+MESSAGES_SQL = """
+    SELECT m.*, u.name as user_name, u.role as user_role
+    FROM messages m
+    LEFT JOIN users u ON m.user_id = u.id
+    WHERE m.thread_id = ?
+    ORDER BY m.created_at ASC
+"""
+
+
+def fetch_dicts(thread_id: int) -> list:
+    conn = db.get_connection()
+    cursor = conn.cursor()
+    cursor.row_factory = sqlite3.Row
+    cursor.execute(MESSAGES_SQL, (thread_id,))
+    rows = [dict(row) for row in cursor.fetchall()]
+    conn.close()
+    return rows
+
+
+def fetch_records(thread_id: int) -> list:
+    conn = db.get_connection()
+    cursor = conn.cursor()
+    cursor.row_factory = records.row_factory(records.Message)
+    cursor.execute(MESSAGES_SQL, (thread_id,))
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
+
+
+def best_ms(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def held_bytes(func) -> int:
+    """Bytes still allocated by func's result once it returns"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = func()
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del result
+    return held
+
+
+def peak_bytes(func) -> int:
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    use_temp_database("forum-records-")
+    thread_id = seed_thread(args.messages)
+    loaders = {"dict": fetch_dicts, "records": fetch_records}
+    assert [dict(row) for row in fetch_dicts(thread_id)] == [row.to_dict() for row in fetch_records(thread_id)]
+
+    print(f"{args.messages} messages, encoder: {'orjson' if serialization.orjson else 'json'}")
+    print(f"{'rows':8} {'fetch ms':>9} {'held KB':>8} {'bytes/row':>10} {'encode ms':>10} "
+          f"{'encode peak KB':>15} {'stream peak KB':>15}")
+    for name, load in loaders.items():
+        fetch_ms = best_ms(lambda: load(thread_id), args.repeat)
+        held = held_bytes(lambda: load(thread_id))
+        rows = load(thread_id)
+        encode_ms = best_ms(lambda: serialization.dumps(rows), args.repeat)
+        encode_peak = peak_bytes(lambda: serialization.dumps(rows))
+        stream_peak = peak_bytes(lambda: max(len(chunk) for chunk in serialization.iter_json_array(rows)))
+        print(f"{name:8} {fetch_ms:9.1f} {held / 1024:8.0f} {held / args.messages:10.0f} {encode_ms:10.1f} "
+              f"{encode_peak / 1024:15.0f} {stream_peak / 1024:15.0f}")
+
+    print("\nheld KB: memory retained by the fetched list; peaks exclude the rows themselves")
+
+
+if __name__ == "__main__":
+    main()
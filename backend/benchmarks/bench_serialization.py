@@ -0,0 +1,74 @@
+"""
+Benchmark - serialization time and wire size per endpoint
+
+Compares FastAPI's default path (jsonable_encoder + json.dumps) with the
+FastJSONResponse encoder, and reports raw, gzip and brotli payload sizes.
+
+Usage (from backend/):
+    python benchmarks/bench_serialization.py [--messages 5000] [--repeat 20]
+"""
+
+import argparse
+import gzip
+import json
+import time
+
+from common import use_temp_database, seed_thread, db
+
+import serialization
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def build_payloads(thread_id: int) -> dict:
+    """Build the payloads the read endpoints return"""
+    announcements = db.get_all_announcements()
+    threads_by_announcement = db.get_threads_for_announcements([a["id"] for a in announcements])
+    announcements = [{**a, "threads": threads_by_announcement.get(a["id"], [])} for a in announcements]
+
+    return {
+        "/api/announcements": {"announcements": announcements},
+        "/api/threads/{id}/messages": {"thread_id": thread_id, "messages": db.get_messages_by_thread(thread_id)},
+        "/api/analytics": db.get_analytics_data(),
+    }
+
+
+def time_call(func, repeat: int) -> float:
+    """Return the best wall time in milliseconds over repeat runs"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    from fastapi.encoders import jsonable_encoder
+
+    use_temp_database()
+    thread_id = seed_thread(args.messages)
+    payloads = build_payloads(thread_id)
+
+    print(f"encoder: {'orjson' if serialization.orjson else 'json'}, brotli: {'yes' if brotli else 'no'}")
+    print(f"{'endpoint':30} {'default ms':>11} {'fast ms':>8} {'raw KB':>9} {'gzip KB':>8} {'br KB':>8}")
+    for endpoint, payload in payloads.items():
+        default_ms = time_call(lambda: json.dumps(jsonable_encoder(payload)).encode("utf-8"), args.repeat)
+        fast_ms = time_call(lambda: serialization.dumps(payload), args.repeat)
+
+        body = serialization.dumps(payload)
+        gzip_size = len(gzip.compress(body, compresslevel=serialization.GZIP_LEVEL))
+        br_size = f"{len(brotli.compress(body, quality=serialization.BROTLI_QUALITY)) / 1024:8.1f}" if brotli else f"{'-':>8}"
+        print(f"{endpoint:30} {default_ms:11.2f} {fast_ms:8.2f} {len(body) / 1024:9.1f} {gzip_size / 1024:8.1f} {br_size}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark - clean_text and chunk_text time and peak memory on large inputs
+
+Compares the previous word-list implementations of pdf_processor.clean_text and
+chunk_text with text_processing, on synthetic PDF-like text (short lines, ragged
+whitespace, blank lines between paragraphs). Outputs are checked to be identical.
+
+Usage (from backend/):
+    python benchmarks/bench_text_processing.py [--mb 10] [--chunk 4000] [--repeat 3]
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+import common  # noqa: F401  (puts backend/ on sys.path)
+import text_processing
+
+WORDS = (
+    "the a of and to in is that for congestion window router packet loss TCP throughput latency "
+    "acknowledgement retransmission timeout sender receiver buffer queue slow-start AIMD bandwidth"
+).split()
+
+
+def legacy_clean_text(text: str) -> str:
+    """pdf_processor.clean_text before text_processing"""
+    text = "\n".join(line.strip() for line in text.split("\n") if line.strip())
+    text = " ".join(text.split())
+    return text
+
+
+def legacy_chunk_text(text: str, max_length: int = 4000) -> list:
+    """pdf_processor.chunk_text before text_processing"""
+    if len(text) <= max_length:
+        return [text]
+
+    chunks = []
+    words = text.split()
+    current_chunk = []
+    current_length = 0
+
+    for word in words:
+        word_length = len(word) + 1
+        if current_length + word_length > max_length:
+            chunks.append(" ".join(current_chunk))
+            current_chunk = [word]
+            current_length = word_length
+        else:
+            current_chunk.append(word)
+            current_length += word_length
+
+    if current_chunk:
+        chunks.append(" ".join(current_chunk))
+
+    return chunks
+
+
+def make_text(size: int, seed: int = 7) -> str:
+    """PDF-extraction-like text of about size characters"""
+    rng = random.Random(seed)
+    lines = []
+    total = 0
+    while total < size:
+        line = "  ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 14)))
+        if rng.random() < 0.1:
+            line = f"   {line}  "
+        if rng.random() < 0.05:
+            line += "\n"
+        lines.append(line)
+        total += len(line) + 1
+    return "\n".join(lines)
+
+
+def measure(func, repeat: int):
+    """Best wall time (ms) over repeat runs, peak traced memory (MB) of one run, and the result"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+        del result
+
+    tracemalloc.start()
+    result = func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best * 1000, peak / 1e6, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mb", type=float, default=10)
+    parser.add_argument("--chunk", type=int, default=4000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    raw = make_text(int(args.mb * 1_000_000))
+    cleaned = text_processing.clean_text(raw)
+    pages = [raw[i:i + 3000] for i in range(0, len(raw), 3000)]
+
+    cases = [
+        ("clean_text", lambda: legacy_clean_text(raw), lambda: text_processing.clean_text(raw)),
+        ("chunk_text (cleaned input)", lambda: legacy_chunk_text(cleaned, args.chunk),
+         lambda: text_processing.chunk_text(cleaned, args.chunk)),
+        ("clean + chunk", lambda: legacy_chunk_text(legacy_clean_text(raw), args.chunk),
+         lambda: text_processing.chunk_text(text_processing.clean_text(raw), args.chunk)),
+    ]
+
+    print(f"input: {len(raw) / 1e6:.1f} MB raw, {len(cleaned) / 1e6:.1f} MB cleaned, chunks of {args.chunk}")
+    print(f"{'case':30} {'legacy ms':>10} {'new ms':>8} {'legacy MB':>10} {'new MB':>8}  same")
+    for name, legacy, new in cases:
+        legacy_ms, legacy_mb, legacy_result = measure(legacy, args.repeat)
+        new_ms, new_mb, new_result = measure(new, args.repeat)
+        same = legacy_result == new_result
+        print(f"{name:30} {legacy_ms:10.1f} {new_ms:8.1f} {legacy_mb:10.1f} {new_mb:8.1f}  {'yes' if same else 'NO'}")
+
+    for label, func in [
+        ("sentence boundaries", lambda: text_processing.chunk_text(cleaned, args.chunk, boundary="sentence")),
+        ("paragraph boundaries", lambda: text_processing.chunk_text(raw, args.chunk, boundary="paragraph")),
+        ("word + 200 overlap", lambda: text_processing.chunk_text(cleaned, args.chunk, overlap=200)),
+        ("page generator", lambda: list(text_processing.iter_chunks_from_pages(iter(pages), args.chunk))),
+    ]:
+        elapsed_ms, peak_mb, chunks = measure(func, args.repeat)
+        print(f"{label:30} {'':>10} {elapsed_ms:8.1f} {'':>10} {peak_mb:8.1f}  ({len(chunks)} chunks)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark - Topic extraction prompt size and ingestion time per TOPIC_EXTRACTION_MODE
+
+For each fixture PDF: extract text and headings, then extract topics in each
+mode against the stub Ollama. The stub charges --prompt-tps for prompt tokens,
+so reading raw text costs time the way it would on a real model.
+    full_text   LLM reads the whole text: one call per chunk, then a merge (map-reduce)
+    candidates  LLM picks from local headings and keyphrases
+    offline     topics from local candidates, no LLM call
+The previous behaviour (one call on the first 25,000 characters) is shown as
+'first 25k' for comparison. Map-reduce runs twice: cold, then with the per-chunk
+cache warm, as a retry after a failure would.
+
+Usage (from backend/):
+    python benchmarks/bench_topic_extraction.py [--documents 2] [--pages 40] [--prompt-tps 300] [--latency 0.5]
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import common  # noqa: F401  (puts backend/ on sys.path)
+
+STUB_PORT = 18631
+os.environ["OLLAMA_API_URL"] = f"http://127.0.0.1:{STUB_PORT}/api/generate"
+
+import llm_service
+import pdf_fixtures
+import pdf_processor
+import prompts
+import stub_ollama
+import tokenizer
+import topic_candidates
+
+MODES = ("first 25k", "full_text", "full_text (warm)", "candidates", "offline")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=2)
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--prompt-tps", type=float, default=300.0, help="stub prompt tokens per second")
+    parser.add_argument("--latency", type=float, default=0.5, help="stub generation seconds")
+    args = parser.parse_args()
+
+    stub_ollama.start_stub(STUB_PORT, args.latency, 0.0, args.prompt_tps)
+    corpus = pdf_fixtures.make_corpus(tempfile.mkdtemp(prefix="topic-fixtures-"), args.documents, args.pages)
+    extracted = [pdf_processor.extract_pdf(document["path"]) for document in corpus]
+
+    # Record every prompt sent to the stub
+    sent = []
+    call_ollama = llm_service.call_ollama
+
+    def recording_call(prompt, model=llm_service.DEFAULT_MODEL):
+        sent.append(prompt)
+        return call_ollama(prompt, model)
+
+    llm_service.call_ollama = recording_call
+
+    print(f"corpus: {len(corpus)} PDFs x {args.pages} pages, "
+          f"{statistics.mean(len(pdf.text) for pdf in extracted) / 1000:.0f}k chars each; "
+          f"stub: {args.prompt_tps:.0f} prompt tokens/s, {args.latency}s generation")
+    print(f"{'mode':18} {'LLM calls':>9} {'prompt chars':>13} {'prompt tokens':>14} {'candidates ms':>14} {'topics s':>9}")
+
+    for mode in MODES:
+        if mode == "full_text":
+            llm_service.topic_map_cache.clear()
+            llm_service.topic_reduce_cache.clear()
+        llm_service.TOPIC_EXTRACTION_MODE = mode.split()[0] if mode != "first 25k" else "full_text"
+        calls, chars, tokens, candidate_ms, topic_s = [], [], [], [], []
+        for pdf in extracted:
+            candidates_start = time.perf_counter()
+            topic_candidates.extract_candidates(pdf.text, pdf.headings)
+            candidate_ms.append((time.perf_counter() - candidates_start) * 1000)
+
+            sent.clear()
+            start = time.perf_counter()
+            if mode == "first 25k":
+                llm_service.parse_topics(llm_service.call_ollama(prompts.get_topic_extraction_prompt(pdf.text[:25000])))
+            else:
+                llm_service.extract_topics(pdf.text, pdf.headings)
+            topic_s.append(time.perf_counter() - start)
+            calls.append(len(sent))
+            chars.append(sum(len(prompt) for prompt in sent))
+            tokens.append(sum(tokenizer.count_tokens(prompt, llm_service.DEFAULT_MODEL) for prompt in sent))
+
+        print(f"{mode:18} {statistics.mean(calls):9.1f} {statistics.mean(chars):13.0f} {statistics.mean(tokens):14.0f} "
+              f"{statistics.mean(candidate_ms):14.1f} {statistics.mean(topic_s):9.2f}")
+
+    print("\nprompt chars/tokens and calls are per document, summed over all its LLM calls")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark - read throughput scaling across uvicorn worker counts
+
+Starts the server with WORKERS=1, 2, 4 ... on a seeded temp database and
+drives read endpoints from several client processes for a fixed duration.
+
+Usage (from backend/):
+    python benchmarks/bench_workers.py [--workers 1 2 4] [--clients 8] [--duration 10]
+"""
+
+import argparse
+import http.client
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+from common import BACKEND_DIR, use_temp_database, seed_thread, db
+
+PORT = 8765
+
+
+def wait_for_server(port: int, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("Server did not start")
+
+
+def client_loop(port: int, paths: list, duration: float, results):
+    """Issue requests on one keep-alive connection until duration elapses"""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    count = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        conn.request("GET", paths[count % len(paths)])
+        conn.getresponse().read()
+        count += 1
+    results.put(count)
+
+
+def run_level(workers: int, clients: int, duration: float, paths: list, workdir: str) -> float:
+    """Start the server with N workers and return requests/second"""
+    env = dict(os.environ, WORKERS=str(workers), PORT=str(PORT), HOST="127.0.0.1",
+               DATABASE_PATH=db.DATABASE_PATH, CACHE_SERVER_PORT=str(PORT + 1))
+    server = subprocess.Popen([sys.executable, os.path.join(BACKEND_DIR, "main.py")], cwd=workdir, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_server(PORT)
+        time.sleep(1)  # Let all workers finish booting
+        results = multiprocessing.Queue()
+        procs = [multiprocessing.Process(target=client_loop, args=(PORT, paths, duration, results)) for _ in range(clients)]
+        for proc in procs:
+            proc.start()
+        total = sum(results.get() for _ in procs)
+        for proc in procs:
+            proc.join()
+        return total / duration
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--messages", type=int, default=200)
+    args = parser.parse_args()
+
+    workdir = use_temp_database()
+    thread_id = seed_thread(args.messages)
+    paths = ["/api/announcements", f"/api/threads/{thread_id}/messages", f"/api/topics/{thread_id}/poll", "/api/analytics"]
+
+    print(f"cpus: {os.cpu_count()}, clients: {args.clients}, duration: {args.duration}s")
+    print(f"{'workers':>8} {'req/s':>10} {'speedup':>8}")
+    baseline = None
+    for workers in args.workers:
+        rps = run_level(workers, args.clients, args.duration, paths, workdir)
+        baseline = baseline or rps
+        print(f"{workers:8d} {rps:10.1f} {rps / baseline:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
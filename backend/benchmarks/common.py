@@ -0,0 +1,33 @@
+"""
+Shared helpers for benchmark scripts: temporary database setup and seeding
+"""
+
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIR)
+
+import database as db
+
+
+def use_temp_database(prefix: str = "forum-bench-") -> str:
+    """Point database.py at a fresh SQLite file in a temp dir (also made the cwd) and initialize it"""
+    workdir = tempfile.mkdtemp(prefix=prefix)
+    os.chdir(workdir)
+    db.DATABASE_PATH = os.path.join(workdir, "bench.db")
+    db.init_database()
+    return workdir
+
+
+def seed_thread(message_count: int, student_count: int = 30, pdf_chars: int = 60000) -> int:
+    """Create one announcement with a thread, votes and messages; return the thread id"""
+    announcement_id = db.create_announcement(1, "Lecture 1", "Slides", pdf_text="lorem ipsum " * (pdf_chars // 12), has_topics=True)
+    thread_id = db.create_thread("Discussion: Routing", "Routing", announcement_id)
+    student_ids = [db.create_user(f"student{i}", "student") for i in range(student_count)]
+    for i, student_id in enumerate(student_ids):
+        db.create_or_update_poll(thread_id, student_id, ["complete", "partial", "none"][i % 3])
+    for i in range(message_count):
+        db.create_message(thread_id, "student", f"Question {i} about routing tables and convergence", student_ids[i % student_count])
+    return thread_id
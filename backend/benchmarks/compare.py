@@ -0,0 +1,48 @@
+"""
+Compare two benchmark reports written by run.py
+
+Usage (from backend/):
+    python benchmarks/compare.py benchmarks/results/BASE.json benchmarks/results/NEW.json
+"""
+
+import argparse
+import json
+
+
+def change(old: float, new: float) -> str:
+    if not old:
+        return "     n/a"
+    return f"{(new - old) / old * 100:+7.1f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("new")
+    args = parser.parse_args()
+
+    with open(args.base) as handle:
+        base = json.load(handle)
+    with open(args.new) as handle:
+        new = json.load(handle)
+
+    print(f"base: {base['commit']} {base['label']} ({base['timestamp']})")
+    print(f"new:  {new['commit']} {new['label']} ({new['timestamp']})")
+    if base["scale"] != new["scale"] or base["config"] != new["config"]:
+        print("⚠️  Scale or config differ between reports; results may not be comparable")
+
+    for name in sorted(set(base["scenarios"]) & set(new["scenarios"])):
+        print(f"\n{name}")
+        print(f"  {'request':16} {'req/s':>18} {'p50':>18} {'p95':>18} {'p99':>18}")
+        base_requests = dict(base["scenarios"][name]["requests"], overall=base["scenarios"][name]["overall"])
+        new_requests = dict(new["scenarios"][name]["requests"], overall=new["scenarios"][name]["overall"])
+        for label in sorted(set(base_requests) & set(new_requests)):
+            old_stats, new_stats = base_requests[label], new_requests[label]
+            cells = [f"{new_stats['throughput']:9.1f} {change(old_stats['throughput'], new_stats['throughput'])}"]
+            for key in ("p50_ms", "p95_ms", "p99_ms"):
+                cells.append(f"{new_stats[key]:9.1f} {change(old_stats[key], new_stats[key])}")
+            print(f"  {label:16} " + " ".join(cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Synthetic data generator - fills a database through database.py at a configurable scale
+
+Usage (from backend/):
+    python benchmarks/datagen.py --db /tmp/bench.db --students 200 --announcements 10 \
+        --threads-per-announcement 5 --messages-per-thread 100 --vote-rate 0.8
+"""
+
+import argparse
+import random
+from typing import Dict
+
+from common import db
+
+WORDS = (
+    "routing table packet latency bandwidth congestion window protocol layer socket "
+    "handshake checksum frame switch router subnet address header payload retransmission "
+    "timeout queue buffer throughput jitter topology gateway datagram stream session"
+).split()
+
+LEVELS = ["complete", "partial", "none"]
+LEVEL_WEIGHTS = [0.5, 0.3, 0.2]
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def generate(students: int = 200, announcements: int = 10, threads_per_announcement: int = 5,
+             messages_per_thread: int = 100, vote_rate: float = 0.8, pdf_chars: int = 40000,
+             seed: int = 42) -> Dict:
+    """
+    Populate the current database (db.DATABASE_PATH) with synthetic classroom data
+
+    Returns:
+        Dict with the created ids: teacher_id, student_ids, announcement_ids, thread_ids
+    """
+    rng = random.Random(seed)
+    db.init_database()
+    teacher_id = db.get_user_by_name("Teacher")["id"]
+
+    student_ids = [
+        db.create_user(f"bench_student_{i}", "student", email=f"s{i}@example.edu", phone=f"9{i:09d}")
+        for i in range(students)
+    ]
+
+    announcement_ids = []
+    thread_ids = []
+    for a in range(announcements):
+        paragraphs = []
+        length = 0
+        while length < pdf_chars:
+            paragraph = " ".join(sentence(rng, rng.randint(8, 20)) for _ in range(5))
+            paragraphs.append(paragraph)
+            length += len(paragraph) + 2
+        announcement_id = db.create_announcement(
+            teacher_id=teacher_id,
+            title=f"Lecture {a + 1}",
+            content=sentence(rng, 15),
+            pdf_text="\n\n".join(paragraphs),
+            pdf_filename=f"lecture_{a + 1}.pdf",
+            has_topics=True
+        )
+        announcement_ids.append(announcement_id)
+
+        for t in range(threads_per_announcement):
+            topic = " ".join(rng.sample(WORDS, 3)).title()
+            thread_ids.append(db.create_thread(f"Discussion: {topic}", topic, announcement_id))
+
+    for thread_id in thread_ids:
+        for m in range(messages_per_thread):
+            if m % 5 == 4:
+                db.create_message(thread_id, "ai", sentence(rng, 60))
+            else:
+                db.create_message(thread_id, "student", sentence(rng, rng.randint(5, 30)), rng.choice(student_ids))
+
+        for student_id in student_ids:
+            if rng.random() < vote_rate:
+                db.create_or_update_poll(thread_id, student_id, rng.choices(LEVELS, LEVEL_WEIGHTS)[0])
+
+    return {
+        "teacher_id": teacher_id,
+        "student_ids": student_ids,
+        "announcement_ids": announcement_ids,
+        "thread_ids": thread_ids
+    }
+
+
+def add_scale_arguments(parser: argparse.ArgumentParser):
+    """Register the data scale options (shared with run.py)"""
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--announcements", type=int, default=10)
+    parser.add_argument("--threads-per-announcement", type=int, default=5)
+    parser.add_argument("--messages-per-thread", type=int, default=100)
+    parser.add_argument("--vote-rate", type=float, default=0.8)
+    parser.add_argument("--pdf-chars", type=int, default=40000)
+    parser.add_argument("--seed", type=int, default=42)
+
+
+def scale_from_args(args) -> Dict:
+    return {
+        "students": args.students,
+        "announcements": args.announcements,
+        "threads_per_announcement": args.threads_per_announcement,
+        "messages_per_thread": args.messages_per_thread,
+        "vote_rate": args.vote_rate,
+        "pdf_chars": args.pdf_chars,
+        "seed": args.seed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", required=True, help="SQLite file to create or extend")
+    add_scale_arguments(parser)
+    args = parser.parse_args()
+
+    db.DATABASE_PATH = args.db
+    ids = generate(**scale_from_args(args))
+    print(f"✅ Generated {len(ids['student_ids'])} students, {len(ids['announcement_ids'])} announcements, "
+          f"{len(ids['thread_ids'])} threads in {args.db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Load generator - closed-loop virtual users against a running server, with latency percentiles
+"""
+
+import http.client
+import json
+import random
+import threading
+import time
+from typing import Callable, Dict, List
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: List[float], errors: int, duration: float) -> Dict:
+    """Summarize latencies (seconds) into milliseconds and requests/second"""
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "errors": errors,
+        "throughput": round(len(values) / duration, 2),
+        "mean_ms": round(sum(values) / len(values) * 1000, 2) if values else 0.0,
+        "p50_ms": round(percentile(values, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(values, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(values, 0.99) * 1000, 2),
+        "max_ms": round(values[-1] * 1000, 2) if values else 0.0
+    }
+
+
+def run_load(host: str, port: int, next_request: Callable, ids: Dict, users: int, duration: float,
+             think_time: float = 0.0, seed: int = 1, timeout: float = 120) -> Dict:
+    """
+    Run virtual users for duration seconds
+
+    Args:
+        next_request: Scenario function (rng, ids) -> (label, method, path, body)
+        ids: Generated data ids passed to the scenario
+        users: Number of concurrent virtual users (one keep-alive connection each)
+        think_time: Pause between a user's requests in seconds
+
+    Returns:
+        Dict with overall and per-label summaries
+    """
+    lock = threading.Lock()
+    latencies = {}
+    errors = {}
+    deadline = time.monotonic() + duration
+
+    def user_loop(user_index: int):
+        rng = random.Random(seed * 1000 + user_index)
+        conn = http.client.HTTPConnection(host, port, timeout=timeout)
+        while time.monotonic() < deadline:
+            label, method, path, body = next_request(rng, ids)
+            headers = {"Content-Type": "application/json"} if body is not None else {}
+            payload = json.dumps(body) if body is not None else None
+            start = time.perf_counter()
+            failed = False
+            try:
+                conn.request(method, path, body=payload, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                failed = response.status >= 400
+            except (OSError, http.client.HTTPException):
+                failed = True
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=timeout)
+            elapsed = time.perf_counter() - start
+
+            with lock:
+                if failed:
+                    errors[label] = errors.get(label, 0) + 1
+                else:
+                    latencies.setdefault(label, []).append(elapsed)
+            if think_time:
+                time.sleep(rng.uniform(0, 2 * think_time))
+        conn.close()
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=user_loop, args=(i,), daemon=True) for i in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    labels = sorted(set(latencies) | set(errors))
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "duration": round(elapsed, 2),
+        "users": users,
+        "overall": summarize(all_latencies, sum(errors.values()), elapsed),
+        "requests": {label: summarize(latencies.get(label, []), errors.get(label, 0), elapsed) for label in labels}
+    }
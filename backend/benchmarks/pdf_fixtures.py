@@ -0,0 +1,181 @@
+"""
+PDF fixtures - Synthetic lecture PDFs with known text and slide titles
+Writes minimal PDFs by hand (standard Helvetica fonts, no dependencies) so the
+extractor comparison has ground truth: every page's lines in reading order and
+which of them are headings. Two layouts: 'slides' (landscape, large title,
+bullets, small footer) and 'notes' (portrait, section headings over wrapped
+paragraphs).
+
+Usage (from backend/):
+    python benchmarks/pdf_fixtures.py OUT_DIR [--documents 6] [--pages 20]
+"""
+
+import argparse
+import json
+import os
+import random
+from typing import Dict, List, Tuple
+
+WORDS = (
+    "network packet router switch congestion window throughput latency bandwidth queue buffer "
+    "protocol header checksum acknowledgement retransmission timeout sender receiver segment "
+    "datagram address subnet prefix forwarding table routing algorithm distance vector link state "
+    "convergence loop flow control sliding window handshake connection stream socket port"
+).split()
+
+TITLE_WORDS = (
+    "Introduction Overview Routing Congestion Control Transport Layer Flow Reliable Delivery "
+    "Addressing Subnetting Forwarding Switching Queueing Delay Loss Throughput Sockets"
+).split()
+
+# (text, font size, font, is_heading)
+Line = Tuple[str, float, str, bool]
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _wrap(words: List[str], size: float, width: float) -> List[str]:
+    """Greedy wrap using Helvetica's average glyph width (~0.5 em)"""
+    max_chars = int(width / (size * 0.5))
+    lines, current = [], ""
+    for word in words:
+        if current and len(current) + 1 + len(word) > max_chars:
+            lines.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        lines.append(current)
+    return lines
+
+
+def _title(rng: random.Random) -> str:
+    return " ".join(rng.sample(TITLE_WORDS, rng.randint(2, 4)))
+
+
+def slide_page(rng: random.Random, number: int) -> List[Line]:
+    lines = [(_title(rng), 28, "F2", True)]
+    for _ in range(rng.randint(3, 7)):
+        bullet = " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 14)))
+        for i, text in enumerate(_wrap(bullet.split(), 16, 600)):
+            lines.append((f"- {text}" if i == 0 else f"  {text}", 16, "F1", False))
+    lines.append((f"CS 331 Computer Networks - slide {number}", 9, "F1", False))
+    return lines
+
+
+def notes_page(rng: random.Random, number: int) -> List[Line]:
+    lines = []
+    for _ in range(rng.randint(2, 3)):
+        lines.append((_title(rng), 16, "F2", True))
+        for _ in range(rng.randint(1, 2)):
+            paragraph = [rng.choice(WORDS) for _ in range(rng.randint(30, 70))]
+            lines.extend((text, 11, "F1", False) for text in _wrap(paragraph, 11, 480))
+    lines.append((f"Lecture notes - page {number}", 9, "F1", False))
+    return lines
+
+
+def _content_stream(lines: List[Line], page_width: float, page_height: float) -> bytes:
+    commands = []
+    y = page_height - 60
+    for text, size, font, is_heading in lines:
+        x = 50
+        if text.startswith(("CS 331", "Lecture notes")):
+            y = 30
+        commands.append(f"BT /{font} {size} Tf {x} {y:.1f} Td ({_escape(text)}) Tj ET")
+        y -= size * (1.8 if is_heading else 1.35)
+    return "\n".join(commands).encode("latin-1")
+
+
+def write_pdf(path: str, pages: List[List[Line]], page_size: Tuple[float, float]):
+    """Write pages of positioned lines as a PDF using the standard Helvetica fonts"""
+    width, height = page_size
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+    ]
+    page_numbers = []
+    for lines in pages:
+        stream = _content_stream(lines, width, height)
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> >>" % (width, height, len(objects))
+        )
+        page_numbers.append(len(objects))
+    kids = " ".join(f"{number} 0 R" for number in page_numbers)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_numbers)} >>".encode()
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as f:
+        f.write(output)
+
+
+def make_corpus(out_dir: str, documents: int = 6, pages: int = 20, seed: int = 3) -> List[Dict]:
+    """
+    Write documents alternating slides/notes layouts into out_dir
+
+    Returns:
+        One entry per document: path, layout and per-page ground truth
+        ({"text": lines joined by newlines, "headings": [...]})
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    rng = random.Random(seed)
+    corpus = []
+    for index in range(documents):
+        layout = "slides" if index % 2 == 0 else "notes"
+        make_page = slide_page if layout == "slides" else notes_page
+        page_lines = [make_page(rng, number) for number in range(1, pages + 1)]
+        path = os.path.join(out_dir, f"{layout}-{index + 1}.pdf")
+        write_pdf(path, page_lines, (720, 540) if layout == "slides" else (612, 792))
+        truth = [
+            {
+                "text": "\n".join(text for text, _, _, _ in lines),
+                "headings": [text for text, _, _, is_heading in lines if is_heading]
+            }
+            for lines in page_lines
+        ]
+        with open(f"{path}.json", "w") as f:
+            json.dump({"layout": layout, "pages": truth}, f)
+        corpus.append({"path": path, "layout": layout, "pages": truth})
+    return corpus
+
+
+def load_corpus(corpus_dir: str) -> List[Dict]:
+    """PDFs in corpus_dir, with ground truth from PDF.json when present (else pages is None)"""
+    corpus = []
+    for name in sorted(os.listdir(corpus_dir)):
+        if not name.lower().endswith(".pdf"):
+            continue
+        path = os.path.join(corpus_dir, name)
+        truth = None
+        if os.path.exists(f"{path}.json"):
+            with open(f"{path}.json") as f:
+                truth = json.load(f)["pages"]
+        corpus.append({"path": path, "layout": "unknown" if truth is None else "fixture", "pages": truth})
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("out_dir")
+    parser.add_argument("--documents", type=int, default=6)
+    parser.add_argument("--pages", type=int, default=20)
+    args = parser.parse_args()
+    corpus = make_corpus(args.out_dir, args.documents, args.pages)
+    print(f"Wrote {len(corpus)} PDFs to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
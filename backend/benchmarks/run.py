@@ -0,0 +1,124 @@
+"""
+Benchmark runner - generates data, starts a stub Ollama and the API server, runs scenarios
+and writes a JSON report that can be compared across commits with compare.py
+
+Usage (from backend/):
+    python benchmarks/run.py                                  # all scenarios, default scale
+    python benchmarks/run.py --scenarios qa-storm --duration 30 --llm-latency 3
+    python benchmarks/run.py --workers 4 --students 1000 --messages-per-thread 500
+"""
+
+import argparse
+import datetime
+import http.client
+import json
+import os
+import subprocess
+import sys
+import time
+
+from common import BACKEND_DIR, use_temp_database, db
+from datagen import add_scale_arguments, generate, scale_from_args
+from loadgen import run_load
+from scenarios import SCENARIOS
+from stub_ollama import start_stub
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def wait_for_server(port: int, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server did not start on port {port}")
+
+
+def print_report(report: dict):
+    for name, result in report["scenarios"].items():
+        overall = result["overall"]
+        print(f"\n{name}: {overall['throughput']} req/s, {overall['errors']} errors, {result['users']} users")
+        print(f"  {'request':16} {'count':>7} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+        for label, stats in result["requests"].items():
+            print(f"  {label:16} {stats['count']:7d} {stats['throughput']:8.1f} {stats['p50_ms']:9.1f} "
+                  f"{stats['p95_ms']:9.1f} {stats['p99_ms']:9.1f} {stats['errors']:7d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--duration", type=float, default=20, help="seconds per scenario")
+    parser.add_argument("--users", type=int, help="override virtual users per scenario")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--llm-latency", type=float, default=2.0)
+    parser.add_argument("--llm-jitter", type=float, default=0.5)
+    parser.add_argument("--output", default=RESULTS_DIR, help="directory for JSON reports")
+    parser.add_argument("--label", default="", help="free-form label stored in the report")
+    add_scale_arguments(parser)
+    args = parser.parse_args()
+
+    workdir = use_temp_database()
+    print(f"Generating data in {db.DATABASE_PATH} ...")
+    scale = scale_from_args(args)
+    ids = generate(**scale)
+
+    stub = start_stub(args.port + 1, args.llm_latency, args.llm_jitter)
+    env = dict(
+        os.environ,
+        WORKERS=str(args.workers),
+        HOST="127.0.0.1",
+        PORT=str(args.port),
+        DATABASE_PATH=db.DATABASE_PATH,
+        OLLAMA_API_URL=f"http://127.0.0.1:{args.port + 1}/api/generate",
+        CACHE_SERVER_PORT=str(args.port + 2),
+    )
+    log_path = os.path.join(workdir, "server.log")
+    with open(log_path, "w") as log:
+        server = subprocess.Popen([sys.executable, os.path.join(BACKEND_DIR, "main.py")], cwd=workdir, env=env,
+                                  stdout=log, stderr=subprocess.STDOUT)
+    try:
+        wait_for_server(args.port)
+        report = {
+            "commit": git_commit(),
+            "label": args.label,
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "config": {"workers": args.workers, "duration": args.duration, "llm_latency": args.llm_latency,
+                       "llm_jitter": args.llm_jitter, "cpus": os.cpu_count()},
+            "scale": scale,
+            "scenarios": {}
+        }
+        for name in args.scenarios:
+            scenario = SCENARIOS[name]
+            print(f"Running {name} ({scenario.description}) for {args.duration}s ...")
+            report["scenarios"][name] = run_load("127.0.0.1", args.port, scenario.next_request, ids,
+                                                 users=args.users or scenario.users, duration=args.duration,
+                                                 think_time=scenario.think_time)
+    finally:
+        server.terminate()
+        server.wait()
+        stub.shutdown()
+
+    print_report(report)
+    os.makedirs(args.output, exist_ok=True)
+    report_path = os.path.join(args.output, f"{report['timestamp'].replace(':', '')}_{report['commit']}.json")
+    with open(report_path, "w") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"\n✅ Report written to {report_path} (server log: {log_path})")
+
+
+if __name__ == "__main__":
+    main()
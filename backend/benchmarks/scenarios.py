@@ -0,0 +1,65 @@
+"""
+Benchmark scenarios - request mixes modelled on real classroom load
+
+Each scenario function takes (rng, ids) and returns (label, method, path, json_body)
+"""
+
+from dataclasses import dataclass
+from typing import Callable
+
+LEVELS = ["complete", "partial", "none"]
+
+
+def lecture_peak_voting(rng, ids):
+    """Whole class votes on the current lecture's topics and watches the results"""
+    thread_id = rng.choice(ids["thread_ids"][-5:])
+    student_id = rng.choice(ids["student_ids"])
+    if rng.random() < 0.4:
+        return ("vote", "POST", f"/api/topics/{thread_id}/poll",
+                {"student_id": student_id, "understanding_level": rng.choice(LEVELS)})
+    if rng.random() < 0.8:
+        return ("poll_results", "GET", f"/api/topics/{thread_id}/poll?student_id={student_id}", None)
+    return ("helpers", "GET", f"/api/topics/{thread_id}/helpers", None)
+
+
+def qa_storm(rng, ids):
+    """Students flood a few threads with questions, some mentioning @AI"""
+    thread_id = rng.choice(ids["thread_ids"][-3:])
+    student_id = rng.choice(ids["student_ids"])
+    roll = rng.random()
+    if roll < 0.15:
+        return ("ask_ai", "POST", f"/api/threads/{thread_id}/ask",
+                {"question": "@AI can you explain how congestion control works?", "user_id": student_id})
+    if roll < 0.45:
+        return ("ask", "POST", f"/api/threads/{thread_id}/ask",
+                {"question": "Does anyone have notes from the last slide?", "user_id": student_id})
+    return ("messages", "GET", f"/api/threads/{thread_id}/messages", None)
+
+
+def dashboard_refresh(rng, ids):
+    """Teachers and students refreshing dashboards and the announcement feed"""
+    roll = rng.random()
+    if roll < 0.4:
+        return ("analytics", "GET", "/api/analytics", None)
+    if roll < 0.6:
+        return ("timeseries", "GET", "/api/analytics/timeseries?bucket=day", None)
+    return ("announcements", "GET", "/api/announcements", None)
+
+
+@dataclass
+class Scenario:
+    name: str
+    next_request: Callable
+    users: int
+    think_time: float
+    description: str
+
+
+SCENARIOS = {
+    "lecture-peak-voting": Scenario("lecture-peak-voting", lecture_peak_voting, users=50, think_time=0.05,
+                                    description="Class-wide voting on current topics"),
+    "qa-storm": Scenario("qa-storm", qa_storm, users=30, think_time=0.1,
+                         description="Question burst with @AI mentions"),
+    "dashboard-refresh": Scenario("dashboard-refresh", dashboard_refresh, users=10, think_time=0.0,
+                                  description="Analytics and feed refreshes"),
+}
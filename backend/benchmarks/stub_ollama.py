@@ -0,0 +1,78 @@
+"""
+Stub Ollama server - answers /api/generate with canned text after a configurable delay
+
+Usage (from backend/):
+    python benchmarks/stub_ollama.py --port 11500 --latency 2.0 --jitter 0.5 [--prompt-tps 300]
+    OLLAMA_API_URL=http://127.0.0.1:11500/api/generate python main.py
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CANNED_ANSWER = (
+    "1. Routing Algorithms\n2. Congestion Control\n3. Transport Layer Protocols\n"
+    "**Explanation:** The course material describes how packets are forwarded hop by hop, "
+    "and how the sender adapts its window when it detects loss."
+)
+
+
+def make_handler(latency: float, jitter: float, prompt_tps: float = 0.0):
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            prompt = request.get("prompt", "")
+            prompt_tokens = len(prompt) // 4
+            # Optional prompt processing cost, so prompt size shows up in latency like on a real model
+            prompt_delay = prompt_tokens / prompt_tps if prompt_tps else 0.0
+            delay = max(0.0, random.gauss(latency, jitter)) if jitter else latency
+            time.sleep(prompt_delay + delay)
+
+            body = json.dumps({
+                "model": request.get("model", "stub"),
+                "response": CANNED_ANSWER,
+                "done": True,
+                "prompt_eval_count": prompt_tokens,
+                "eval_count": len(CANNED_ANSWER) // 4,
+                "prompt_eval_duration": int((prompt_delay + delay * 0.2) * 1e9),
+                "eval_duration": int(delay * 0.8 * 1e9),
+                "total_duration": int((prompt_delay + delay) * 1e9)
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def start_stub(port: int, latency: float = 1.0, jitter: float = 0.0, prompt_tps: float = 0.0) -> ThreadingHTTPServer:
+    """Start the stub in a background thread; call .shutdown() on the result to stop it"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(latency, jitter, prompt_tps))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--latency", type=float, default=1.0, help="mean seconds per generation")
+    parser.add_argument("--jitter", type=float, default=0.0, help="standard deviation in seconds")
+    parser.add_argument("--prompt-tps", type=float, default=0.0, help="prompt tokens processed per second (0: free)")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(args.latency, args.jitter, args.prompt_tps))
+    print(f"✅ Stub Ollama listening on http://127.0.0.1:{args.port}/api/generate (latency {args.latency}s)")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+Cache - Read-through caches for hot database lookups
+Provides a bounded in-process LRU cache with TTL and hit/miss counters, and an
+optional shared cache server so multiple uvicorn workers see the same entries
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from multiprocessing.managers import BaseManager
+from typing import Any, Callable, Dict, Hashable, Optional
+
+# Configuration
+# 'local' keeps one cache per process, 'shared' uses the cache server (python cache.py serve)
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "local")
+CACHE_SERVER_HOST = os.environ.get("CACHE_SERVER_HOST", "127.0.0.1")
+CACHE_SERVER_PORT = int(os.environ.get("CACHE_SERVER_PORT", "8765"))
+CACHE_SERVER_AUTHKEY = os.environ.get("CACHE_SERVER_AUTHKEY", "iitgn-forum-cache").encode()
+
+
+# ========================================
+# IN-PROCESS LRU CACHE
+# ========================================
+
+class LRUCache:
+    """Thread-safe LRU cache with a size bound, per-entry TTL and hit/miss counters"""
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 300):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entry when full"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        """Drop a single entry (call after writing the underlying row)"""
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        """Drop all entries"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Optional[Any]:
+        """
+        Read-through lookup
+
+        Args:
+            key: Cache key
+            loader: Called on a miss; None results are not cached
+
+        Returns:
+            Cached or freshly loaded value
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        value = loader()
+        if value is not None:
+            self.set(key, value)
+        return value
+
+    def stats(self) -> Dict:
+        """Get hit/miss counters for this cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "local",
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+
+# ========================================
+# SHARED CACHE SERVER (MULTI-WORKER MODE)
+# ========================================
+
+class _CacheStore:
+    """Holds the named LRU caches inside the cache server process"""
+
+    def __init__(self):
+        self._caches = {}
+        self._lock = threading.Lock()
+
+    def _cache(self, name: str, maxsize: int, ttl: float) -> LRUCache:
+        with self._lock:
+            if name not in self._caches:
+                self._caches[name] = LRUCache(name, maxsize=maxsize, ttl=ttl)
+            return self._caches[name]
+
+    def get(self, name, key, maxsize, ttl):
+        return self._cache(name, maxsize, ttl).get(key)
+
+    def set(self, name, key, value, maxsize, ttl):
+        self._cache(name, maxsize, ttl).set(key, value)
+
+    def invalidate(self, name, key, maxsize, ttl):
+        self._cache(name, maxsize, ttl).invalidate(key)
+
+    def clear(self, name, maxsize, ttl):
+        self._cache(name, maxsize, ttl).clear()
+
+    def stats(self, name, maxsize, ttl):
+        result = self._cache(name, maxsize, ttl).stats()
+        result["backend"] = "shared"
+        return result
+
+
+class _CacheManager(BaseManager):
+    pass
+
+
+class SharedCache:
+    """
+    Client for a named cache living in the shared cache server.
+    Same interface as LRUCache; if the server is unreachable, lookups fall
+    through to the loader so requests never fail because of the cache.
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 300):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._store = None
+        self._lock = threading.Lock()
+        self.errors = 0
+
+    def _get_store(self):
+        with self._lock:
+            if self._store is None:
+                _CacheManager.register("get_store")
+                manager = _CacheManager(address=(CACHE_SERVER_HOST, CACHE_SERVER_PORT), authkey=CACHE_SERVER_AUTHKEY)
+                manager.connect()
+                self._store = manager.get_store()
+            return self._store
+
+    def _call(self, method: str, *args):
+        try:
+            return getattr(self._get_store(), method)(self.name, *args, self.maxsize, self.ttl)
+        except Exception:
+            self.errors += 1
+            with self._lock:
+                self._store = None
+            return None
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        return self._call("get", key)
+
+    def set(self, key: Hashable, value: Any):
+        self._call("set", key, value)
+
+    def invalidate(self, key: Hashable):
+        self._call("invalidate", key)
+
+    def clear(self):
+        self._call("clear")
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Optional[Any]:
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        value = loader()
+        if value is not None:
+            self.set(key, value)
+        return value
+
+    def stats(self) -> Dict:
+        result = self._call("stats") or {"backend": "shared", "unavailable": True}
+        result["client_errors"] = self.errors
+        return result
+
+
+def serve_forever():
+    """Run the shared cache server (blocks)"""
+    store = _CacheStore()
+    _CacheManager.register("get_store", callable=lambda: store)
+    manager = _CacheManager(address=(CACHE_SERVER_HOST, CACHE_SERVER_PORT), authkey=CACHE_SERVER_AUTHKEY)
+    server = manager.get_server()
+    print(f"✅ Shared cache server listening on {CACHE_SERVER_HOST}:{CACHE_SERVER_PORT}")
+    server.serve_forever()
+
+
+# ========================================
+# CACHE REGISTRY
+# ========================================
+
+_caches = {}
+
+
+def get_cache(name: str, maxsize: int = 1024, ttl: float = 300):
+    """Get (or create) the named cache using the configured backend"""
+    if name not in _caches:
+        cache_class = SharedCache if CACHE_BACKEND == "shared" else LRUCache
+        _caches[name] = cache_class(name, maxsize=maxsize, ttl=ttl)
+    return _caches[name]
+
+
+def get_all_stats() -> Dict[str, Dict]:
+    """Get hit/miss counters for every registered cache"""
+    return {name: cache.stats() for name, cache in _caches.items()}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        serve_forever()
+    else:
+        print("Usage: python cache.py serve")
@@ -0,0 +1,94 @@
+"""
+Coordination - Cross-process primitives for multi-worker deployments
+Uses lock files so every uvicorn worker on the host shares the same limits
+without an external broker
+"""
+
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to per-process locking
+    fcntl = None
+
+# Directory holding lock files shared by all workers
+LOCK_DIR = os.environ.get("FORUM_LOCK_DIR", os.path.join(tempfile.gettempdir(), "iitgn-forum-locks"))
+
+
+@contextmanager
+def file_lock(path: str):
+    """Hold an exclusive lock on path for the duration of the block (blocks until acquired)"""
+    with open(path, "a") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+class ProcessSemaphore:
+    """
+    Counting semaphore shared by all processes on the host.
+    Each slot is a lock file; holding a slot means holding its flock, so a
+    crashed worker releases its slot automatically.
+    """
+
+    def __init__(self, name: str, slots: int, poll_interval: float = 0.05):
+        self.name = name
+        self.slots = slots
+        self.poll_interval = poll_interval
+        self._local = threading.local()
+        # Threads of the same process must not share one flock (flock is per open file)
+        self._thread_slots = threading.BoundedSemaphore(slots)
+        os.makedirs(LOCK_DIR, exist_ok=True)
+
+    def _slot_path(self, index: int) -> str:
+        return os.path.join(LOCK_DIR, f"{self.name}.{index}.lock")
+
+    def acquire(self, timeout: float = None) -> bool:
+        """Acquire a slot; returns False if timeout expires first"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if not self._thread_slots.acquire(timeout=timeout):
+            return False
+
+        if fcntl is None:
+            self._local.handle = None
+            return True
+
+        while True:
+            for index in range(self.slots):
+                handle = open(self._slot_path(index), "a")
+                try:
+                    fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    handle.close()
+                    continue
+                self._local.handle = handle
+                return True
+
+            if deadline is not None and time.monotonic() >= deadline:
+                self._thread_slots.release()
+                return False
+            time.sleep(self.poll_interval)
+
+    def release(self):
+        """Release the slot held by the current thread"""
+        handle = getattr(self._local, "handle", None)
+        if handle is not None:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+            handle.close()
+            self._local.handle = None
+        self._thread_slots.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
@@ -1,28 +1,181 @@
 import sqlite3
+import json
 import os
+import time
 from datetime import datetime, timezone, timedelta
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional
 
-DATABASE_PATH = "data.db"
+import analytics_engine
+import cache
+import coordination
+import metrics
+import query_stats
+import records
+import tracing
+
+DATABASE_PATH = os.environ.get("DATABASE_PATH", "data.db")
+
+# Seconds a connection waits on a lock held by another worker before failing
+BUSY_TIMEOUT = 30
 
 # IST timezone offset
 IST = timezone(timedelta(hours=5, minutes=30))
 
+IST_OFFSET_SECONDS = 5 * 3600 + 30 * 60
+
+# Rollup bucket sizes in seconds (day buckets are aligned to IST midnight)
+ROLLUP_BUCKETS = {
+    'hour': 3600,
+    'day': 86400
+}
+
+# Upper bound on buckets returned by a single timeseries query
+MAX_TIMESERIES_BUCKETS = 2000
+
+# Rows fetched per fetchmany call by the streaming readers
+STREAM_FETCH_ROWS = 500
+
+# Read-through caches for rows that are looked up on nearly every request
+user_cache = cache.get_cache("users", maxsize=4096, ttl=600)
+thread_cache = cache.get_cache("threads", maxsize=2048, ttl=600)
+announcement_cache = cache.get_cache("announcements", maxsize=512, ttl=600)
+artifact_cache = cache.get_cache("artifacts", maxsize=64, ttl=600)
+
 def get_ist_time():
     """Get current time in IST"""
     return datetime.now(IST).strftime('%Y-%m-%d %H:%M:%S')
 
-def get_connection():
-    """Get database connection"""
-    conn = sqlite3.connect(DATABASE_PATH)
+def get_epoch_time() -> int:
+    """Get current time as integer Unix epoch seconds"""
+    return int(time.time())
+
+def get_bucket_start(epoch: int, bucket: str) -> int:
+    """Get the start epoch of the rollup bucket containing the given epoch"""
+    size = ROLLUP_BUCKETS[bucket]
+    if bucket == 'day':
+        return ((epoch + IST_OFFSET_SECONDS) // size) * size - IST_OFFSET_SECONDS
+    return (epoch // size) * size
+
+def get_connection(check_same_thread: bool = True):
+    """Get database connection (check_same_thread=False for a connection handed between pool threads)"""
+    conn = sqlite3.connect(DATABASE_PATH, timeout=BUSY_TIMEOUT, factory=query_stats.TimedConnection,
+                           check_same_thread=check_same_thread)
     conn.row_factory = sqlite3.Row
     return conn
 
+# Transactions
+class UnitOfWork:
+    """
+    Several writes on one connection, committed together or not at all
+
+    The write lock is taken up front (BEGIN IMMEDIATE), so a batch never fails
+    halfway on a lock held by another worker. Resource versions are bumped in
+    the same transaction; caches are invalidated only after the commit. Any
+    exception inside the block rolls everything back.
+    """
+
+    def __init__(self):
+        self.conn = None
+        self.cursor = None
+        self._resources = set()
+        self._invalidations = []
+
+    def __enter__(self) -> "UnitOfWork":
+        self.conn = get_connection()
+        self.conn.execute("BEGIN IMMEDIATE")
+        self.cursor = self.conn.cursor()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                if self._resources:
+                    _bump_versions(self.cursor, sorted(self._resources))
+                self.conn.commit()
+            else:
+                self.conn.rollback()
+        finally:
+            self.conn.close()
+        if exc_type is None:
+            for row_cache, key in self._invalidations:
+                row_cache.invalidate(key)
+        return False
+
+    def changed(self, resources: List[str], row_cache=None, key=None):
+        """Record resources (and a cached row) to bump / invalidate when the transaction commits"""
+        self._resources.update(resources)
+        if row_cache is not None:
+            self._invalidations.append((row_cache, key))
+
+    def add_announcement(self, teacher_id: int, title: str, content: str, pdf_text: Optional[str] = None, pdf_path: Optional[str] = None, pdf_filename: Optional[str] = None, has_topics: bool = False, teacher_name: Optional[str] = None) -> records.Announcement:
+        """Insert an announcement; returns the row as get_announcement would"""
+        values = (teacher_id, title, content, pdf_text, pdf_path, pdf_filename, int(has_topics), get_ist_time())
+        self.cursor.execute(
+            "INSERT INTO announcements (teacher_id, title, content, pdf_text, pdf_path, pdf_filename, has_topics, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            values
+        )
+        announcement_id = self.cursor.lastrowid
+        self.changed(["announcements", "analytics"], announcement_cache, announcement_id)
+        return records.Announcement(announcement_id, *values, teacher_name=teacher_name)
+
+    def add_threads(self, announcement_id: int, threads: List[tuple]) -> List[records.Thread]:
+        """
+        Insert (title, topic) threads in one executemany
+        Returns the rows as get_threads_by_announcement would, in insertion order
+        """
+        if not threads:
+            return []
+        # Set explicitly (same value as the column default) so the rows can be returned without reading them back
+        created_at = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        self.cursor.executemany(
+            "INSERT INTO threads (announcement_id, title, topic, created_at) VALUES (?, ?, ?, ?)",
+            [(announcement_id, title, topic, created_at) for title, topic in threads]
+        )
+        # The write lock is held, so the batch got consecutive ids ending at the last one
+        last_id = self.conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+        first_id = last_id - len(threads) + 1
+        rows = [
+            records.Thread(first_id + i, announcement_id, title, topic, created_at, message_count=0)
+            for i, (title, topic) in enumerate(threads)
+        ]
+        self.changed(["announcements", "analytics"])
+        for row in rows:
+            self._invalidations.append((thread_cache, row.id))
+        return rows
+
+    def save_artifacts(self, announcement_id: int, artifacts: Dict):
+        """Store (or replace) the prepared course material of an announcement"""
+        self.cursor.execute("""
+            INSERT OR REPLACE INTO announcement_artifacts
+                (announcement_id, version, model_family, cleaned_text, total_tokens, chunks, created_at_epoch)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (
+            announcement_id, artifacts["version"], artifacts["model_family"], artifacts["cleaned_text"],
+            artifacts["total_tokens"], json.dumps(artifacts["chunks"]), get_epoch_time()
+        ))
+        self.changed([], artifact_cache, announcement_id)
+
+def transaction() -> UnitOfWork:
+    """Start a unit of work: `with db.transaction() as uow: ...`"""
+    return UnitOfWork()
+
+@metrics.timed_db
 def init_database():
-    """Initialize database with required tables"""
+    """
+    Initialize database with required tables
+    Safe to call from several workers at once: migrations run under a file lock
+    """
+    with coordination.file_lock(f"{DATABASE_PATH}.init.lock"):
+        _init_database()
+
+def _init_database():
+    """Create tables, run migrations and seed data (caller holds the init lock)"""
     conn = get_connection()
     cursor = conn.cursor()
     
+    # WAL lets readers in other workers proceed while one worker writes
+    cursor.execute("PRAGMA journal_mode=WAL")
+    
     # Create users table
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS users (
@@ -87,6 +240,7 @@ def init_database():
             sender_type TEXT NOT NULL,
             content TEXT NOT NULL,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            created_at_epoch INTEGER,
             FOREIGN KEY (thread_id) REFERENCES threads (id),
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
@@ -101,12 +255,91 @@ def init_database():
             understanding_level TEXT NOT NULL CHECK(understanding_level IN ('complete', 'partial', 'none')),
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            created_at_epoch INTEGER,
+            updated_at_epoch INTEGER,
             UNIQUE(thread_id, student_id),
             FOREIGN KEY (thread_id) REFERENCES threads (id),
             FOREIGN KEY (student_id) REFERENCES users (id)
         )
     """)
     
+    # Migrate messages and topic_polls to carry integer epoch timestamps
+    epoch_columns = [
+        ("messages", "created_at_epoch", "created_at"),
+        ("topic_polls", "created_at_epoch", "created_at"),
+        ("topic_polls", "updated_at_epoch", "updated_at"),
+    ]
+    for table, column, source in epoch_columns:
+        try:
+            cursor.execute(f"SELECT {column} FROM {table} LIMIT 1")
+        except sqlite3.OperationalError:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} INTEGER")
+            # Existing string timestamps come from CURRENT_TIMESTAMP (UTC)
+            cursor.execute(
+                f"UPDATE {table} SET {column} = CAST(strftime('%s', {source}) AS INTEGER) WHERE {column} IS NULL"
+            )
+            print(f"✅ Added {column} column to {table} table")
+    
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_messages_created_epoch ON messages (created_at_epoch)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_topic_polls_updated_epoch ON topic_polls (updated_at_epoch)")
+    
+    # Create analytics rollups table (per bucket, per thread activity and vote deltas)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS analytics_rollups (
+            bucket TEXT NOT NULL CHECK(bucket IN ('hour', 'day')),
+            bucket_start INTEGER NOT NULL,
+            thread_id INTEGER NOT NULL,
+            message_count INTEGER NOT NULL DEFAULT 0,
+            ai_message_count INTEGER NOT NULL DEFAULT 0,
+            vote_count INTEGER NOT NULL DEFAULT 0,
+            complete_delta INTEGER NOT NULL DEFAULT 0,
+            partial_delta INTEGER NOT NULL DEFAULT 0,
+            none_delta INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (bucket, bucket_start, thread_id),
+            FOREIGN KEY (thread_id) REFERENCES threads (id)
+        ) WITHOUT ROWID
+    """)
+    
+    # Backfill rollups for databases created before rollups existed
+    cursor.execute("SELECT COUNT(*) FROM analytics_rollups")
+    if cursor.fetchone()[0] == 0:
+        rebuild_analytics_rollups(cursor)
+    
+    # Create resource versions table (drives HTTP ETags for read endpoints)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS resource_versions (
+            resource TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0,
+            updated_at_epoch INTEGER NOT NULL
+        )
+    """)
+    
+    # Create thread summaries table (rolling LLM summary up to last_message_id)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS thread_summaries (
+            thread_id INTEGER PRIMARY KEY,
+            summary TEXT NOT NULL,
+            last_message_id INTEGER NOT NULL,
+            message_count INTEGER NOT NULL,
+            updated_at_epoch INTEGER NOT NULL,
+            FOREIGN KEY (thread_id) REFERENCES threads (id)
+        )
+    """)
+    
+    # Create announcement artifacts table (course material prepared at ingestion, see artifacts.py)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS announcement_artifacts (
+            announcement_id INTEGER PRIMARY KEY,
+            version INTEGER NOT NULL,
+            model_family TEXT NOT NULL,
+            cleaned_text TEXT NOT NULL,
+            total_tokens INTEGER NOT NULL,
+            chunks TEXT NOT NULL,
+            created_at_epoch INTEGER NOT NULL,
+            FOREIGN KEY (announcement_id) REFERENCES announcements (id)
+        )
+    """)
+    
     # Seed teacher account if not exists
     cursor.execute("SELECT * FROM users WHERE name = 'Teacher'")
     if not cursor.fetchone():
@@ -115,25 +348,238 @@ def init_database():
     conn.commit()
     conn.close()
 
+# Resource version operations
+def _bump_versions(cursor, resources: List[str]):
+    """Increment version counters for resources changed by the current write"""
+    epoch = get_epoch_time()
+    cursor.executemany("""
+        INSERT INTO resource_versions (resource, version, updated_at_epoch) VALUES (?, 1, ?)
+        ON CONFLICT (resource) DO UPDATE SET version = version + 1, updated_at_epoch = excluded.updated_at_epoch
+    """, [(resource, epoch) for resource in resources])
+
+@metrics.timed_db
+def get_resource_versions(resources: List[str]) -> Dict[str, tuple]:
+    """Get (version, updated_at_epoch) for each resource; unseen resources are (0, 0)"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    placeholders = ", ".join("?" for _ in resources)
+    cursor.execute(
+        f"SELECT resource, version, updated_at_epoch FROM resource_versions WHERE resource IN ({placeholders})",
+        tuple(resources)
+    )
+    found = {row["resource"]: (row["version"], row["updated_at_epoch"]) for row in cursor.fetchall()}
+    conn.close()
+    return {resource: found.get(resource, (0, 0)) for resource in resources}
+
+# Analytics rollup operations
+def _bucket_start_sql(column: str, bucket: str) -> str:
+    """SQL expression mapping an epoch column to its rollup bucket start"""
+    size = ROLLUP_BUCKETS[bucket]
+    if bucket == 'day':
+        return f"((({column} + {IST_OFFSET_SECONDS}) / {size}) * {size} - {IST_OFFSET_SECONDS})"
+    return f"(({column} / {size}) * {size})"
+
+def _record_rollup(cursor, thread_id: int, epoch: int, message_count: int = 0, ai_message_count: int = 0,
+                   vote_count: int = 0, complete_delta: int = 0, partial_delta: int = 0, none_delta: int = 0):
+    """Add activity to the hour and day rollup rows containing epoch"""
+    for bucket in ROLLUP_BUCKETS:
+        cursor.execute("""
+            INSERT INTO analytics_rollups
+                (bucket, bucket_start, thread_id, message_count, ai_message_count, vote_count, complete_delta, partial_delta, none_delta)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (bucket, bucket_start, thread_id) DO UPDATE SET
+                message_count = message_count + excluded.message_count,
+                ai_message_count = ai_message_count + excluded.ai_message_count,
+                vote_count = vote_count + excluded.vote_count,
+                complete_delta = complete_delta + excluded.complete_delta,
+                partial_delta = partial_delta + excluded.partial_delta,
+                none_delta = none_delta + excluded.none_delta
+        """, (bucket, get_bucket_start(epoch, bucket), thread_id, message_count, ai_message_count,
+              vote_count, complete_delta, partial_delta, none_delta))
+
+@metrics.timed_db
+def rebuild_analytics_rollups(cursor):
+    """
+    Rebuild all rollups from the raw messages and topic_polls tables.
+    Poll history is not stored, so each current vote is counted once at its last update.
+    """
+    cursor.execute("DELETE FROM analytics_rollups")
+    for bucket in ROLLUP_BUCKETS:
+        cursor.execute(f"""
+            INSERT INTO analytics_rollups (bucket, bucket_start, thread_id, message_count, ai_message_count)
+            SELECT ?, {_bucket_start_sql('created_at_epoch', bucket)} AS bucket_start, thread_id,
+                   COUNT(*), SUM(CASE WHEN sender_type = 'ai' THEN 1 ELSE 0 END)
+            FROM messages
+            WHERE created_at_epoch IS NOT NULL
+            GROUP BY bucket_start, thread_id
+        """, (bucket,))
+        cursor.execute(f"""
+            INSERT INTO analytics_rollups (bucket, bucket_start, thread_id, vote_count, complete_delta, partial_delta, none_delta)
+            SELECT ?, {_bucket_start_sql('updated_at_epoch', bucket)} AS bucket_start, thread_id,
+                   COUNT(*),
+                   SUM(CASE WHEN understanding_level = 'complete' THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN understanding_level = 'partial' THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN understanding_level = 'none' THEN 1 ELSE 0 END)
+            FROM topic_polls
+            WHERE updated_at_epoch IS NOT NULL
+            GROUP BY bucket_start, thread_id
+            ON CONFLICT (bucket, bucket_start, thread_id) DO UPDATE SET
+                vote_count = excluded.vote_count,
+                complete_delta = excluded.complete_delta,
+                partial_delta = excluded.partial_delta,
+                none_delta = excluded.none_delta
+        """, (bucket,))
+
+@metrics.timed_db
+def get_analytics_timeseries(from_epoch: int, to_epoch: int, bucket: str = 'day',
+                             announcement_id: Optional[int] = None) -> Dict:
+    """
+    Get message activity and understanding trends per time bucket, served from rollups.
+    Cost depends on the number of buckets and threads, not on the number of messages or votes.
+    """
+    if bucket not in ROLLUP_BUCKETS:
+        raise ValueError(f"Invalid bucket '{bucket}'. Use one of: {', '.join(ROLLUP_BUCKETS)}")
+    if to_epoch < from_epoch:
+        raise ValueError("'to' must not be earlier than 'from'")
+    
+    size = ROLLUP_BUCKETS[bucket]
+    first_bucket = get_bucket_start(from_epoch, bucket)
+    last_bucket = get_bucket_start(to_epoch, bucket)
+    bucket_count = (last_bucket - first_bucket) // size + 1
+    if bucket_count > MAX_TIMESERIES_BUCKETS:
+        raise ValueError(f"Time range spans {bucket_count} buckets (max {MAX_TIMESERIES_BUCKETS}). Use a larger bucket or a shorter range.")
+    
+    thread_filter = ""
+    filter_params = ()
+    if announcement_id is not None:
+        thread_filter = "AND thread_id IN (SELECT id FROM threads WHERE announcement_id = ?)"
+        filter_params = (announcement_id,)
+    
+    conn = get_connection()
+    cursor = conn.cursor()
+    
+    # Vote totals before the window, from coarse day rollups plus hour rollups for the partial day
+    first_day = get_bucket_start(first_bucket, 'day')
+    cursor.execute(f"""
+        SELECT
+            COALESCE(SUM(complete_delta), 0) AS complete,
+            COALESCE(SUM(partial_delta), 0) AS partial,
+            COALESCE(SUM(none_delta), 0) AS none
+        FROM analytics_rollups
+        WHERE ((bucket = 'day' AND bucket_start < ?) OR (bucket = 'hour' AND bucket_start >= ? AND bucket_start < ?))
+        {thread_filter}
+    """, (first_day, first_day, first_bucket) + filter_params)
+    baseline = cursor.fetchone()
+    cumulative = {
+        'complete': baseline['complete'],
+        'partial': baseline['partial'],
+        'none': baseline['none']
+    }
+    
+    cursor.execute(f"""
+        SELECT
+            bucket_start,
+            SUM(message_count) AS message_count,
+            SUM(ai_message_count) AS ai_message_count,
+            SUM(vote_count) AS vote_count,
+            SUM(complete_delta) AS complete_delta,
+            SUM(partial_delta) AS partial_delta,
+            SUM(none_delta) AS none_delta
+        FROM analytics_rollups
+        WHERE bucket = ? AND bucket_start BETWEEN ? AND ?
+        {thread_filter}
+        GROUP BY bucket_start
+    """, (bucket, first_bucket, last_bucket) + filter_params)
+    rows = {row['bucket_start']: row for row in cursor.fetchall()}
+    conn.close()
+    
+    points = []
+    for start in range(first_bucket, last_bucket + 1, size):
+        row = rows.get(start)
+        if row:
+            cumulative['complete'] += row['complete_delta']
+            cumulative['partial'] += row['partial_delta']
+            cumulative['none'] += row['none_delta']
+        total_votes = cumulative['complete'] + cumulative['partial'] + cumulative['none']
+        understanding_rate = (cumulative['complete'] / total_votes) * 100 if total_votes > 0 else 0
+        
+        points.append({
+            'bucket_start': start,
+            'label': datetime.fromtimestamp(start, IST).strftime('%Y-%m-%d %H:%M' if bucket == 'hour' else '%Y-%m-%d'),
+            'message_count': row['message_count'] if row else 0,
+            'ai_message_count': row['ai_message_count'] if row else 0,
+            'vote_count': row['vote_count'] if row else 0,
+            'distribution': dict(cumulative),
+            'total_votes': total_votes,
+            'understanding_rate': round(understanding_rate, 1)
+        })
+    
+    return {
+        'bucket': bucket,
+        'from': first_bucket,
+        'to': last_bucket + size,
+        'announcement_id': announcement_id,
+        'points': points
+    }
+
 # Announcement operations
+@metrics.timed_db
 def create_announcement(teacher_id: int, title: str, content: str, pdf_text: Optional[str] = None, pdf_path: Optional[str] = None, pdf_filename: Optional[str] = None, has_topics: bool = False) -> int:
     """Create a new announcement"""
+    with transaction() as uow:
+        announcement = uow.add_announcement(teacher_id, title, content, pdf_text, pdf_path, pdf_filename, has_topics)
+    return announcement.id
+
+@metrics.timed_db
+def create_announcement_with_threads(teacher_id: int, title: str, content: str, topics: List[str], pdf_text: Optional[str] = None, pdf_path: Optional[str] = None, pdf_filename: Optional[str] = None, artifacts: Optional[Dict] = None, teacher_name: Optional[str] = None) -> Dict:
+    """
+    Create an announcement, a "Discussion: <topic>" thread per topic and (optionally)
+    its course artifacts in one transaction: either all of them exist afterwards or none do
+    
+    Returns:
+        {"announcement": row, "threads": [rows]} shaped like get_announcement /
+        get_threads_by_announcement, built from the inserted values
+    """
+    with transaction() as uow:
+        announcement = uow.add_announcement(
+            teacher_id, title, content, pdf_text, pdf_path, pdf_filename, has_topics=bool(topics), teacher_name=teacher_name
+        )
+        threads = uow.add_threads(announcement.id, [(f"Discussion: {topic}", topic) for topic in topics])
+        if artifacts is not None:
+            uow.save_artifacts(announcement.id, artifacts)
+    return {"announcement": announcement, "threads": threads}
+
+@metrics.timed_db
+def get_announcement(announcement_id: int) -> Optional[records.Announcement]:
+    """
+    Get announcement by ID (cached)
+    Without pdf_text, which can be megabytes per row: cache memory stays bounded by
+    entry count, and shared-cache lookups stay small. Use get_announcement_with_text for it.
+    """
+    return announcement_cache.get_or_load(announcement_id, lambda: _fetch_announcement(announcement_id))
+
+def _fetch_announcement(announcement_id: int) -> Optional[records.Announcement]:
+    """Load announcement by ID from the database (without pdf_text)"""
     conn = get_connection()
     cursor = conn.cursor()
-    ist_time = get_ist_time()
-    cursor.execute(
-        "INSERT INTO announcements (teacher_id, title, content, pdf_text, pdf_path, pdf_filename, has_topics, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-        (teacher_id, title, content, pdf_text, pdf_path, pdf_filename, has_topics, ist_time)
-    )
-    announcement_id = cursor.lastrowid
-    conn.commit()
+    cursor.row_factory = records.row_factory(records.Announcement)
+    cursor.execute("""
+        SELECT a.id, a.teacher_id, a.title, a.content, a.pdf_path, a.pdf_filename, a.has_topics, a.created_at,
+               u.name as teacher_name
+        FROM announcements a
+        LEFT JOIN users u ON a.teacher_id = u.id
+        WHERE a.id = ?
+    """, (announcement_id,))
+    row = cursor.fetchone()
     conn.close()
-    return announcement_id
+    return row
 
-def get_announcement(announcement_id: int) -> Optional[Dict]:
-    """Get announcement by ID"""
+@metrics.timed_db
+def get_announcement_with_text(announcement_id: int) -> Optional[records.Announcement]:
+    """Get announcement by ID including its extracted pdf_text (not cached)"""
     conn = get_connection()
     cursor = conn.cursor()
+    cursor.row_factory = records.row_factory(records.Announcement)
     cursor.execute("""
         SELECT a.*, u.name as teacher_name
         FROM announcements a
@@ -142,29 +588,74 @@ def get_announcement(announcement_id: int) -> Optional[Dict]:
     """, (announcement_id,))
     row = cursor.fetchone()
     conn.close()
+    return row
+
+@metrics.timed_db
+def save_announcement_artifacts(announcement_id: int, artifacts: Dict):
+    """Store (or replace) the prepared course material of an announcement"""
+    with transaction() as uow:
+        uow.save_artifacts(announcement_id, artifacts)
+
+@metrics.timed_db
+def get_announcement_artifacts(announcement_id: int) -> Optional[Dict]:
+    """
+    Get the prepared course material of an announcement
+    The chunk metadata is cached; cleaned_text (as large as the document) is read on every call
+    """
+    artifacts = artifact_cache.get_or_load(announcement_id, lambda: _fetch_announcement_artifacts(announcement_id))
+    if not artifacts:
+        return None
     
-    if row:
-        return dict(row)
-    return None
+    conn = get_connection()
+    cursor = conn.cursor()
+    # Same created_at_epoch: the text belongs to the cached chunks (not to a rebuild committed since)
+    cursor.execute(
+        "SELECT cleaned_text FROM announcement_artifacts WHERE announcement_id = ? AND created_at_epoch = ?",
+        (announcement_id, artifacts["created_at_epoch"])
+    )
+    row = cursor.fetchone()
+    conn.close()
+    if row is None:
+        return _fetch_announcement_artifacts(announcement_id, with_text=True)
+    return {**artifacts, "cleaned_text": row["cleaned_text"]}
 
-def get_all_announcements() -> List[Dict]:
-    """Get all announcements"""
+def _fetch_announcement_artifacts(announcement_id: int, with_text: bool = False) -> Optional[Dict]:
+    """Load announcement artifacts from the database (cleaned_text only if with_text)"""
+    columns = "*" if with_text else "announcement_id, version, model_family, total_tokens, chunks, created_at_epoch"
     conn = get_connection()
     cursor = conn.cursor()
+    cursor.execute(f"SELECT {columns} FROM announcement_artifacts WHERE announcement_id = ?", (announcement_id,))
+    row = cursor.fetchone()
+    conn.close()
+    if not row:
+        return None
+    artifacts = dict(row)
+    artifacts["chunks"] = json.loads(artifacts["chunks"])
+    return artifacts
+
+@metrics.timed_db
+def get_all_announcements() -> List[records.Announcement]:
+    """Get all announcements (without the extracted pdf_text, which can be megabytes per row)"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.row_factory = records.row_factory(records.Announcement)
     cursor.execute("""
-        SELECT a.*, u.name as teacher_name
+        SELECT a.id, a.teacher_id, a.title, a.content, a.pdf_path, a.pdf_filename, a.has_topics, a.created_at,
+               u.name as teacher_name
         FROM announcements a
         LEFT JOIN users u ON a.teacher_id = u.id
         ORDER BY a.created_at DESC
     """)
     rows = cursor.fetchall()
     conn.close()
-    return [dict(row) for row in rows]
+    return rows
 
-def get_threads_by_announcement(announcement_id: int) -> List[Dict]:
+@metrics.timed_db
+def get_threads_by_announcement(announcement_id: int) -> List[records.Thread]:
     """Get all threads for an announcement"""
     conn = get_connection()
     cursor = conn.cursor()
+    cursor.row_factory = records.row_factory(records.Thread)
     cursor.execute("""
         SELECT t.*, COUNT(m.id) as message_count
         FROM threads t
@@ -175,35 +666,57 @@ def get_threads_by_announcement(announcement_id: int) -> List[Dict]:
     """, (announcement_id,))
     rows = cursor.fetchall()
     conn.close()
-    return [dict(row) for row in rows]
+    return rows
 
-# Thread operations
-def create_thread(title: str, topic: str, announcement_id: int) -> int:
-    """Create a new thread linked to an announcement"""
+@metrics.timed_db
+def get_threads_for_announcements(announcement_ids: List[int]) -> Dict[int, List[records.Thread]]:
+    """Get threads for several announcements in one query, grouped by announcement ID"""
+    grouped = {announcement_id: [] for announcement_id in announcement_ids}
+    if not announcement_ids:
+        return grouped
+    
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO threads (announcement_id, title, topic) VALUES (?, ?, ?)",
-        (announcement_id, title, topic)
-    )
-    thread_id = cursor.lastrowid
-    conn.commit()
+    cursor.row_factory = records.row_factory(records.Thread)
+    placeholders = ", ".join("?" for _ in announcement_ids)
+    cursor.execute(f"""
+        SELECT t.*, COUNT(m.id) as message_count
+        FROM threads t
+        LEFT JOIN messages m ON t.id = m.thread_id
+        WHERE t.announcement_id IN ({placeholders})
+        GROUP BY t.id
+        ORDER BY t.created_at ASC
+    """, tuple(announcement_ids))
+    for row in cursor.fetchall():
+        grouped[row.announcement_id].append(row)
     conn.close()
-    return thread_id
+    return grouped
+
+# Thread operations
+@metrics.timed_db
+def create_thread(title: str, topic: str, announcement_id: int) -> int:
+    """Create a new thread linked to an announcement"""
+    with transaction() as uow:
+        thread = uow.add_threads(announcement_id, [(title, topic)])[0]
+    return thread.id
+
+@metrics.timed_db
+def get_thread(thread_id: int) -> Optional[records.Thread]:
+    """Get thread by ID (cached)"""
+    return thread_cache.get_or_load(thread_id, lambda: _fetch_thread(thread_id))
 
-def get_thread(thread_id: int) -> Optional[Dict]:
-    """Get thread by ID"""
+def _fetch_thread(thread_id: int) -> Optional[records.Thread]:
+    """Load thread by ID from the database"""
     conn = get_connection()
     cursor = conn.cursor()
+    cursor.row_factory = records.row_factory(records.Thread)
     cursor.execute("SELECT * FROM threads WHERE id = ?", (thread_id,))
     row = cursor.fetchone()
     conn.close()
-    
-    if row:
-        return dict(row)
-    return None
+    return row
 
 # User operations
+@metrics.timed_db
 def create_user(name: str, role: str, email: Optional[str] = None, phone: Optional[str] = None) -> int:
     """Create a new user"""
     conn = get_connection()
@@ -214,55 +727,65 @@ def create_user(name: str, role: str, email: Optional[str] = None, phone: Option
             (name, role, email, phone)
         )
         user_id = cursor.lastrowid
+        _bump_versions(cursor, ["analytics"])
         conn.commit()
         conn.close()
+        user_cache.invalidate(user_id)
         return user_id
     except sqlite3.IntegrityError:
         conn.close()
         raise ValueError(f"User with name '{name}' already exists")
 
-def get_user_by_name(name: str) -> Optional[Dict]:
+@metrics.timed_db
+def get_user_by_name(name: str) -> Optional[records.User]:
     """Get user by name"""
     conn = get_connection()
     cursor = conn.cursor()
+    cursor.row_factory = records.row_factory(records.User)
     cursor.execute("SELECT * FROM users WHERE name = ?", (name,))
     row = cursor.fetchone()
     conn.close()
-    
-    if row:
-        return dict(row)
-    return None
+    return row
+
+@metrics.timed_db
+def get_user_by_id(user_id: int) -> Optional[records.User]:
+    """Get user by ID (cached)"""
+    return user_cache.get_or_load(user_id, lambda: _fetch_user_by_id(user_id))
 
-def get_user_by_id(user_id: int) -> Optional[Dict]:
-    """Get user by ID"""
+def _fetch_user_by_id(user_id: int) -> Optional[records.User]:
+    """Load user by ID from the database"""
     conn = get_connection()
     cursor = conn.cursor()
+    cursor.row_factory = records.row_factory(records.User)
     cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
     row = cursor.fetchone()
     conn.close()
-    
-    if row:
-        return dict(row)
-    return None
+    return row
 
 # Message operations
+@metrics.timed_db
 def create_message(thread_id: int, sender_type: str, content: str, user_id: Optional[int] = None) -> int:
     """Create a new message"""
     conn = get_connection()
     cursor = conn.cursor()
+    epoch = get_epoch_time()
     cursor.execute(
-        "INSERT INTO messages (thread_id, user_id, sender_type, content) VALUES (?, ?, ?, ?)",
-        (thread_id, user_id, sender_type, content)
+        "INSERT INTO messages (thread_id, user_id, sender_type, content, created_at_epoch) VALUES (?, ?, ?, ?, ?)",
+        (thread_id, user_id, sender_type, content, epoch)
     )
     message_id = cursor.lastrowid
+    _record_rollup(cursor, thread_id, epoch, message_count=1, ai_message_count=1 if sender_type == "ai" else 0)
+    _bump_versions(cursor, [f"thread:{thread_id}:messages", "announcements", "analytics"])
     conn.commit()
     conn.close()
     return message_id
 
-def get_messages_by_thread(thread_id: int) -> List[Dict]:
+@metrics.timed_db
+def get_messages_by_thread(thread_id: int) -> List[records.Message]:
     """Get all messages in a thread with user information"""
     conn = get_connection()
     cursor = conn.cursor()
+    cursor.row_factory = records.row_factory(records.Message)
     cursor.execute("""
         SELECT m.*, u.name as user_name, u.role as user_role
         FROM messages m
@@ -272,17 +795,157 @@ def get_messages_by_thread(thread_id: int) -> List[Dict]:
     """, (thread_id,))
     rows = cursor.fetchall()
     conn.close()
-    return [dict(row) for row in rows]
+    return rows
+
+@metrics.timed_db
+def get_messages_after(thread_id: int, after_message_id: int, limit: Optional[int] = None) -> List[records.Message]:
+    """Get messages posted after a message id (oldest first); with limit, only the latest ones"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.row_factory = records.row_factory(records.Message)
+    cursor.execute("""
+        SELECT * FROM (
+            SELECT m.*, u.name as user_name, u.role as user_role
+            FROM messages m
+            LEFT JOIN users u ON m.user_id = u.id
+            WHERE m.thread_id = ? AND m.id > ?
+            ORDER BY m.id DESC
+            LIMIT ?
+        ) ORDER BY id ASC
+    """, (thread_id, after_message_id, -1 if limit is None else limit))
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
+
+@metrics.timed_db
+def get_recent_messages_for_threads(thread_ids: List[int], per_thread: int) -> Dict[int, List[records.Message]]:
+    """Get the latest messages of several threads in one query, grouped by thread ID (oldest first)"""
+    grouped = {thread_id: [] for thread_id in thread_ids}
+    if not thread_ids:
+        return grouped
+    
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.row_factory = records.row_factory(records.Message)
+    placeholders = ", ".join("?" for _ in thread_ids)
+    cursor.execute(f"""
+        SELECT * FROM (
+            SELECT m.*, u.name as user_name, u.role as user_role,
+                   ROW_NUMBER() OVER (PARTITION BY m.thread_id ORDER BY m.id DESC) as recency
+            FROM messages m
+            LEFT JOIN users u ON m.user_id = u.id
+            WHERE m.thread_id IN ({placeholders})
+        )
+        WHERE recency <= ?
+        ORDER BY thread_id, id ASC
+    """, (*thread_ids, per_thread))
+    for row in cursor.fetchall():
+        grouped[row.thread_id].append(row)
+    conn.close()
+    return grouped
+
+# Streaming reads
+def iter_records(sql: str, params: tuple, record_class: type, fetch_rows: int = STREAM_FETCH_ROWS) -> Iterator:
+    """
+    Yield records of a query fetchmany(fetch_rows) at a time, so memory stays
+    flat however many rows match. All rows come from one read transaction (a
+    consistent snapshot); the connection closes when the generator is exhausted
+    or closed. Consume it promptly: an open reader holds back WAL checkpoints.
+    The connection may be used from any thread, but only by one at a time.
+    """
+    conn = get_connection(check_same_thread=False)
+    try:
+        cursor = conn.cursor()
+        cursor.row_factory = records.row_factory(record_class)
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(fetch_rows)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        conn.close()
+
+def iter_thread_messages(thread_id: int, fetch_rows: int = STREAM_FETCH_ROWS) -> Iterator[records.Message]:
+    """Stream every message of a thread with user information, oldest first"""
+    return iter_records("""
+        SELECT m.*, u.name as user_name, u.role as user_role
+        FROM messages m
+        LEFT JOIN users u ON m.user_id = u.id
+        WHERE m.thread_id = ?
+        ORDER BY m.id ASC
+    """, (thread_id,), records.Message, fetch_rows)
+
+def iter_announcement_messages(announcement_id: int, fetch_rows: int = STREAM_FETCH_ROWS) -> Iterator[records.Message]:
+    """Stream every message in the threads of an announcement, by thread then oldest first"""
+    return iter_records("""
+        SELECT m.*, u.name as user_name, u.role as user_role
+        FROM threads t
+        JOIN messages m ON m.thread_id = t.id
+        LEFT JOIN users u ON m.user_id = u.id
+        WHERE t.announcement_id = ?
+        ORDER BY m.thread_id ASC, m.id ASC
+    """, (announcement_id,), records.Message, fetch_rows)
+
+# Thread summary operations
+@metrics.timed_db
+def get_thread_summary(thread_id: int) -> Dict:
+    """Get the stored summary of a thread and how many messages were posted since it"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT
+            s.summary,
+            s.last_message_id,
+            s.message_count,
+            s.updated_at_epoch,
+            (SELECT COUNT(*) FROM messages m
+             WHERE m.thread_id = ? AND m.id > COALESCE(s.last_message_id, 0)) as pending_messages
+        FROM (SELECT ? as thread_id) t
+        LEFT JOIN thread_summaries s ON s.thread_id = t.thread_id
+    """, (thread_id, thread_id))
+    row = cursor.fetchone()
+    conn.close()
+    return dict(row)
+
+@metrics.timed_db
+def save_thread_summary(thread_id: int, summary: str, last_message_id: int, new_message_count: int) -> bool:
+    """Store a summary covering messages up to last_message_id; ignored if a newer one is already stored"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO thread_summaries (thread_id, summary, last_message_id, message_count, updated_at_epoch)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (thread_id) DO UPDATE SET
+            summary = excluded.summary,
+            last_message_id = excluded.last_message_id,
+            message_count = thread_summaries.message_count + excluded.message_count,
+            updated_at_epoch = excluded.updated_at_epoch
+        WHERE excluded.last_message_id > thread_summaries.last_message_id
+    """, (thread_id, summary, last_message_id, new_message_count, get_epoch_time()))
+    saved = cursor.rowcount > 0
+    if saved:
+        _bump_versions(cursor, [f"thread:{thread_id}:summary"])
+    conn.commit()
+    conn.close()
+    return saved
 
 # Topic poll operations
+@metrics.timed_db
 def create_or_update_poll(thread_id: int, student_id: int, understanding_level: str) -> int:
     """Create or update a student's poll response for a topic"""
     conn = get_connection()
     cursor = conn.cursor()
     
+    # Timestamp taken once the write lock is held, not before waiting for it, so the
+    # vote commits within moments of its updated_at_epoch (analytics export watermarks)
+    conn.execute("BEGIN IMMEDIATE")
+    epoch = get_epoch_time()
+    deltas = {"complete_delta": 0, "partial_delta": 0, "none_delta": 0}
+    
     # Check if poll already exists
     cursor.execute(
-        "SELECT id FROM topic_polls WHERE thread_id = ? AND student_id = ?",
+        "SELECT id, understanding_level FROM topic_polls WHERE thread_id = ? AND student_id = ?",
         (thread_id, student_id)
     )
     existing = cursor.fetchone()
@@ -290,22 +953,30 @@ def create_or_update_poll(thread_id: int, student_id: int, understanding_level:
     if existing:
         # Update existing poll
         cursor.execute(
-            "UPDATE topic_polls SET understanding_level = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
-            (understanding_level, existing["id"])
+            "UPDATE topic_polls SET understanding_level = ?, updated_at = CURRENT_TIMESTAMP, updated_at_epoch = ? WHERE id = ?",
+            (understanding_level, epoch, existing["id"])
         )
         poll_id = existing["id"]
+        if existing["understanding_level"] != understanding_level:
+            deltas[f"{existing['understanding_level']}_delta"] -= 1
+            deltas[f"{understanding_level}_delta"] += 1
     else:
         # Create new poll
         cursor.execute(
-            "INSERT INTO topic_polls (thread_id, student_id, understanding_level) VALUES (?, ?, ?)",
-            (thread_id, student_id, understanding_level)
+            "INSERT INTO topic_polls (thread_id, student_id, understanding_level, created_at_epoch, updated_at_epoch) VALUES (?, ?, ?, ?, ?)",
+            (thread_id, student_id, understanding_level, epoch, epoch)
         )
         poll_id = cursor.lastrowid
+        deltas[f"{understanding_level}_delta"] += 1
+    
+    _record_rollup(cursor, thread_id, epoch, vote_count=1, **deltas)
+    _bump_versions(cursor, [f"thread:{thread_id}:poll", "analytics"])
     
     conn.commit()
     conn.close()
     return poll_id
 
+@metrics.timed_db
 def get_poll_results(thread_id: int) -> Dict:
     """Get poll results for a topic"""
     conn = get_connection()
@@ -327,6 +998,7 @@ def get_poll_results(thread_id: int) -> Dict:
     conn.close()
     return results
 
+@metrics.timed_db
 def get_student_poll(thread_id: int, student_id: int) -> Optional[str]:
     """Get a student's poll response for a topic"""
     conn = get_connection()
@@ -342,10 +1014,12 @@ def get_student_poll(thread_id: int, student_id: int) -> Optional[str]:
         return row["understanding_level"]
     return None
 
-def get_students_who_understand(thread_id: int) -> List[Dict]:
+@metrics.timed_db
+def get_students_who_understand(thread_id: int) -> List[records.User]:
     """Get list of students who understand the topic completely"""
     conn = get_connection()
     cursor = conn.cursor()
+    cursor.row_factory = records.row_factory(records.User)
     cursor.execute("""
         SELECT u.id, u.name, u.email, u.phone
         FROM topic_polls tp
@@ -355,12 +1029,14 @@ def get_students_who_understand(thread_id: int) -> List[Dict]:
     """, (thread_id,))
     rows = cursor.fetchall()
     conn.close()
-    return [dict(row) for row in rows]
+    return rows
 
-def get_students_by_understanding_level(thread_id: int, understanding_level: str) -> List[Dict]:
+@metrics.timed_db
+def get_students_by_understanding_level(thread_id: int, understanding_level: str) -> List[records.User]:
     """Get list of students who selected a specific understanding level for a topic"""
     conn = get_connection()
     cursor = conn.cursor()
+    cursor.row_factory = records.row_factory(records.User)
     cursor.execute("""
         SELECT u.id, u.name, u.email, u.phone
         FROM topic_polls tp
@@ -370,12 +1046,15 @@ def get_students_by_understanding_level(thread_id: int, understanding_level: str
     """, (thread_id, understanding_level))
     rows = cursor.fetchall()
     conn.close()
-    return [dict(row) for row in rows]
+    return rows
 
-def get_all_threads_with_polls() -> List[Dict]:
-    """Get all threads with their poll statistics"""
+@metrics.timed_db
+def get_all_threads_with_polls(announcement_id: Optional[int] = None) -> List[records.PollResult]:
+    """Get all threads (or those of one announcement) with their poll statistics"""
     conn = get_connection()
     cursor = conn.cursor()
+    cursor.row_factory = records.row_factory(records.PollResult)
+    # Messages and votes are counted separately: joining both would multiply them per thread
     cursor.execute("""
         SELECT 
             t.id,
@@ -383,158 +1062,64 @@ def get_all_threads_with_polls() -> List[Dict]:
             t.title,
             t.topic,
             t.created_at,
-            COUNT(DISTINCT m.id) as message_count,
-            COUNT(DISTINCT CASE WHEN tp.understanding_level = 'complete' THEN tp.student_id END) as complete_count,
-            COUNT(DISTINCT CASE WHEN tp.understanding_level = 'partial' THEN tp.student_id END) as partial_count,
-            COUNT(DISTINCT CASE WHEN tp.understanding_level = 'none' THEN tp.student_id END) as none_count,
-            COUNT(DISTINCT tp.student_id) as total_votes
+            (SELECT COUNT(*) FROM messages m WHERE m.thread_id = t.id) as message_count,
+            COALESCE(p.complete_count, 0) as complete_count,
+            COALESCE(p.partial_count, 0) as partial_count,
+            COALESCE(p.none_count, 0) as none_count,
+            COALESCE(p.total_votes, 0) as total_votes
         FROM threads t
-        LEFT JOIN messages m ON t.id = m.thread_id
-        LEFT JOIN topic_polls tp ON t.id = tp.thread_id
-        WHERE t.announcement_id IS NOT NULL
-        GROUP BY t.id
+        LEFT JOIN (
+            SELECT
+                thread_id,
+                COUNT(DISTINCT CASE WHEN understanding_level = 'complete' THEN student_id END) as complete_count,
+                COUNT(DISTINCT CASE WHEN understanding_level = 'partial' THEN student_id END) as partial_count,
+                COUNT(DISTINCT CASE WHEN understanding_level = 'none' THEN student_id END) as none_count,
+                COUNT(DISTINCT student_id) as total_votes
+            FROM topic_polls
+            GROUP BY thread_id
+        ) p ON p.thread_id = t.id
+        WHERE t.announcement_id IS NOT NULL AND (? IS NULL OR t.announcement_id = ?)
         ORDER BY t.created_at DESC
-    """)
+    """, (announcement_id, announcement_id))
     rows = cursor.fetchall()
     conn.close()
-    return [dict(row) for row in rows]
+    return rows
 
+@metrics.timed_db
 def get_analytics_data() -> Dict:
-    """Get comprehensive analytics data for teacher dashboard"""
+    """Get comprehensive analytics data for teacher dashboard (computed by analytics_engine)"""
     conn = get_connection()
     cursor = conn.cursor()
     
-    # Get total counts
-    cursor.execute("SELECT COUNT(DISTINCT id) FROM users WHERE role = 'student'")
-    total_students = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM announcements")
-    total_announcements = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM threads WHERE announcement_id IS NOT NULL")
-    total_threads = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(DISTINCT student_id) FROM topic_polls")
-    students_participated = cursor.fetchone()[0]
-    
-    # Get per-topic breakdown with all metrics
-    cursor.execute("""
-        SELECT 
-            t.id as thread_id,
-            t.topic,
-            t.title,
-            a.title as announcement_title,
-            a.id as announcement_id,
-            COUNT(DISTINCT m.id) as message_count,
-            COUNT(DISTINCT CASE WHEN tp.understanding_level = 'complete' THEN tp.student_id END) as complete_count,
-            COUNT(DISTINCT CASE WHEN tp.understanding_level = 'partial' THEN tp.student_id END) as partial_count,
-            COUNT(DISTINCT CASE WHEN tp.understanding_level = 'none' THEN tp.student_id END) as none_count,
-            COUNT(DISTINCT tp.student_id) as total_votes
-        FROM threads t
-        LEFT JOIN announcements a ON t.announcement_id = a.id
-        LEFT JOIN messages m ON t.id = m.thread_id
-        LEFT JOIN topic_polls tp ON t.id = tp.thread_id
-        WHERE t.announcement_id IS NOT NULL
-        GROUP BY t.id, t.topic, t.title, a.title, a.id
-        ORDER BY t.created_at DESC
-    """)
-    
-    topics_data = []
-    total_complete = 0
-    total_partial = 0
-    total_none = 0
-    total_votes = 0
-    
-    for row in cursor.fetchall():
-        topic = dict(row)
-        votes = topic['total_votes']
-        
-        # Calculate clarity score
-        if votes > 0:
-            clarity_score = (topic['complete_count'] / votes) * 100
-        else:
-            clarity_score = 0
-        
-        # Calculate participation rate
-        if total_students > 0:
-            participation_rate = (votes / total_students) * 100
-        else:
-            participation_rate = 0
+    # Each table's columns in one query; the engine does the per-topic and per-student math
+    with tracing.span("analytics.columns"):
+        cursor.execute("SELECT COUNT(*) FROM announcements")
+        total_announcements = cursor.fetchone()[0]
         
-        topic['clarity_score'] = round(clarity_score, 1)
-        topic['participation_rate'] = round(participation_rate, 1)
+        cursor.row_factory = None
+        cursor.execute("SELECT id, name FROM users WHERE role = 'student'")
+        students = cursor.fetchall()
         
-        # Determine if needs attention (clarity < 50% OR none_votes > 30% of total)
-        needs_attention = False
-        if votes > 0:
-            none_percentage = (topic['none_count'] / votes) * 100
-            if clarity_score < 50 or none_percentage > 30:
-                needs_attention = True
+        cursor.execute("""
+            SELECT t.id, t.topic, t.title, a.title, a.id
+            FROM threads t
+            LEFT JOIN announcements a ON t.announcement_id = a.id
+            WHERE t.announcement_id IS NOT NULL
+            ORDER BY t.created_at DESC
+        """)
+        topic_rows = cursor.fetchall()
         
-        topic['needs_attention'] = needs_attention
-        topics_data.append(topic)
+        cursor.execute("SELECT thread_id, COUNT(*) FROM messages GROUP BY thread_id")
+        message_counts = analytics_engine.int_columns(cursor.fetchall(), 2)
         
-        # Accumulate totals
-        total_complete += topic['complete_count']
-        total_partial += topic['partial_count']
-        total_none += topic['none_count']
-        total_votes += votes
-    
-    # Calculate overall understanding rate
-    if total_votes > 0:
-        overall_understanding_rate = (total_complete / total_votes) * 100
-    else:
-        overall_understanding_rate = 0
-    
-    # Find most and least understood topics
-    topics_with_votes = [t for t in topics_data if t['total_votes'] > 0]
-    
-    most_understood = None
-    least_understood = None
-    if topics_with_votes:
-        most_understood = max(topics_with_votes, key=lambda x: x['clarity_score'])
-        least_understood = min(topics_with_votes, key=lambda x: x['clarity_score'])
-    
-    # Find most and least active threads
-    most_active = None
-    least_active = None
-    if topics_data:
-        most_active = max(topics_data, key=lambda x: x['message_count'])
-        if len(topics_data) > 1:
-            least_active = min(topics_data, key=lambda x: x['message_count'])
-    
-    # Topics needing attention
-    topics_needing_attention = [t for t in topics_data if t['needs_attention']]
-    
-    # Calculate average participation rate
-    if topics_data:
-        avg_participation = sum(t['participation_rate'] for t in topics_data) / len(topics_data)
-    else:
-        avg_participation = 0
+        cursor.execute("""
+            SELECT thread_id, student_id,
+                   CASE understanding_level WHEN 'complete' THEN ? WHEN 'partial' THEN ? ELSE ? END
+            FROM topic_polls
+        """, (analytics_engine.COMPLETE, analytics_engine.PARTIAL, analytics_engine.NONE))
+        polls = analytics_engine.int_columns(cursor.fetchall(), 3)
     
     conn.close()
     
-    return {
-        'summary': {
-            'total_students': total_students,
-            'students_participated': students_participated,
-            'total_announcements': total_announcements,
-            'total_threads': total_threads,
-            'total_votes': total_votes,
-            'overall_understanding_rate': round(overall_understanding_rate, 1),
-            'topics_needing_attention_count': len(topics_needing_attention),
-            'avg_participation_rate': round(avg_participation, 1)
-        },
-        'topics': topics_data,
-        'topics_needing_attention': topics_needing_attention,
-        'most_understood': most_understood,
-        'least_understood': least_understood,
-        'most_active_thread': most_active,
-        'least_active_thread': least_active,
-        'overall_distribution': {
-            'complete': total_complete,
-            'partial': total_partial,
-            'none': total_none
-        }
-    }
-
+    with tracing.span("analytics.compute", topics=len(topic_rows), polls=polls.shape[1]):
+        return analytics_engine.compute_analytics(topic_rows, message_counts, polls, students, total_announcements)
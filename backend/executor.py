@@ -0,0 +1,124 @@
+"""
+Executor - Runs blocking work off the event loop
+Database calls, Ollama calls and other blocking work (PDF extraction, file IO)
+each get a bounded pool of their own, so a slow query or a queue of slow LLM
+calls cannot stall other requests; every call records queue wait and run time
+per function
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+import tracing
+
+# Configuration
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "8"))
+BLOCKING_POOL_SIZE = int(os.environ.get("BLOCKING_POOL_SIZE", "4"))
+
+# One thread per Ollama generation slot (llm_service.LLM_MAX_CONCURRENCY reads the same
+# setting): calls beyond that wait in this pool's queue, not on threads other work needs
+LLM_POOL_SIZE = int(os.environ.get("LLM_MAX_CONCURRENCY", "2"))
+
+# Number of recent samples kept per function for percentiles
+LATENCY_WINDOW = 512
+
+_db_pool = ThreadPoolExecutor(max_workers=DB_POOL_SIZE, thread_name_prefix="db")
+_blocking_pool = ThreadPoolExecutor(max_workers=BLOCKING_POOL_SIZE, thread_name_prefix="blocking")
+_llm_pool = ThreadPoolExecutor(max_workers=LLM_POOL_SIZE, thread_name_prefix="llm")
+
+
+class CallStats:
+    """Per-function latency counters (queue wait and run time, in seconds)"""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_run = 0.0
+        self.total_queue = 0.0
+        self.max_run = 0.0
+        self.max_queue = 0.0
+        self.recent_run = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, queue_time: float, run_time: float, failed: bool):
+        self.count += 1
+        self.errors += int(failed)
+        self.total_run += run_time
+        self.total_queue += queue_time
+        self.max_run = max(self.max_run, run_time)
+        self.max_queue = max(self.max_queue, queue_time)
+        self.recent_run.append(run_time)
+
+    def summary(self) -> Dict:
+        recent = sorted(self.recent_run)
+        p95 = recent[int(len(recent) * 0.95) - 1] if recent else 0.0
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "avg_run_ms": round(self.total_run / self.count * 1000, 3) if self.count else 0.0,
+            "p95_run_ms": round(p95 * 1000, 3),
+            "max_run_ms": round(self.max_run * 1000, 3),
+            "avg_queue_ms": round(self.total_queue / self.count * 1000, 3) if self.count else 0.0,
+            "max_queue_ms": round(self.max_queue * 1000, 3)
+        }
+
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _record(pool: str, func: Callable, queue_time: float, run_time: float, failed: bool):
+    key = f"{pool}:{getattr(func, '__name__', repr(func))}"
+    with _stats_lock:
+        if key not in _stats:
+            _stats[key] = CallStats()
+        _stats[key].record(queue_time, run_time, failed)
+
+
+async def _submit(pool_name: str, pool: ThreadPoolExecutor, func: Callable, *args, **kwargs) -> Any:
+    submitted = time.perf_counter()
+    # Carry context variables (request id, tracing) into the worker thread
+    context = contextvars.copy_context()
+
+    def traced_call(queue_time: float):
+        name = getattr(func, "__name__", "call")
+        with tracing.span(f"{pool_name}.{name}", queue_ms=round(queue_time * 1000, 3)):
+            return func(*args, **kwargs)
+
+    def call():
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = context.run(traced_call, started - submitted)
+            failed = False
+            return result
+        finally:
+            _record(pool_name, func, started - submitted, time.perf_counter() - started, failed)
+
+    return await asyncio.wrap_future(pool.submit(call))
+
+
+async def run_db(func: Callable, *args, **kwargs) -> Any:
+    """Run a blocking database.py function on the database pool"""
+    return await _submit("db", _db_pool, func, *args, **kwargs)
+
+
+async def run_llm(func: Callable, *args, **kwargs) -> Any:
+    """Run a llm_service function that calls Ollama on the LLM pool"""
+    return await _submit("llm", _llm_pool, func, *args, **kwargs)
+
+
+async def run_blocking(func: Callable, *args, **kwargs) -> Any:
+    """Run other blocking work (PDF extraction, artifact building, file IO) on the blocking pool"""
+    return await _submit("blocking", _blocking_pool, func, *args, **kwargs)
+
+
+def get_stats() -> Dict[str, Dict]:
+    """Get latency counters for every function run through the executors"""
+    with _stats_lock:
+        return {key: stats.summary() for key, stats in sorted(_stats.items())}
@@ -0,0 +1,95 @@
+"""
+HTTP caching helpers - ETag / Last-Modified validators and conditional GETs
+Read endpoints derive an ETag from the version counters that database.py
+bumps on every write, so unchanged resources are answered with 304 without
+rebuilding or re-serializing the payload. The ETag is weak (W/): the same
+value is sent for the identity, gzip and brotli bodies of a representation.
+Last-Modified has one-second resolution, so it is only sent (and
+If-Modified-Since only honored) once that second has passed: a second write
+within it would not change the date and the client would keep stale data.
+"""
+
+import hashlib
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Callable, Dict
+
+from fastapi import Request, Response
+
+import executor
+from serialization import FastJSONResponse
+
+# Clients may store responses but must revalidate before every reuse
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(versions: Dict[str, tuple], variant: str = "") -> str:
+    """
+    Build a weak ETag from resource versions
+
+    Args:
+        versions: Mapping of resource name to (version, updated_at_epoch)
+        variant: Extra representation key (e.g. query parameters)
+
+    Returns:
+        W/-prefixed quoted ETag value
+    """
+    key = "|".join(f"{resource}={versions[resource][0]}" for resource in sorted(versions))
+    digest = hashlib.sha1(f"{key}|{variant}".encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def _opaque_tag(tag: str) -> str:
+    """ETag without its weak prefix (If-None-Match uses weak comparison)"""
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def usable_last_modified(last_modified: int) -> int:
+    """last_modified if its second has passed (later writes get a later date), else 0"""
+    return last_modified if last_modified < int(time.time()) else 0
+
+
+def is_not_modified(request: Request, etag: str, last_modified: int) -> bool:
+    """Check If-None-Match (preferred) or If-Modified-Since against current validators"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = [_opaque_tag(tag) for tag in if_none_match.split(",")]
+        return "*" in candidates or _opaque_tag(etag) in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            return int(parsedate_to_datetime(if_modified_since).timestamp()) >= last_modified
+        except (TypeError, ValueError):
+            return False
+
+    return False
+
+
+async def conditional_json(request: Request, versions: Dict[str, tuple],
+                           build_payload: Callable[[], Any], variant: str = "") -> Response:
+    """
+    Answer a GET with 304 if the client's copy is current, otherwise build the payload
+
+    Args:
+        request: Incoming request (for If-None-Match / If-Modified-Since)
+        versions: Result of db.get_resource_versions for the resources in the payload
+        build_payload: Blocking callable, run on the database pool only when a full response is needed
+        variant: Extra representation key (e.g. query parameters)
+
+    Returns:
+        304 response or JSON response carrying ETag, Last-Modified and Cache-Control
+    """
+    etag = make_etag(versions, variant)
+    last_modified = usable_last_modified(max(updated_at for _, updated_at in versions.values()))
+
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+
+    payload = await executor.run_db(build_payload)
+    return FastJSONResponse(payload, headers=headers)
@@ -3,29 +3,74 @@ LLM Service - Handles all Ollama AI interactions
 Provides topic extraction, question answering, and thread summarization
 """
 
+import contextvars
+import hashlib
+import logging
+import os
 import requests
 import re
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Dict
+import time
 import prompts
+import artifacts
+import cache
+import coordination
+import mentions
+import metrics
+import text_processing
+import tokenizer
+import topic_candidates
+import tracing
 
 # Configuration
-OLLAMA_API_URL = "http://localhost:11434/api/generate"
+OLLAMA_API_URL = os.environ.get("OLLAMA_API_URL", "http://localhost:11434/api/generate")
 DEFAULT_MODEL = "llama3.1:8b"  # Production model - good balance of speed and quality
 
+# Context window requested from Ollama (capped by the model family's own window)
+OLLAMA_NUM_CTX = int(os.environ.get("OLLAMA_NUM_CTX", "8192"))
+
+# 'candidates': the LLM picks topics from local headings/keyphrases (map-reduce if too few),
+# 'full_text': the LLM reads the whole text with map-reduce, 'offline': topics from candidates without the LLM
+TOPIC_EXTRACTION_MODE = os.environ.get("TOPIC_EXTRACTION_MODE", "candidates")
+
+# Max concurrent Ollama generations across all workers on this host
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", "2"))
+llm_slots = coordination.ProcessSemaphore("ollama", LLM_MAX_CONCURRENCY)
+
+# Threads submitting map-step calls for one document (the calls still queue for llm_slots)
+TOPIC_MAP_WORKERS = int(os.environ.get("TOPIC_MAP_WORKERS", str(LLM_MAX_CONCURRENCY)))
+
+# Map results per chunk and reduce results per topic set, so a retry only redoes what failed
+topic_map_cache = cache.get_cache("topic_map", maxsize=4096, ttl=7 * 24 * 3600)
+topic_reduce_cache = cache.get_cache("topic_reduce", maxsize=512, ttl=7 * 24 * 3600)
+
 
 # ========================================
 # CORE OLLAMA INTERACTION
 # ========================================
 
 def get_model_response_limit(model: str) -> int:
-    """Get appropriate response length based on model size"""
-    model_lower = model.lower()
+    """Get appropriate response length (tokens) based on the model's parameter count"""
+    params_b = tokenizer.get_model_profile(model).params_b
+    if params_b is None:
+        return prompts.MODEL_RESPONSE_LIMITS[-1][1]
     
-    for size, limit in prompts.MODEL_RESPONSE_LIMITS.items():
-        if size in model_lower:
+    for min_params_b, limit in prompts.MODEL_RESPONSE_LIMITS:
+        if params_b >= min_params_b:
             return limit
     
-    return prompts.MODEL_RESPONSE_LIMITS['default']
+    return prompts.MODEL_RESPONSE_LIMITS[-1][1]
+
+
+def get_model_context_tokens(model: str) -> int:
+    """Get the context window (tokens) requested for a model"""
+    return min(OLLAMA_NUM_CTX, tokenizer.get_model_profile(model).context_tokens)
+
+
+def get_prompt_budget(model: str) -> int:
+    """Get the tokens available for a prompt: context window minus response and safety slack"""
+    return get_model_context_tokens(model) - get_model_response_limit(model) - prompts.PROMPT_SAFETY_TOKENS
 
 
 def call_ollama(prompt: str, model: str = DEFAULT_MODEL) -> str:
@@ -42,6 +87,7 @@ def call_ollama(prompt: str, model: str = DEFAULT_MODEL) -> str:
     Raises:
         Exception: If Ollama connection fails or times out
     """
+    status = "error"
     try:
         response_limit = get_model_response_limit(model)
         
@@ -51,45 +97,70 @@ def call_ollama(prompt: str, model: str = DEFAULT_MODEL) -> str:
             "stream": False,
             "options": {
                 "temperature": 0.7,
-                "num_predict": response_limit
+                "num_predict": response_limit,
+                "num_ctx": get_model_context_tokens(model)
             }
         }
+        metrics.llm_prompt_chars.observe(len(prompt), model)
         
-        response = requests.post(OLLAMA_API_URL, json=payload, timeout=120)
-        response.raise_for_status()
-        
-        result = response.json()
+        with tracing.span("llm.generate", model=model, prompt_chars=len(prompt)) as llm_span:
+            queued_at = time.perf_counter()
+            with llm_slots:
+                started_at = time.perf_counter()
+                metrics.llm_queue_time.observe(started_at - queued_at, model)
+                try:
+                    response = requests.post(OLLAMA_API_URL, json=payload, timeout=120)
+                finally:
+                    metrics.llm_duration.observe(time.perf_counter() - started_at, model)
+            response.raise_for_status()
+            
+            result = response.json()
+            metrics.record_ollama_response(model, result)
+            if llm_span:
+                llm_span.attrs.update(
+                    queue_ms=round((started_at - queued_at) * 1000, 3),
+                    prompt_tokens=result.get("prompt_eval_count"),
+                    predicted_tokens=result.get("eval_count"),
+                    generation_ms=round(result.get("eval_duration", 0) / 1e6, 3)
+                )
+        status = "ok"
         return result.get("response", "").strip()
     
     except requests.exceptions.ConnectionError:
+        status = "connection_error"
         raise Exception("Cannot connect to Ollama. Ensure it's running: ollama serve")
     except requests.exceptions.Timeout:
+        status = "timeout"
         raise Exception("Ollama request timed out. Try a faster model.")
     except Exception as e:
         raise Exception(f"Ollama error: {str(e)}")
+    finally:
+        metrics.llm_requests.inc(model, status)
 
 
 # ========================================
 # TOPIC EXTRACTION
 # ========================================
 
+_TOPIC_LINE = re.compile(r'^[\d\-\*\•]+[\.\)]\s*(.+)$')
+
+
 def parse_topics(response: str) -> List[str]:
     """Parse numbered list from LLM response"""
-    topics = []
-    lines = response.split("\n")
+    lines = [line.strip() for line in response.split("\n")]
     
+    # Match: "1. Topic" or "1) Topic" or "- Topic"
+    topics = []
     for line in lines:
-        line = line.strip()
-        # Match: "1. Topic" or "1) Topic" or "- Topic"
-        match = re.match(r'^[\d\-\*\•]+[\.\)]\s*(.+)$', line)
+        match = _TOPIC_LINE.match(line)
         if match:
             topic = match.group(1).strip()
-            if topic and len(topic) > 3:
+            if len(topic) > 3:
                 topics.append(topic)
     
     # Fallback: split by newlines if parsing failed
     if not topics:
-        topics = [line.strip() for line in lines if line.strip() and len(line.strip()) > 3]
+        topics = [line for line in lines if len(line) > 3]
     
     return topics
 
@@ -105,35 +176,150 @@ def trim_topics(topics: List[str], max_words: int = 6) -> List[str]:
     return trimmed
 
 
-def extract_topics(course_text: str) -> List[str]:
+def build_topic_prompt(candidates: List[Dict]) -> Optional[str]:
+    """
+    Topic selection prompt from local candidates, or None if there are too few
+    (or TOPIC_EXTRACTION_MODE is 'full_text') and the text should be read instead
+    """
+    if TOPIC_EXTRACTION_MODE == "full_text" or len(candidates) < prompts.MIN_TOPIC_CANDIDATES:
+        return None
+    
+    headings = [c["phrase"] for c in candidates if c["source"] == "heading"][:prompts.MAX_TOPIC_HEADINGS]
+    keyphrases = [c["phrase"] for c in candidates if c["source"] == "keyphrase"][:prompts.MAX_TOPIC_KEYPHRASES]
+    return prompts.get_topic_selection_prompt(headings, keyphrases)
+
+
+def finalize_topics(topics: List[str]) -> List[str]:
+    """Trim to 6 words each, drop duplicates (ignoring case and punctuation) and keep 2-6 topics"""
+    unique = {}
+    for topic in trim_topics(topics, max_words=6):
+        unique.setdefault(_normalize_topic(topic), topic)
+    unique.pop("", None)
+    for generic in ["Core Concepts", "Key Topics"]:
+        if len(unique) >= 2:
+            break
+        unique.setdefault(_normalize_topic(generic), generic)
+    return list(unique.values())[:6]
+
+
+def _topic_cache_key(*parts: str) -> str:
+    """Stable across processes (unlike hash()), so the shared cache backend works too"""
+    digest = hashlib.sha256("\x00".join(parts).encode("utf-8", "surrogatepass")).hexdigest()[:32]
+    return f"{DEFAULT_MODEL}:{digest}"
+
+
+def _normalize_topic(topic: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", topic.lower()).split())
+
+
+def extract_chunk_topics(chunk: str, part: int, total_parts: int) -> List[str]:
+    """Map step: topics of one chunk (cached by chunk text)"""
+    key = _topic_cache_key("map", prompts.CHUNK_TOPIC_RULES, chunk)
+    topics = topic_map_cache.get(key)
+    if topics is None:
+        response = call_ollama(prompts.get_chunk_topics_prompt(chunk, part, total_parts))
+        topics = trim_topics(parse_topics(response), max_words=6)[:4]
+        topic_map_cache.set(key, topics)
+    return topics
+
+
+def merge_chunk_topics(chunk_topics: List[List[str]]) -> List[str]:
+    """
+    Reduce step: deduplicate topics across chunks, then let the LLM merge and
+    choose 2-6 unless there are already at most 6 distinct topics
+    """
+    counts = {}
+    names = {}
+    for topics in chunk_topics:
+        for topic in dict.fromkeys(_normalize_topic(t) for t in topics):
+            if topic:
+                counts[topic] = counts.get(topic, 0) + 1
+    for topics in chunk_topics:
+        for topic in topics:
+            names.setdefault(_normalize_topic(topic), topic)
+    
+    ranked = sorted(counts, key=lambda topic: -counts[topic])[:prompts.MAX_MERGE_TOPICS]
+    if len(ranked) <= 6:
+        return [names[topic] for topic in ranked]
+    
+    key = _topic_cache_key("reduce", *sorted(ranked))
+    merged = topic_reduce_cache.get(key)
+    if merged is None:
+        lines = [f"{names[topic]} ({counts[topic]})" for topic in ranked]
+        merged = parse_topics(call_ollama(prompts.get_topic_merge_prompt(lines)))
+        topic_reduce_cache.set(key, merged)
+    return merged
+
+
+def map_reduce_topics(course_text: str) -> List[str]:
+    """
+    Topics from the whole document: chunk it, extract topics per chunk on up to
+    TOPIC_MAP_WORKERS threads, then merge. Chunks that fail are skipped (their
+    neighbours' results are cached, so a retry only redoes the failed ones);
+    raises if every chunk fails.
+    """
+    chunks = text_processing.chunk_text(course_text, prompts.TOPIC_CHUNK_LENGTH, boundary="paragraph")
+    if len(chunks) == 1:
+        key = _topic_cache_key("whole", prompts.TOPIC_EXTRACTION_RULES, chunks[0])
+        topics = topic_map_cache.get(key)
+        if topics is None:
+            topics = parse_topics(call_ollama(prompts.get_topic_extraction_prompt(chunks[0])))
+            topic_map_cache.set(key, topics)
+        return topics
+    
+    with tracing.span("topics.map", chunks=len(chunks)):
+        with ThreadPoolExecutor(max_workers=TOPIC_MAP_WORKERS, thread_name_prefix="topic-map") as pool:
+            # Each task gets its own copy of the context so spans and request ids carry over
+            futures = [
+                pool.submit(contextvars.copy_context().run, extract_chunk_topics, chunk, part, len(chunks))
+                for part, chunk in enumerate(chunks, 1)
+            ]
+            chunk_topics = []
+            errors = []
+            for future in futures:
+                try:
+                    chunk_topics.append(future.result())
+                except Exception as e:
+                    errors.append(str(e))
+    
+    if errors:
+        tracing.log_event("topics.map.failed_chunks", logging.WARNING, failed=len(errors), chunks=len(chunks), error=errors[0])
+    if not chunk_topics:
+        raise Exception(f"Topic extraction failed for all {len(chunks)} chunks: {errors[0]}")
+    
+    with tracing.span("topics.reduce", chunk_results=len(chunk_topics)):
+        return merge_chunk_topics(chunk_topics)
+
+
+def extract_topics(course_text: str, headings: Optional[List[Dict]] = None) -> List[str]:
     """
     Extract 2-6 key topics from course text
     
     Args:
         course_text: Full course text
+        headings: Headings from pdf_processor.extract_pdf ([{"text", "page"}]), if available
         
     Returns:
         List of 2-6 topic strings (2-6 words each)
     """
-    # Truncate if too long
-    truncated_text = course_text[:25000] if len(course_text) > 25000 else course_text
+    with tracing.span("topics.candidates"):
+        candidates = topic_candidates.extract_candidates(course_text, headings)
+    
+    if TOPIC_EXTRACTION_MODE == "offline":
+        return finalize_topics(topic_candidates.offline_topics(candidates))
     
     try:
-        prompt = prompts.get_topic_extraction_prompt(truncated_text)
-        response = call_ollama(prompt)
-        
-        topics = parse_topics(response)
-        topics = trim_topics(topics, max_words=6)
-        
-        # Ensure 2-6 topics
-        if len(topics) < 2:
-            topics.extend(["Core Concepts", "Key Topics"][:2 - len(topics)])
-        
-        return topics[:6]  # Max 6 topics
+        prompt = build_topic_prompt(candidates)
+        if prompt is not None:
+            topics = parse_topics(call_ollama(prompt))
+        else:
+            topics = map_reduce_topics(course_text)
+        return finalize_topics(topics)
     
     except Exception as e:
-        print(f"Error extracting topics: {str(e)}")
-        return ["Core Concepts", "Key Topics", "Main Ideas"]  # Fallback
+        tracing.log_event("topics.extract.failed", logging.WARNING, error=str(e))
+        # Ollama unavailable: best local candidates, topped up with generic names if there are too few
+        return finalize_topics(topic_candidates.offline_topics(candidates))
 
 
 # ========================================
@@ -154,12 +340,20 @@ def format_sender_name(message: Dict) -> str:
         return "Student"
 
 
-def format_thread_history(thread_history: List[Dict]) -> str:
+def format_history_line(message: Dict, model: str = DEFAULT_MODEL) -> str:
+    """Format one previous message, cut to MAX_MESSAGE_HISTORY_TOKENS"""
+    sender = format_sender_name(message)
+    content = tokenizer.TokenizedText(message["content"], model).truncate(prompts.MAX_MESSAGE_HISTORY_TOKENS)
+    return f"[{sender}]: {content}"
+
+
+def format_thread_history(thread_history: List[Dict], model: str = DEFAULT_MODEL) -> str:
     """
     Format thread history with clear attribution
     
     Args:
         thread_history: List of message dictionaries
+        model: Model whose tokenizer limits each message's length
         
     Returns:
         Formatted history string
@@ -167,15 +361,7 @@ def format_thread_history(thread_history: List[Dict]) -> str:
     if not thread_history:
         return ""
     
-    history_lines = []
-    for msg in thread_history:
-        sender = format_sender_name(msg)
-        content = msg["content"][:prompts.MAX_MESSAGE_HISTORY_LENGTH] \
-                  if len(msg["content"]) > prompts.MAX_MESSAGE_HISTORY_LENGTH \
-                  else msg["content"]
-        history_lines.append(f"[{sender}]: {content}")
-    
-    return "\n".join(history_lines)
+    return "\n".join(format_history_line(msg, model) for msg in thread_history)
 
 
 # ========================================
@@ -185,7 +371,9 @@ def format_thread_history(thread_history: List[Dict]) -> str:
 def answer_question(thread_topic: str, course_text: str, question: str, 
                    user_role: str = "student", 
                    thread_history: Optional[List[Dict]] = None,
-                   asker_name: str = "Student") -> str:
+                   asker_name: str = "Student",
+                   model: str = DEFAULT_MODEL,
+                   course_artifacts: Optional[Dict] = None) -> str:
     """
     Answer question with role-based prompt and thread history context
     
@@ -196,39 +384,22 @@ def answer_question(thread_topic: str, course_text: str, question: str,
         user_role: 'student' or 'teacher'
         thread_history: List of previous messages
         asker_name: Name of person asking
+        model: Model to answer with (also sets the prompt's token budget)
+        course_artifacts: Material prepared at ingestion (artifacts.build_artifacts);
+                          when given, course_text is not re-tokenized
         
     Returns:
         AI-generated answer
     """
     try:
-        # Truncate course text
-        truncated_text = course_text[:prompts.MAX_COURSE_TEXT_LENGTH] \
-                        if len(course_text) > prompts.MAX_COURSE_TEXT_LENGTH \
-                        else course_text
-        
-        # Get last N messages for context
-        history = thread_history[-prompts.MAX_HISTORY_MESSAGES:] \
-                 if thread_history and len(thread_history) > prompts.MAX_HISTORY_MESSAGES \
-                 else (thread_history or [])
-        
-        history_str = format_thread_history(history)
-        
-        # Generate role-appropriate prompt
-        if user_role == "teacher":
-            prompt = prompts.get_teacher_prompt(
-                truncated_text, question, history_str, thread_topic, asker_name
-            )
-        else:  # Default to student
-            prompt = prompts.get_student_prompt(
-                thread_topic, truncated_text, question, history_str, asker_name
+        with tracing.span("prompt.build", role=user_role) as build_span:
+            prompt = build_answer_prompt(
+                thread_topic, course_text, question, user_role, thread_history, asker_name, model, course_artifacts
             )
+            if build_span:
+                build_span.attrs["prompt_chars"] = len(prompt)
         
-        # Truncate if too long
-        if len(prompt) > prompts.MAX_TOTAL_PROMPT_LENGTH:
-            prompt = prompt[:prompts.MAX_TOTAL_PROMPT_LENGTH] + \
-                    "\n\n[Content truncated]\n\nYour answer:"
-        
-        response = call_ollama(prompt)
+        response = call_ollama(prompt, model)
         
         # Validate response
         if not response or len(response) < 10:
@@ -240,6 +411,78 @@ def answer_question(thread_topic: str, course_text: str, question: str,
         return f"Error: {str(e)}. Ensure Ollama is running."
 
 
+def build_answer_prompt(thread_topic: str, course_text: str, question: str,
+                        user_role: str = "student",
+                        thread_history: Optional[List[Dict]] = None,
+                        asker_name: str = "Student",
+                        model: str = DEFAULT_MODEL,
+                        course_artifacts: Optional[Dict] = None) -> str:
+    """
+    Build the role-based answer prompt within the model's token budget
+    
+    The instructions and question always fit (very long questions are cut to
+    QUESTION_BUDGET_SHARE). Previous messages come next, newest first, up to
+    HISTORY_BUDGET_SHARE; course material gets everything left. Lowest-value
+    parts are dropped first: the oldest messages, then all history if material
+    would fall below MIN_COURSE_TEXT_TOKENS, then the end of the material (or,
+    with course_artifacts, the chunks least related to the topic and question).
+    """
+    budget = get_prompt_budget(model)
+    
+    question_tokens = tokenizer.count_tokens(question, model)
+    question_budget = int(budget * prompts.QUESTION_BUDGET_SHARE)
+    if question_tokens > question_budget:
+        question = tokenizer.TokenizedText(question, model).truncate(question_budget)
+    
+    # Generate role-appropriate prompt
+    def render(material: str, history_str: str) -> str:
+        if user_role == "teacher":
+            return prompts.get_teacher_prompt(material, question, history_str, thread_topic, asker_name)
+        return prompts.get_student_prompt(thread_topic, material, question, history_str, asker_name)
+    
+    fixed_tokens = tokenizer.count_tokens(render("", ""), model)
+    available = budget - fixed_tokens
+    
+    # Previous messages, newest first, while they fit the history share
+    history_str = ""
+    history_tokens = 0
+    history = (thread_history or [])[-prompts.MAX_HISTORY_MESSAGES:]
+    history_budget = min(int(budget * prompts.HISTORY_BUDGET_SHARE), available - prompts.MIN_COURSE_TEXT_TOKENS)
+    if history and history_budget > 0:
+        # The history section adds its own framing text once
+        section_tokens = tokenizer.count_tokens(render("", "-"), model) - fixed_tokens
+        used = section_tokens
+        selected = []
+        for msg in reversed(history):
+            line = format_history_line(msg, model)
+            cost = tokenizer.count_tokens(line, model) + 1
+            if used + cost > history_budget:
+                break
+            selected.append(line)
+            used += cost
+        if selected:
+            history_str = "\n".join(reversed(selected))
+            history_tokens = used
+    
+    # Course material gets the rest
+    material_budget = available - history_tokens
+    if course_artifacts is not None:
+        material_text = artifacts.select_material(
+            course_artifacts, material_budget, f"{thread_topic} {question}", model
+        )
+        return render(material_text, history_str)
+    
+    # Without artifacts, cut at a paragraph or sentence boundary
+    material = tokenizer.tokenize(course_text, model)
+    if material.tokens > material_budget:
+        marker = "\n\n[Course material truncated]"
+        material_text = material.truncate(material_budget - tokenizer.count_tokens(marker, model)) + marker
+    else:
+        material_text = course_text
+    
+    return render(material_text, history_str)
+
+
 # ========================================
 # @AI MENTION DETECTION
 # ========================================
@@ -254,20 +497,29 @@ def should_ai_respond(message: str) -> bool:
     Returns:
         True if @AI mentioned, False otherwise
     """
-    message_lower = message.lower()
-    return any(trigger in message_lower for trigger in prompts.AI_TRIGGERS)
+    return mentions.parse_message(message).mentions_ai
 
 
 # ========================================
 # THREAD SUMMARIZATION
 # ========================================
 
+def format_summary_messages(messages: List[Dict]) -> str:
+    """Format messages as 'Sender: content' lines, shortened for summarization"""
+    conversation_lines = []
+    for msg in messages:
+        sender = format_sender_name(msg)
+        content = msg["content"][:prompts.MAX_SUMMARY_MESSAGE_LENGTH]
+        conversation_lines.append(f"{sender}: {content}")
+    return "\n".join(conversation_lines)
+
+
 def summarize_thread(messages: List[Dict]) -> str:
     """
     Generate summary of thread messages
     
     Args:
-        messages: List of message dictionaries
+        messages: List of message dictionaries (oldest first)
         
     Returns:
         Summary text
@@ -275,14 +527,8 @@ def summarize_thread(messages: List[Dict]) -> str:
     if not messages:
         return "No messages in this thread yet."
     
-    # Format messages for summary (limit to last 10)
-    conversation_lines = []
-    for msg in messages[:10]:
-        sender = format_sender_name(msg)
-        content = msg["content"][:200]  # Shorter for summary
-        conversation_lines.append(f"{sender}: {content}")
-    
-    conversation_text = "\n".join(conversation_lines)
+    # Format the latest 10 messages for summary
+    conversation_text = format_summary_messages(messages[-10:])
     
     try:
         prompt = prompts.get_summarization_prompt(conversation_text)
@@ -290,3 +536,109 @@ def summarize_thread(messages: List[Dict]) -> str:
         return response if response else "Unable to generate summary."
     except Exception as e:
         return f"Summary unavailable: {str(e)}"
+
+
+def update_thread_summary(previous_summary: Optional[str], new_messages: List[Dict]) -> str:
+    """
+    Fold messages posted since the last summary into it (summary + delta -> new summary)
+    
+    Args:
+        previous_summary: Stored summary, or None for the first summary of a thread
+        new_messages: Messages after the summarized ones (oldest first, at most
+                      MAX_SUMMARY_DELTA_MESSAGES are used)
+        
+    Returns:
+        Updated summary text
+        
+    Raises:
+        Exception: If Ollama fails or returns an empty summary (nothing should be stored)
+    """
+    conversation_text = format_summary_messages(new_messages[-prompts.MAX_SUMMARY_DELTA_MESSAGES:])
+    
+    with tracing.span("prompt.build", kind="summary", incremental=previous_summary is not None):
+        if previous_summary:
+            prompt = prompts.get_incremental_summarization_prompt(previous_summary, conversation_text)
+        else:
+            prompt = prompts.get_summarization_prompt(conversation_text)
+    
+    response = call_ollama(prompt)
+    if not response:
+        raise Exception("Empty summary from AI model")
+    return response
+
+
+# ========================================
+# TEACHER DIGEST (BATCHED SUMMARIES)
+# ========================================
+
+def pack_digest_batches(threads: List[Dict], max_prompt_length: int = prompts.MAX_TOTAL_PROMPT_LENGTH) -> List[List[Dict]]:
+    """
+    Pack threads' condensed histories into as few prompts as fit the length budget
+    
+    Args:
+        threads: Dicts with thread_id, topic and messages (oldest first)
+        max_prompt_length: Character budget per prompt
+        
+    Returns:
+        Batches of threads, each with a "section" (its part of the prompt) added
+    """
+    budget = max_prompt_length - len(prompts.get_digest_prompt([]))
+    batches = []
+    current = []
+    used = 0
+    
+    for thread in threads:
+        conversation_text = format_summary_messages(thread["messages"][-prompts.MAX_DIGEST_MESSAGES_PER_THREAD:])
+        section = prompts.get_digest_section(thread["thread_id"], thread["topic"], conversation_text)
+        # A single oversized thread gets a prompt of its own, cut to fit
+        section = section[:budget]
+        cost = len(section) + 2  # blank line between sections
+        
+        if current and used + cost > budget:
+            batches.append(current)
+            current = []
+            used = 0
+        current.append({**thread, "section": section})
+        used += cost
+    
+    if current:
+        batches.append(current)
+    return batches
+
+
+def parse_digest(response: str, thread_ids: List[int]) -> Dict[int, str]:
+    """Parse '[Thread <id>] summary' lines; lines following a header belong to it"""
+    wanted = set(thread_ids)
+    summaries = {}
+    current_id = None
+    
+    for line in response.split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+        match = re.match(r'^[\*\-\s]*\[?\s*Thread\s+(\d+)\s*\]?[\*:\-\u2013\s]*(.*)$', line, re.IGNORECASE)
+        if match:
+            thread_id = int(match.group(1))
+            current_id = thread_id if thread_id in wanted else None
+            if current_id is not None:
+                summaries[current_id] = match.group(2).strip()
+        elif current_id is not None:
+            summaries[current_id] = f"{summaries[current_id]} {line}".strip()
+    
+    return {thread_id: summary for thread_id, summary in summaries.items() if summary}
+
+
+def summarize_digest_batch(batch: List[Dict]) -> Dict[int, str]:
+    """
+    Summarize a packed batch of threads with one Ollama call
+    
+    Args:
+        batch: One element of pack_digest_batches()
+        
+    Returns:
+        Summary per thread id (threads the model skipped are missing)
+    """
+    with tracing.span("prompt.build", kind="digest", threads=len(batch)):
+        prompt = prompts.get_digest_prompt([thread["section"] for thread in batch])
+    response = call_ollama(prompt)
+    return parse_digest(response, [thread["thread_id"] for thread in batch])
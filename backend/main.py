@@ -1,17 +1,32 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Form
+from fastapi import FastAPI, UploadFile, File, HTTPException, Form, Query, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
+import asyncio
+import hmac
+import itertools
+import logging
 import os
 import shutil
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
 import database as db
+import cache
+import executor
+import http_cache
+import metrics
+import serialization
+import tracing
+import profiler
+import query_stats
 import pdf_processor
 import llm_service
+import artifacts
+import mentions
+import prompts
 
 # Initialize FastAPI app
-app = FastAPI(title="IITGN Discussion Forum API", version="1.0.0")
+app = FastAPI(title="IITGN Discussion Forum API", version="1.0.0", default_response_class=serialization.FastJSONResponse)
 
 # Create uploads directory if it doesn't exist
 UPLOAD_DIR = "uploaded_pdfs"
@@ -24,14 +39,64 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified"],
 )
 
+# Compress large JSON payloads (announcements, thread messages, analytics)
+serialization.add_compression(app)
+
+# Record per-route latency and status codes
+app.add_middleware(metrics.MetricsMiddleware)
+
+# Save stack profiles of requests slower than PROFILE_SLOW_REQUEST_MS (needs the trace, so sits inside it)
+app.add_middleware(profiler.SlowRequestMiddleware)
+
+# Assign a request id and collect span timings (outermost, so the whole request is traced)
+app.add_middleware(tracing.TracingMiddleware)
+tracing.configure_logging()
+
+def cache_metrics() -> List[str]:
+    """Expose cache hit/miss counters on /metrics"""
+    lines = []
+    for field in ("hits", "misses"):
+        name = f"cache_{field}_total"
+        lines += [f"# HELP {name} Lookup cache {field}", f"# TYPE {name} counter"]
+        for cache_name, stats in cache.get_all_stats().items():
+            lines.append(f'{name}{{cache="{cache_name}"}} {stats.get(field, 0)}')
+    return lines
+
+metrics.register_collector(cache_metrics)
+
+# Refresh a thread's stored summary once this many messages arrive after it
+SUMMARY_REFRESH_MESSAGES = int(os.environ.get("SUMMARY_REFRESH_MESSAGES", "5"))
+
+# Teacher digest: concurrent batch prompts, and summaries cached per (thread, last message id)
+DIGEST_CONCURRENCY = int(os.environ.get("DIGEST_CONCURRENCY", "2"))
+digest_cache = cache.get_cache("digest", maxsize=2048, ttl=7 * 24 * 3600)
+
+# Export formats: one JSON document, or NDJSON (a header line, then one line per message)
+EXPORT_MEDIA_TYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson"
+}
+
+# Admin endpoints (profiler, query/cache/executor stats, /metrics) need this value in the X-Admin-Token header; unset disables them
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+ADMIN_TOKEN_HEADER = "x-admin-token"
+
+# Server configuration (WORKERS > 1 enables the multi-worker production mode)
+HOST = os.environ.get("HOST", "0.0.0.0")
+PORT = int(os.environ.get("PORT", "8000"))
+WORKERS = int(os.environ.get("WORKERS", "1"))
+
 # Initialize database on startup
 @app.on_event("startup")
 async def startup_event():
-    db.init_database()
-    print("✅ Database initialized")
-    print("✅ Server ready and accepting connections from all network interfaces")
+    # In multi-worker mode the launcher has already initialized the database once
+    if os.environ.get("FORUM_STARTUP_DONE") != "1":
+        db.init_database()
+        tracing.log_event("database.initialized")
+    tracing.log_event("server.ready", pid=os.getpid(), host=HOST, port=PORT)
 
 # Pydantic models
 class LoginRequest(BaseModel):
@@ -85,6 +150,11 @@ class PollVoteRequest(BaseModel):
     student_id: int
     understanding_level: str
 
+def save_upload(file: UploadFile, path: str):
+    """Copy an uploaded file to disk (blocking; run on the executor)"""
+    with open(path, "wb") as buffer:
+        shutil.copyfileobj(file.file, buffer)
+
 # API Endpoints
 
 @app.get("/")
@@ -104,7 +174,7 @@ async def login(request: LoginRequest):
     Login endpoint - checks if user exists and returns user data
     """
     try:
-        user = db.get_user_by_name(request.name)
+        user = await executor.run_db(db.get_user_by_name, request.name)
         
         if not user:
             raise HTTPException(status_code=404, detail="User not found. Please sign up first.")
@@ -142,13 +212,13 @@ async def signup(request: SignupRequest):
             raise HTTPException(status_code=400, detail="Please provide a valid phone number (at least 10 digits)")
         
         # Create new student user
-        user_id = db.create_user(
+        user_id = await executor.run_db(db.create_user,
             request.name.strip(), 
             "student", 
             email=request.email.strip(),
             phone=request.phone.strip()
         )
-        user = db.get_user_by_id(user_id)
+        user = await executor.run_db(db.get_user_by_id, user_id)
         
         return {
             "success": True,
@@ -170,7 +240,7 @@ async def get_user(name: str):
     Check if user exists by name
     """
     try:
-        user = db.get_user_by_name(name)
+        user = await executor.run_db(db.get_user_by_name, name)
         
         if not user:
             return {"exists": False}
@@ -196,12 +266,12 @@ async def create_announcement(request: CreateAnnouncementRequest):
     """
     try:
         # Verify teacher exists
-        user = db.get_user_by_id(request.teacher_id)
+        user = await executor.run_db(db.get_user_by_id, request.teacher_id)
         if not user or user["role"] != "teacher":
             raise HTTPException(status_code=403, detail="Only teachers can create announcements")
         
         # Create announcement
-        announcement_id = db.create_announcement(
+        announcement_id = await executor.run_db(db.create_announcement,
             teacher_id=request.teacher_id,
             title=request.title,
             content=request.content,
@@ -209,7 +279,7 @@ async def create_announcement(request: CreateAnnouncementRequest):
             has_topics=False
         )
         
-        announcement = db.get_announcement(announcement_id)
+        announcement = await executor.run_db(db.get_announcement_with_text, announcement_id)
         
         return {
             "success": True,
@@ -221,6 +291,23 @@ async def create_announcement(request: CreateAnnouncementRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating announcement: {str(e)}")
 
+async def load_course_artifacts(announcement_id: int, pdf_text: str) -> dict:
+    """
+    Get an announcement's prepared course material, (re)building it if missing or
+    produced by an older pipeline version
+    """
+    stored = await executor.run_db(db.get_announcement_artifacts, announcement_id)
+    if artifacts.is_current(stored, llm_service.DEFAULT_MODEL):
+        return stored
+    
+    built = await executor.run_blocking(artifacts.build_artifacts, pdf_text, llm_service.DEFAULT_MODEL)
+    await executor.run_db(db.save_announcement_artifacts, announcement_id, built)
+    tracing.log_event(
+        "artifacts.built", announcement_id=announcement_id, version=built["version"],
+        chunks=len(built["chunks"]), tokens=built["total_tokens"], rebuilt=stored is not None
+    )
+    return built
+
 @app.post("/api/announcements/with-pdf")
 async def create_announcement_with_pdf(
     teacher_id: int = Form(...),
@@ -233,7 +320,7 @@ async def create_announcement_with_pdf(
     """
     try:
         # Verify teacher exists
-        user = db.get_user_by_id(teacher_id)
+        user = await executor.run_db(db.get_user_by_id, teacher_id)
         if not user or user["role"] != "teacher":
             raise HTTPException(status_code=403, detail="Only teachers can create announcements")
         
@@ -243,55 +330,61 @@ async def create_announcement_with_pdf(
         
         # Save uploaded file temporarily for processing
         temp_file_path = f"temp_{file.filename}"
-        with open(temp_file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        await executor.run_blocking(save_upload, file, temp_file_path)
         
         # Extract text from PDF
-        print(f"📄 Extracting text from {file.filename}...")
-        pdf_text = pdf_processor.extract_text_from_pdf(temp_file_path)
+        tracing.log_event("pdf.extract.start", filename=file.filename)
+        extracted = await executor.run_blocking(pdf_processor.extract_pdf, temp_file_path)
+        pdf_text = extracted.text
+        tracing.log_event(
+            "pdf.extracted", backend=extracted.backend, pages=len(extracted.pages),
+            headings=len(extracted.headings), duration_ms=round(extracted.seconds * 1000, 1)
+        )
         
         if not pdf_text or len(pdf_text) < 100:
             os.remove(temp_file_path)
             raise HTTPException(status_code=400, detail="PDF appears to be empty or text could not be extracted")
         
         # Extract topics using LLM
-        print("🤖 Extracting topics with AI...")
-        topics = llm_service.extract_topics(pdf_text)
-        print(f"✅ Extracted {len(topics)} topics")
+        tracing.log_event("topics.extract.start", text_chars=len(pdf_text))
+        topics = await executor.run_llm(llm_service.extract_topics, pdf_text, extracted.headings)
+        tracing.log_event("topics.extracted", count=len(topics))
         
         # Save PDF permanently
         import time
         timestamp = int(time.time())
         safe_filename = f"{timestamp}_{file.filename}"
         pdf_path = os.path.join(UPLOAD_DIR, safe_filename)
-        shutil.move(temp_file_path, pdf_path)
-        print(f"✅ PDF saved to {pdf_path}")
-        
-        # Create announcement with PDF info
-        announcement_id = db.create_announcement(
-            teacher_id=teacher_id,
-            title=title,
-            content=content,
-            pdf_text=pdf_text,
-            pdf_path=pdf_path,
-            pdf_filename=file.filename,
-            has_topics=True
-        )
-        
-        # Create threads for each topic
-        thread_ids = []
-        for i, topic in enumerate(topics, 1):
-            thread_id = db.create_thread(
-                title=f"Discussion: {topic}",
-                topic=topic,
-                announcement_id=announcement_id
+        await executor.run_blocking(shutil.move, temp_file_path, pdf_path)
+        tracing.log_event("pdf.saved", path=pdf_path)
+        
+        # Prepare cleaned, chunked and token-counted material for answer prompts
+        built = await executor.run_blocking(artifacts.build_artifacts, pdf_text, llm_service.DEFAULT_MODEL)
+        
+        # Announcement, one thread per topic and artifacts in one transaction
+        try:
+            created = await executor.run_db(db.create_announcement_with_threads,
+                teacher_id=teacher_id,
+                title=title,
+                content=content,
+                topics=topics,
+                pdf_text=pdf_text,
+                pdf_path=pdf_path,
+                pdf_filename=file.filename,
+                artifacts=built,
+                teacher_name=user["name"]
             )
-            thread_ids.append(thread_id)
-        
-        print(f"✅ Created {len(thread_ids)} threads for announcement")
-        
-        announcement = db.get_announcement(announcement_id)
-        threads = db.get_threads_by_announcement(announcement_id)
+        except Exception:
+            # Nothing references the saved PDF if the transaction rolled back
+            await executor.run_blocking(os.remove, pdf_path)
+            raise
+        announcement = created["announcement"]
+        threads = created["threads"]
+        
+        tracing.log_event(
+            "threads.created", announcement_id=announcement["id"], count=len(threads),
+            artifact_chunks=len(built["chunks"])
+        )
         
         return {
             "success": True,
@@ -306,22 +399,26 @@ async def create_announcement_with_pdf(
         raise HTTPException(status_code=500, detail=f"Error creating announcement with PDF: {str(e)}")
 
 @app.get("/api/announcements")
-async def get_announcements():
+async def get_announcements(request: Request):
     """
     Get all announcements
+    Supports conditional GET via If-None-Match
     """
     try:
-        announcements = db.get_all_announcements()
-        
-        # For each announcement, get its threads if it has topics
-        for announcement in announcements:
-            if announcement.get("has_topics"):
-                threads = db.get_threads_by_announcement(announcement["id"])
-                announcement["threads"] = threads
-            else:
-                announcement["threads"] = []
+        def build_payload():
+            announcements = db.get_all_announcements()
+            
+            # Fetch threads for all announcements with topics in one query
+            threads_by_announcement = db.get_threads_for_announcements(
+                [announcement["id"] for announcement in announcements if announcement.get("has_topics")]
+            )
+            return {"announcements": [
+                {**announcement, "threads": threads_by_announcement.get(announcement.id, [])}
+                for announcement in announcements
+            ]}
         
-        return {"announcements": announcements}
+        versions = await executor.run_db(db.get_resource_versions, ["announcements"])
+        return await http_cache.conditional_json(request, versions, build_payload)
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching announcements: {str(e)}")
@@ -332,18 +429,16 @@ async def get_announcement(announcement_id: int):
     Get a specific announcement
     """
     try:
-        announcement = db.get_announcement(announcement_id)
+        announcement = await executor.run_db(db.get_announcement_with_text, announcement_id)
         if not announcement:
             raise HTTPException(status_code=404, detail="Announcement not found")
         
         # Get threads if announcement has topics
-        if announcement.get("has_topics"):
-            threads = db.get_threads_by_announcement(announcement_id)
-            announcement["threads"] = threads
-        else:
-            announcement["threads"] = []
+        threads = []
+        if announcement.has_topics:
+            threads = await executor.run_db(db.get_threads_by_announcement, announcement_id)
         
-        return {"announcement": announcement}
+        return {"announcement": {**announcement, "threads": threads}}
     
     except HTTPException:
         raise
@@ -357,7 +452,7 @@ async def get_pdf(announcement_id: int, download: bool = False):
     download=true for download, false for inline viewing
     """
     try:
-        announcement = db.get_announcement(announcement_id)
+        announcement = await executor.run_db(db.get_announcement, announcement_id)
         if not announcement:
             raise HTTPException(status_code=404, detail="Announcement not found")
         
@@ -402,12 +497,16 @@ async def upload_course(file: UploadFile = File(...)):
         
         # Save uploaded file temporarily
         temp_file_path = f"temp_{file.filename}"
-        with open(temp_file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        await executor.run_blocking(save_upload, file, temp_file_path)
         
         # Extract text from PDF
-        print(f"📄 Extracting text from {file.filename}...")
-        pdf_text = pdf_processor.extract_text_from_pdf(temp_file_path)
+        tracing.log_event("pdf.extract.start", filename=file.filename)
+        extracted = await executor.run_blocking(pdf_processor.extract_pdf, temp_file_path)
+        pdf_text = extracted.text
+        tracing.log_event(
+            "pdf.extracted", backend=extracted.backend, pages=len(extracted.pages),
+            headings=len(extracted.headings), duration_ms=round(extracted.seconds * 1000, 1)
+        )
         
         if not pdf_text or len(pdf_text) < 100:
             os.remove(temp_file_path)
@@ -418,25 +517,25 @@ async def upload_course(file: UploadFile = File(...)):
         
         # Create course in database
         course_name = file.filename.replace('.pdf', '')
-        course_id = db.create_course(course_name, pdf_text)
-        print(f"✅ Course created with ID: {course_id}")
+        course_id = await executor.run_db(db.create_course, course_name, pdf_text)
+        tracing.log_event("course.created", course_id=course_id)
         
         # Extract topics using LLM
-        print("🤖 Extracting topics with AI...")
-        topics = llm_service.extract_topics(pdf_text)
-        print(f"✅ Extracted {len(topics)} topics")
+        tracing.log_event("topics.extract.start", text_chars=len(pdf_text))
+        topics = await executor.run_llm(llm_service.extract_topics, pdf_text, extracted.headings)
+        tracing.log_event("topics.extracted", count=len(topics))
         
         # Create threads for each topic
         thread_ids = []
         for i, topic in enumerate(topics, 1):
-            thread_id = db.create_thread(
+            thread_id = await executor.run_db(db.create_thread,
                 course_id=course_id,
                 title=f"Discussion: {topic}",
                 topic=topic
             )
             thread_ids.append(thread_id)
         
-        print(f"✅ Created {len(thread_ids)} threads")
+        tracing.log_event("threads.created", course_id=course_id, count=len(thread_ids))
         
         return {
             "course_id": course_id,
@@ -458,12 +557,12 @@ async def get_course_threads(course_id: int):
     """
     try:
         # Verify course exists
-        course = db.get_course(course_id)
+        course = await executor.run_db(db.get_course, course_id)
         if not course:
             raise HTTPException(status_code=404, detail="Course not found")
         
         # Get threads
-        threads = db.get_threads_by_course(course_id)
+        threads = await executor.run_db(db.get_threads_by_course, course_id)
         
         return {
             "course_id": course_id,
@@ -477,25 +576,30 @@ async def get_course_threads(course_id: int):
         raise HTTPException(status_code=500, detail=f"Error fetching threads: {str(e)}")
 
 @app.get("/api/threads/{thread_id}/messages")
-async def get_thread_messages(thread_id: int):
+async def get_thread_messages(thread_id: int, request: Request):
     """
     Get all messages in a specific thread
+    Supports conditional GET via If-None-Match
     """
     try:
         # Verify thread exists
-        thread = db.get_thread(thread_id)
+        thread = await executor.run_db(db.get_thread, thread_id)
         if not thread:
             raise HTTPException(status_code=404, detail="Thread not found")
         
-        # Get messages
-        messages = db.get_messages_by_thread(thread_id)
+        def build_payload():
+            # Get messages
+            messages = db.get_messages_by_thread(thread_id)
+            
+            return {
+                "thread_id": thread_id,
+                "thread_title": thread["title"],
+                "thread_topic": thread["topic"],
+                "messages": messages
+            }
         
-        return {
-            "thread_id": thread_id,
-            "thread_title": thread["title"],
-            "thread_topic": thread["topic"],
-            "messages": messages
-        }
+        versions = await executor.run_db(db.get_resource_versions, [f"thread:{thread_id}:messages"])
+        return await http_cache.conditional_json(request, versions, build_payload)
     
     except HTTPException:
         raise
@@ -509,86 +613,184 @@ async def ask_question(thread_id: int, request: AskQuestionRequest):
     """
     try:
         # Verify thread exists
-        thread = db.get_thread(thread_id)
+        thread = await executor.run_db(db.get_thread, thread_id)
         if not thread:
             raise HTTPException(status_code=404, detail="Thread not found")
         
         # Get user information
-        user = db.get_user_by_id(request.user_id)
+        user = await executor.run_db(db.get_user_by_id, request.user_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
         # Save user's message
-        user_msg_id = db.create_message(
+        user_msg_id = await executor.run_db(db.create_message,
             thread_id=thread_id,
             user_id=user["id"],
             sender_type=user["role"],
             content=request.question
         )
-        print(f"💬 {user['name']} ({user['role']}) message saved (ID: {user_msg_id})")
         
-        # Check if AI should respond (if @AI is mentioned)
-        should_respond = llm_service.should_ai_respond(request.question)
+        # Find @AI / @command mentions and the question without them in one pass
+        parsed = mentions.parse_message(request.question)
+        tracing.log_event("message.saved", thread_id=thread_id, user=user["name"], role=user["role"],
+                          message_id=user_msg_id, commands=list(parsed.commands))
         
         ai_msg_id = None
-        if should_respond:
+        if parsed.mentions_ai:
             # Get PDF text from announcement
             if not thread.get("announcement_id"):
                 raise HTTPException(status_code=404, detail="No announcement linked to this thread")
             
-            announcement = db.get_announcement(thread["announcement_id"])
+            announcement = await executor.run_db(db.get_announcement_with_text, thread["announcement_id"])
             if not announcement or not announcement.get("pdf_text"):
                 raise HTTPException(status_code=404, detail="No course material found for this topic")
             
             pdf_text = announcement["pdf_text"]
+            course_artifacts = await load_course_artifacts(announcement["id"], pdf_text)
             
             # Get thread history (last 10 messages for context)
-            all_messages = db.get_messages_by_thread(thread_id)
+            all_messages = await executor.run_db(db.get_messages_by_thread, thread_id)
             thread_history = all_messages[-10:] if len(all_messages) > 10 else all_messages
             
-            # Remove @AI mention from the question for cleaner processing
-            clean_question = request.question
-            for trigger in ['@AI', '@ai', '@ AI', '@ ai']:
-                clean_question = clean_question.replace(trigger, '').strip()
-            
             # Generate AI answer with role-based prompt
-            print(f"🤖 @AI mentioned - Generating AI response for {user['name']}...")
-            ai_answer = llm_service.answer_question(
+            tracing.log_event("ai.answer.start", thread_id=thread_id, user=user["name"], history_messages=len(thread_history))
+            ai_answer = await executor.run_llm(
+                llm_service.answer_question,
                 thread_topic=thread["topic"],
                 course_text=pdf_text,
-                question=clean_question,
+                question=parsed.question,
                 user_role=user["role"],
                 thread_history=thread_history,
-                asker_name=user["name"]
+                asker_name=user["name"],
+                course_artifacts=course_artifacts
             )
             
             # Save AI response (no user_id for AI messages)
-            ai_msg_id = db.create_message(
+            ai_msg_id = await executor.run_db(db.create_message,
                 thread_id=thread_id,
                 user_id=None,
                 sender_type="ai",
                 content=ai_answer
             )
-            print(f"✅ AI response saved (ID: {ai_msg_id})")
+            tracing.log_event("ai.answer.saved", thread_id=thread_id, message_id=ai_msg_id)
         else:
-            print(f"📝 No @AI mention - message posted without AI response")
+            tracing.log_event("ai.answer.skipped", thread_id=thread_id, reason="no @AI mention")
+        
+        # Keep the thread summary current without summarizing on every message
+        stored_summary = await executor.run_db(db.get_thread_summary, thread_id)
+        if stored_summary["pending_messages"] >= SUMMARY_REFRESH_MESSAGES:
+            schedule_summary_refresh(thread_id)
         
         # Get updated messages
-        messages = db.get_messages_by_thread(thread_id)
+        messages = await executor.run_db(db.get_messages_by_thread, thread_id)
         
-        return {
+        return serialization.FastJSONResponse({
             "success": True,
             "user_message_id": user_msg_id,
             "ai_message_id": ai_msg_id,
-            "ai_responded": should_respond,
+            "ai_responded": parsed.mentions_ai,
             "messages": messages
-        }
+        })
     
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing message: {str(e)}")
 
+# Thread Summary Endpoints
+
+# Threads with a summary refresh running in this process, and the tasks themselves
+_summary_refreshing = set()
+_summary_tasks = set()
+
+async def refresh_thread_summary(thread_id: int):
+    """
+    Fold messages posted since the stored summary into it and save the result
+    After a backlog only the latest MAX_SUMMARY_DELTA_MESSAGES are folded in (and
+    counted as summarized); older pending messages are skipped
+    """
+    try:
+        stored = await executor.run_db(db.get_thread_summary, thread_id)
+        if not stored["pending_messages"]:
+            return
+        new_messages = await executor.run_db(
+            db.get_messages_after, thread_id, stored["last_message_id"] or 0,
+            limit=prompts.MAX_SUMMARY_DELTA_MESSAGES
+        )
+        summary = await executor.run_llm(llm_service.update_thread_summary, stored["summary"], new_messages)
+        await executor.run_db(
+            db.save_thread_summary, thread_id, summary, new_messages[-1]["id"], len(new_messages)
+        )
+        tracing.log_event("summary.updated", thread_id=thread_id, new_messages=len(new_messages),
+                          skipped_messages=max(stored["pending_messages"] - len(new_messages), 0))
+    except Exception as e:
+        tracing.log_event("summary.failed", logging.WARNING, thread_id=thread_id, error=str(e))
+    finally:
+        _summary_refreshing.discard(thread_id)
+
+def schedule_summary_refresh(thread_id: int) -> bool:
+    """
+    Start a background summary refresh unless one is already running for the thread
+    """
+    if thread_id in _summary_refreshing:
+        return False
+    _summary_refreshing.add(thread_id)
+    task = asyncio.create_task(refresh_thread_summary(thread_id))
+    _summary_tasks.add(task)
+    task.add_done_callback(_summary_tasks.discard)
+    return True
+
+@app.get("/api/threads/{thread_id}/summary")
+async def get_thread_summary(thread_id: int, request: Request):
+    """
+    Get the stored rolling summary of a thread (never waits for the AI model)
+    """
+    try:
+        thread = await executor.run_db(db.get_thread, thread_id)
+        if not thread:
+            raise HTTPException(status_code=404, detail="Thread not found")
+        
+        versions = await executor.run_db(
+            db.get_resource_versions, [f"thread:{thread_id}:summary", f"thread:{thread_id}:messages"]
+        )
+        
+        def build_payload():
+            stored = db.get_thread_summary(thread_id)
+            return {
+                "thread_id": thread_id,
+                "summary": stored["summary"],
+                "summarized_through_message_id": stored["last_message_id"],
+                "summarized_messages": stored["message_count"] or 0,
+                "pending_messages": stored["pending_messages"],
+                "updated_at_epoch": stored["updated_at_epoch"]
+            }
+        
+        response = await http_cache.conditional_json(request, versions, build_payload)
+        
+        # First summary of a thread: generate it in the background for the next request
+        if response.status_code == 200 and not versions[f"thread:{thread_id}:summary"][0]:
+            stored = await executor.run_db(db.get_thread_summary, thread_id)
+            if stored["pending_messages"]:
+                schedule_summary_refresh(thread_id)
+        return response
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching summary: {str(e)}")
+
+@app.post("/api/threads/{thread_id}/summary/refresh", status_code=202)
+async def refresh_summary(thread_id: int):
+    """
+    Queue a background refresh of a thread's summary
+    """
+    thread = await executor.run_db(db.get_thread, thread_id)
+    if not thread:
+        raise HTTPException(status_code=404, detail="Thread not found")
+    
+    scheduled = schedule_summary_refresh(thread_id)
+    return {"thread_id": thread_id, "scheduled": scheduled}
+
 # Polling Endpoints
 
 @app.post("/api/topics/{thread_id}/poll")
@@ -598,12 +800,12 @@ async def vote_on_topic(thread_id: int, request: PollVoteRequest):
     """
     try:
         # Verify thread exists
-        thread = db.get_thread(thread_id)
+        thread = await executor.run_db(db.get_thread, thread_id)
         if not thread:
             raise HTTPException(status_code=404, detail="Thread not found")
         
         # Verify student exists
-        user = db.get_user_by_id(request.student_id)
+        user = await executor.run_db(db.get_user_by_id, request.student_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
@@ -615,10 +817,10 @@ async def vote_on_topic(thread_id: int, request: PollVoteRequest):
             raise HTTPException(status_code=400, detail="Invalid understanding level")
         
         # Create or update poll
-        poll_id = db.create_or_update_poll(thread_id, request.student_id, request.understanding_level)
+        poll_id = await executor.run_db(db.create_or_update_poll, thread_id, request.student_id, request.understanding_level)
         
         # Get updated results
-        results = db.get_poll_results(thread_id)
+        results = await executor.run_db(db.get_poll_results, thread_id)
         
         return {
             "success": True,
@@ -632,31 +834,36 @@ async def vote_on_topic(thread_id: int, request: PollVoteRequest):
         raise HTTPException(status_code=500, detail=f"Error voting on poll: {str(e)}")
 
 @app.get("/api/topics/{thread_id}/poll")
-async def get_poll_results(thread_id: int, student_id: Optional[int] = None):
+async def get_poll_results(thread_id: int, request: Request, student_id: Optional[int] = None):
     """
     Get poll results for a topic
     Optionally include student_id to get their current vote
+    Supports conditional GET via If-None-Match
     """
     try:
         # Verify thread exists
-        thread = db.get_thread(thread_id)
+        thread = await executor.run_db(db.get_thread, thread_id)
         if not thread:
             raise HTTPException(status_code=404, detail="Thread not found")
         
-        # Get poll results
-        results = db.get_poll_results(thread_id)
-        
-        response = {
-            "thread_id": thread_id,
-            "results": results
-        }
-        
-        # If student_id provided, get their vote
-        if student_id:
-            student_vote = db.get_student_poll(thread_id, student_id)
-            response["student_vote"] = student_vote
+        def build_payload():
+            # Get poll results
+            results = db.get_poll_results(thread_id)
+            
+            response = {
+                "thread_id": thread_id,
+                "results": results
+            }
+            
+            # If student_id provided, get their vote
+            if student_id:
+                student_vote = db.get_student_poll(thread_id, student_id)
+                response["student_vote"] = student_vote
+            
+            return response
         
-        return response
+        versions = await executor.run_db(db.get_resource_versions, [f"thread:{thread_id}:poll"])
+        return await http_cache.conditional_json(request, versions, build_payload, variant=f"student={student_id}")
     
     except HTTPException:
         raise
@@ -670,12 +877,12 @@ async def get_topic_helpers(thread_id: int):
     """
     try:
         # Verify thread exists
-        thread = db.get_thread(thread_id)
+        thread = await executor.run_db(db.get_thread, thread_id)
         if not thread:
             raise HTTPException(status_code=404, detail="Thread not found")
         
         # Get students who understand completely
-        helpers = db.get_students_who_understand(thread_id)
+        helpers = await executor.run_db(db.get_students_who_understand, thread_id)
         
         return {
             "thread_id": thread_id,
@@ -695,7 +902,7 @@ async def get_students_by_level(thread_id: int, understanding_level: str):
     """
     try:
         # Verify thread exists
-        thread = db.get_thread(thread_id)
+        thread = await executor.run_db(db.get_thread, thread_id)
         if not thread:
             raise HTTPException(status_code=404, detail="Thread not found")
         
@@ -704,7 +911,7 @@ async def get_students_by_level(thread_id: int, understanding_level: str):
             raise HTTPException(status_code=400, detail="Invalid understanding level")
         
         # Get students with specified understanding level
-        students = db.get_students_by_understanding_level(thread_id, understanding_level)
+        students = await executor.run_db(db.get_students_by_understanding_level, thread_id, understanding_level)
         
         return {
             "thread_id": thread_id,
@@ -721,19 +928,315 @@ async def get_students_by_level(thread_id: int, understanding_level: str):
 # Analytics Endpoint
 
 @app.get("/api/analytics")
-async def get_analytics():
+async def get_analytics(request: Request):
     """
     Get comprehensive analytics data for teacher dashboard
     Returns aggregated statistics on student understanding and engagement
+    Supports conditional GET via If-None-Match
     """
     try:
-        analytics_data = db.get_analytics_data()
-        return analytics_data
+        versions = await executor.run_db(db.get_resource_versions, ["analytics"])
+        return await http_cache.conditional_json(request, versions, db.get_analytics_data)
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching analytics: {str(e)}")
 
-if __name__ == "__main__":
+@app.get("/api/analytics/digest")
+async def get_analytics_digest():
+    """
+    Summarize what students are confused about in every thread flagged needs_attention.
+    Threads are packed into shared prompts; summaries are cached until a thread gets new messages.
+    """
+    try:
+        analytics = await executor.run_db(db.get_analytics_data)
+        flagged = analytics["topics_needing_attention"]
+        recent = await executor.run_db(
+            db.get_recent_messages_for_threads,
+            [topic["thread_id"] for topic in flagged],
+            prompts.MAX_DIGEST_MESSAGES_PER_THREAD
+        )
+        
+        entries = []
+        pending = []
+        for topic in flagged:
+            messages = recent[topic["thread_id"]]
+            last_message_id = messages[-1]["id"] if messages else None
+            summary = digest_cache.get((topic["thread_id"], last_message_id)) if messages else "No discussion yet."
+            entry = {
+                "thread_id": topic["thread_id"],
+                "topic": topic["topic"],
+                "announcement_title": topic["announcement_title"],
+                "clarity_score": topic["clarity_score"],
+                "none_count": topic["none_count"],
+                "total_votes": topic["total_votes"],
+                "last_message_id": last_message_id,
+                "summary": summary,
+                "cached": summary is not None
+            }
+            entries.append(entry)
+            if summary is None:
+                pending.append({"thread_id": topic["thread_id"], "topic": topic["topic"], "messages": messages})
+        
+        # One Ollama call per packed batch, at most DIGEST_CONCURRENCY at a time
+        batches = llm_service.pack_digest_batches(pending)
+        limit = asyncio.Semaphore(DIGEST_CONCURRENCY)
+        
+        async def run_batch(batch):
+            async with limit:
+                try:
+                    return await executor.run_llm(llm_service.summarize_digest_batch, batch)
+                except Exception as e:
+                    tracing.log_event("digest.batch.failed", logging.WARNING, threads=len(batch), error=str(e))
+                    return {}
+        
+        summaries = {}
+        for result in await asyncio.gather(*(run_batch(batch) for batch in batches)):
+            summaries.update(result)
+        
+        for entry in entries:
+            if entry["summary"] is None and entry["thread_id"] in summaries:
+                entry["summary"] = summaries[entry["thread_id"]]
+                digest_cache.set((entry["thread_id"], entry["last_message_id"]), entry["summary"])
+        
+        tracing.log_event("digest.built", threads=len(entries), summarized=len(pending), llm_calls=len(batches))
+        return {
+            "threads": entries,
+            "summarized_threads": len(pending),
+            "llm_calls": len(batches)
+        }
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error building digest: {str(e)}")
+
+@app.get("/api/analytics/timeseries")
+async def get_analytics_timeseries(
+    from_epoch: Optional[int] = Query(None, alias="from"),
+    to_epoch: Optional[int] = Query(None, alias="to"),
+    bucket: str = "day",
+    announcement_id: Optional[int] = None
+):
+    """
+    Get understanding and activity trends over time, served from hourly/daily rollups
+    from/to are Unix epoch seconds (default: last 30 days), bucket is 'hour' or 'day'
+    Optionally pass announcement_id to restrict to a single lecture
+    """
+    try:
+        if to_epoch is None:
+            to_epoch = db.get_epoch_time()
+        if from_epoch is None:
+            from_epoch = to_epoch - 30 * db.ROLLUP_BUCKETS["day"]
+        
+        return await executor.run_db(db.get_analytics_timeseries, from_epoch, to_epoch, bucket, announcement_id)
+    
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching analytics timeseries: {str(e)}")
+
+# Export Endpoints
+
+def _next_export_chunk(chunks: Iterator[bytes]) -> Optional[bytes]:
+    return next(chunks, None)
+
+async def stream_export_chunks(chunks: Iterator[bytes]):
+    """
+    Pull chunks from a blocking export generator on the database pool, one
+    fetchmany batch at a time, so neither the event loop nor memory grows with the row count
+    """
+    try:
+        while True:
+            chunk = await executor.run_db(_next_export_chunk, chunks)
+            if chunk is None:
+                return
+            yield chunk
+    finally:
+        # Closes the cursor's connection if the client went away mid-stream
+        await executor.run_db(chunks.close)
+
+def export_response(head: dict, messages: Iterator, format: str, filename: str) -> StreamingResponse:
+    """Stream head plus every message as one JSON document ({...head, "messages": [...]}) or NDJSON"""
+    if format == "ndjson":
+        chunks = serialization.iter_ndjson(itertools.chain([head], messages))
+    else:
+        chunks = serialization.iter_json_document(head, "messages", messages)
+    return StreamingResponse(
+        stream_export_chunks(chunks),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{format}"'}
+    )
+
+def check_export_format(format: str):
+    if format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Invalid format '{format}'. Use one of: {', '.join(EXPORT_MEDIA_TYPES)}")
+
+@app.get("/api/export/threads/{thread_id}")
+async def export_thread(thread_id: int, format: str = "json"):
+    """
+    Export a thread's full history: the thread, its poll results and every message
+    Streamed in constant memory; format is 'json' (one document) or 'ndjson'
+    """
+    try:
+        check_export_format(format)
+        thread = await executor.run_db(db.get_thread, thread_id)
+        if not thread:
+            raise HTTPException(status_code=404, detail="Thread not found")
+        
+        head = {
+            "thread": thread,
+            "poll_results": await executor.run_db(db.get_poll_results, thread_id),
+            "exported_at_epoch": db.get_epoch_time()
+        }
+        tracing.log_event("export.thread", thread_id=thread_id, format=format)
+        return export_response(head, db.iter_thread_messages(thread_id), format, f"thread-{thread_id}")
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error exporting thread: {str(e)}")
+
+@app.get("/api/export/announcements/{announcement_id}")
+async def export_announcement(announcement_id: int, format: str = "json"):
+    """
+    Export a lecture: the announcement (without its PDF text), its threads with
+    poll and message counts, and every message of every thread
+    Streamed in constant memory; format is 'json' (one document) or 'ndjson'
+    """
+    try:
+        check_export_format(format)
+        announcement = await executor.run_db(db.get_announcement, announcement_id)
+        if not announcement:
+            raise HTTPException(status_code=404, detail="Announcement not found")
+        
+        head = {
+            "announcement": {key: announcement[key] for key in announcement.keys() if key != "pdf_text"},
+            "threads": await executor.run_db(db.get_all_threads_with_polls, announcement_id),
+            "exported_at_epoch": db.get_epoch_time()
+        }
+        tracing.log_event("export.announcement", announcement_id=announcement_id, format=format)
+        return export_response(
+            head, db.iter_announcement_messages(announcement_id), format, f"announcement-{announcement_id}"
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error exporting announcement: {str(e)}")
+
+# Diagnostics Endpoints
+
+def require_admin(request: Request):
+    """
+    Dependency for admin endpoints: X-Admin-Token must match ADMIN_TOKEN
+    Without ADMIN_TOKEN the endpoints are disabled
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (set ADMIN_TOKEN)")
+    supplied = request.headers.get(ADMIN_TOKEN_HEADER, "")
+    if not hmac.compare_digest(supplied.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+@app.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(require_admin)])
+async def get_metrics():
+    """
+    Prometheus metrics (this worker's counters and histograms)
+    Scrapers send X-Admin-Token (http_headers in the Prometheus scrape config)
+    """
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/api/cache/stats", dependencies=[Depends(require_admin)])
+async def get_cache_stats():
+    """
+    Get hit/miss counters for the database lookup caches
+    """
+    return {"caches": cache.get_all_stats()}
+
+@app.get("/api/executor/stats", dependencies=[Depends(require_admin)])
+async def get_executor_stats():
+    """
+    Get queue wait and run time per function offloaded from the event loop
+    """
+    return {"calls": executor.get_stats()}
+
+@app.get("/api/db/query-stats", dependencies=[Depends(require_admin)])
+async def get_query_stats(
+    sort: str = Query("total_ms", pattern="^(total_ms|avg_ms|p95_ms|max_ms|count|slow_count|rows)$"),
+    limit: int = Query(20, ge=1, le=500)
+):
+    """
+    Get the top SQL statements by total, average, p95 or max time (normalized statement text)
+    """
+    return {"slow_query_ms": query_stats.SLOW_QUERY_MS, "statements": query_stats.get_stats(sort, limit)}
+
+@app.delete("/api/db/query-stats", dependencies=[Depends(require_admin)])
+async def reset_query_stats():
+    """
+    Clear SQL statement counters (e.g. before a load test)
+    """
+    query_stats.reset_stats()
+    return {"message": "Query stats reset"}
+
+@app.get("/api/profiler/status", dependencies=[Depends(require_admin)])
+async def get_profiler_status():
+    """
+    Get sampling profiler state and recent slow-request captures
+    """
+    return profiler.get_status()
+
+@app.post("/api/profiler/start", dependencies=[Depends(require_admin)])
+async def start_profiler(seconds: Optional[float] = Query(None, gt=0, le=3600)):
+    """
+    Start an on-demand sampling profile (saved on stop, or after `seconds`)
+    """
+    if not profiler.start(seconds):
+        raise HTTPException(status_code=409, detail="A profile is already being recorded")
+    return {"message": "Profiler started", "seconds": seconds}
+
+@app.post("/api/profiler/stop", dependencies=[Depends(require_admin)])
+async def stop_profiler():
+    """
+    Stop the on-demand profile and save it as folded stacks (flamegraph input)
+    """
+    result = await executor.run_blocking(profiler.stop)
+    if result is None:
+        raise HTTPException(status_code=409, detail="No profile is being recorded")
+    return result
+
+def run_workers(workers: int):
+    """
+    Production launch: do startup work once, then fork N uvicorn workers.
+    Workers share the SQLite file (WAL mode), a shared cache server and
+    host-wide LLM concurrency slots.
+    """
+    import multiprocessing
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    
+    db.init_database()
+    tracing.log_event("database.initialized", workers=workers)
+    os.environ["FORUM_STARTUP_DONE"] = "1"
+    
+    # Local caches are per process; share one cache server unless configured otherwise
+    cache_server = None
+    if "CACHE_BACKEND" not in os.environ:
+        os.environ["CACHE_BACKEND"] = "shared"
+        cache_server = multiprocessing.Process(target=cache.serve_forever, daemon=True)
+        cache_server.start()
+    
+    try:
+        uvicorn.run(
+            "main:app",
+            host=HOST,
+            port=PORT,
+            workers=workers,
+            app_dir=os.path.dirname(os.path.abspath(__file__))
+        )
+    finally:
+        if cache_server is not None:
+            cache_server.terminate()
+
+if __name__ == "__main__":
+    if WORKERS > 1:
+        run_workers(WORKERS)
+    else:
+        import uvicorn
+        uvicorn.run(app, host=HOST, port=PORT)
 
@@ -0,0 +1,66 @@
+"""
+Mentions - @AI mention and @command parsing for forum messages
+A single precompiled pattern finds every mention (@AI, @ AI, @ai-ta,
+@ai-assistant, @summary, @quiz, any case) in one pass, returning the commands
+it saw and the question with the mentions removed. Messages without an '@'
+skip the regex entirely, which is most of them.
+"""
+
+import re
+from typing import Tuple
+
+import prompts
+
+# Longest aliases first so '@ai-ta' is not read as '@ai' followed by '-ta'
+_ALIASES = sorted(prompts.MENTION_COMMANDS, key=len, reverse=True)
+
+# '@' not preceded by a word character (so emails do not match), an optional
+# space, an alias ending at a word boundary, then a trailing ',' or ':' and spaces.
+# The pattern starts with the literal '@' (lookbehind after it) so the regex
+# engine can jump between '@' characters instead of trying every position.
+_MENTION = re.compile(
+    r"@(?<![\w@]@) ?(" + "|".join(re.escape(alias) for alias in _ALIASES) + r")(?![\w-])[,:]?[ \t]*",
+    re.IGNORECASE
+)
+
+
+class ParsedMessage:
+    """Commands mentioned in a message and the message text without them"""
+
+    def __init__(self, question: str, commands: Tuple[str, ...]):
+        self.question = question
+        self.commands = commands
+
+    @property
+    def mentions_ai(self) -> bool:
+        return "ai" in self.commands
+
+    def has_command(self, command: str) -> bool:
+        return command in self.commands
+
+
+def parse_message(message: str) -> ParsedMessage:
+    """
+    Find mention commands and strip them from a message
+
+    Args:
+        message: Message as posted, e.g. '@AI what is slow start?'
+
+    Returns:
+        ParsedMessage with commands (in order of first mention, no duplicates,
+        named as in prompts.MENTION_COMMANDS) and the question without mentions
+    """
+    if "@" not in message:
+        return ParsedMessage(message.strip(), ())
+
+    # split() with one capturing group alternates text and mentioned alias
+    pieces = _MENTION.split(message)
+    if len(pieces) == 1:
+        return ParsedMessage(message.strip(), ())
+
+    commands = []
+    for alias in pieces[1::2]:
+        command = prompts.MENTION_COMMANDS[alias.lower()]
+        if command not in commands:
+            commands.append(command)
+    return ParsedMessage("".join(pieces[0::2]).strip(), tuple(commands))
@@ -0,0 +1,202 @@
+"""
+Metrics - Counters and latency histograms exposed in Prometheus text format
+Covers HTTP routes, every database.py function, Ollama calls and PDF extraction.
+Metrics are per process: with WORKERS > 1 each scrape of /metrics is answered
+by one worker. /metrics needs the admin token (X-Admin-Token, see main.require_admin).
+"""
+
+import bisect
+import functools
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+# Default latency buckets in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+SIZE_BUCKETS = (100, 500, 1000, 2500, 5000, 10000, 20000, 30000, 50000)
+TOKEN_BUCKETS = (16, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels"""
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # Per-bucket (non-cumulative) counts, then sum and count
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    labels = _format_labels(self.labels, label_values, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labels, label_values, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{labels} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labels, label_values)} {total}")
+                lines.append(f"{self.name}_count{_format_labels(self.labels, label_values)} {count}")
+        return lines
+
+
+# ========================================
+# METRIC DEFINITIONS
+# ========================================
+
+http_requests = Counter("http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+http_duration = Histogram("http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+
+db_duration = Histogram("db_call_duration_seconds", "database.py function latency", ("function",))
+db_errors = Counter("db_call_errors_total", "database.py calls that raised", ("function",))
+
+llm_requests = Counter("llm_requests_total", "Ollama generate calls", ("model", "status"))
+llm_queue_time = Histogram("llm_queue_seconds", "Time waiting for an LLM concurrency slot", ("model",))
+llm_duration = Histogram("llm_request_duration_seconds", "Wall time of Ollama generate calls", ("model",))
+llm_generation_time = Histogram("llm_generation_seconds", "Ollama eval_duration (token generation time)", ("model",))
+llm_prompt_eval_time = Histogram("llm_prompt_eval_seconds", "Ollama prompt_eval_duration", ("model",))
+llm_prompt_chars = Histogram("llm_prompt_chars", "Prompt size in characters", ("model",), buckets=SIZE_BUCKETS)
+llm_prompt_tokens = Histogram("llm_prompt_tokens", "Ollama prompt_eval_count", ("model",), buckets=TOKEN_BUCKETS)
+llm_predicted_tokens = Histogram("llm_predicted_tokens", "Ollama eval_count (tokens generated)", ("model",), buckets=TOKEN_BUCKETS)
+
+pdf_page_duration = Histogram("pdf_page_extract_seconds", "Text extraction time per PDF page", ("backend",))
+pdf_pages = Counter("pdf_pages_total", "PDF pages extracted", ("backend",))
+
+_registry = [
+    http_requests, http_duration,
+    db_duration, db_errors,
+    llm_requests, llm_queue_time, llm_duration, llm_generation_time, llm_prompt_eval_time,
+    llm_prompt_chars, llm_prompt_tokens, llm_predicted_tokens,
+    pdf_page_duration, pdf_pages,
+]
+
+# Callables returning extra exposition lines at scrape time (e.g. cache counters)
+_collectors: List[Callable[[], List[str]]] = []
+
+
+def register_collector(collector: Callable[[], List[str]]):
+    """Add a callable producing extra metric lines on every scrape"""
+    _collectors.append(collector)
+
+
+def render() -> str:
+    """Render all metrics in Prometheus text exposition format"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    for collector in _collectors:
+        lines.extend(collector())
+    return "\n".join(lines) + "\n"
+
+
+# ========================================
+# INSTRUMENTATION HELPERS
+# ========================================
+
+def timed_db(func: Callable) -> Callable:
+    """Decorator recording latency and errors of a database.py function"""
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            db_errors.inc(name)
+            raise
+        finally:
+            db_duration.observe(time.perf_counter() - start, name)
+
+    return wrapper
+
+
+def record_ollama_response(model: str, result: Dict):
+    """Record Ollama's own timing fields (nanoseconds) and token counts"""
+    if "eval_duration" in result:
+        llm_generation_time.observe(result["eval_duration"] / 1e9, model)
+    if "prompt_eval_duration" in result:
+        llm_prompt_eval_time.observe(result["prompt_eval_duration"] / 1e9, model)
+    if "prompt_eval_count" in result:
+        llm_prompt_tokens.observe(result["prompt_eval_count"], model)
+    if "eval_count" in result:
+        llm_predicted_tokens.observe(result["eval_count"], model)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency and status codes"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in scope; use its template to bound cardinality
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            http_duration.observe(time.perf_counter() - start, scope["method"], route_path)
+            http_requests.inc(scope["method"], route_path, str(status["code"]))
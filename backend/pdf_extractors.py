@@ -0,0 +1,310 @@
+"""
+PDF extractors - Pluggable text extraction backends for course PDFs
+Each backend yields one PageText per page: the page text and its headings
+(lines set noticeably larger than the page's body text, e.g. slide titles).
+With PDF_EXTRACTOR=auto the fastest installed backend is used, falling back
+to the next one if it fails or finds almost no text.
+
+Backends:
+    pdfium      pypdfium2 (installed with pdfplumber) - native text extraction, fastest
+    pypdf       pypdf, if installed - pure Python
+    pdfplumber  pdfplumber/pdfminer - slowest, the original extractor
+"""
+
+import logging
+import math
+import os
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pdfplumber
+
+import metrics
+import tracing
+
+try:
+    import pypdfium2
+    import pypdfium2.raw as pdfium_raw
+except ImportError:  # Fall back to the other backends
+    pypdfium2 = None
+
+try:
+    import pypdf
+except ImportError:  # Optional backend
+    pypdf = None
+
+# Configuration
+# Backend name, or 'auto' to try EXTRACTOR_PREFERENCE in order
+PDF_EXTRACTOR = os.environ.get("PDF_EXTRACTOR", "auto")
+
+# Order for 'auto', from benchmarks/bench_pdf_extractors.py on the fixture corpus
+# (120 slide and note pages, 1 CPU): pdfium ~1100 pages/s (~550 with headings),
+# pdfplumber ~23 pages/s. Both score the same there on text and heading recall.
+EXTRACTOR_PREFERENCE = ("pdfium", "pypdf", "pdfplumber")
+
+# A backend finding fewer characters per page than this (e.g. on an unusual
+# font encoding) is treated as failed and the next backend is tried
+MIN_CHARS_PER_PAGE = 20
+
+# A line is a heading if its font is this much larger than the page's body text
+HEADING_SIZE_RATIO = 1.2
+MAX_HEADING_CHARS = 120
+
+# Runs whose baselines are this close (in points) are on the same line
+LINE_TOLERANCE = 2.0
+
+# PDFium is not thread-safe and pypdfium2 does no locking, while extraction runs on
+# the blocking pool: every pypdfium2 call holds this lock (taken per page, so
+# concurrent uploads interleave pages instead of waiting for whole documents)
+_pdfium_lock = threading.Lock()
+
+# (top, font size, text) for one piece of text on a page; top grows down the page
+Run = Tuple[float, float, str]
+
+
+class PageText:
+    """Text and headings of one PDF page (number is 1-based)"""
+
+    def __init__(self, number: int, text: str, headings: List[Dict]):
+        self.number = number
+        self.text = text
+        self.headings = headings
+
+    @property
+    def title(self) -> Optional[str]:
+        """First heading on the page, usually the slide title"""
+        return self.headings[0]["text"] if self.headings else None
+
+
+class ExtractedPdf:
+    """All pages of a PDF, as extracted by one backend"""
+
+    def __init__(self, backend: str, pages: List[PageText], seconds: float):
+        self.backend = backend
+        self.pages = pages
+        self.seconds = seconds
+
+    @property
+    def text(self) -> str:
+        """Page texts joined by blank lines (pages without text are skipped)"""
+        return "\n\n".join(page.text for page in self.pages if page.text).strip()
+
+    @property
+    def headings(self) -> List[Dict]:
+        """Every heading with its page number: [{"page", "text", "size"}]"""
+        return [{"page": page.number, **heading} for page in self.pages for heading in page.headings]
+
+
+def find_headings(runs: List[Run]) -> List[Dict]:
+    """
+    Headings on a page from its text runs
+
+    Args:
+        runs: (top, size, text) in reading order
+
+    Returns:
+        [{"text", "size"}] for lines at least HEADING_SIZE_RATIO times the body
+        size (the size covering the most characters). Consecutive heading lines
+        of the same size are merged, so wrapped titles come back whole.
+    """
+    lines = []
+    for top, size, text in runs:
+        text = text.strip()
+        if not text:
+            continue
+        size = round(size, 1)
+        if lines and abs(lines[-1][0] - top) <= LINE_TOLERANCE and lines[-1][1] == size:
+            lines[-1][2].append(text)
+        else:
+            lines.append([top, size, [text]])
+    if not lines:
+        return []
+
+    sizes = Counter()
+    for _, size, texts in lines:
+        sizes[size] += sum(len(text) for text in texts)
+    body_size = sizes.most_common(1)[0][0]
+
+    headings = []
+    previous = None
+    for top, size, texts in lines:
+        text = " ".join(texts)
+        if size < body_size * HEADING_SIZE_RATIO or not any(char.isalpha() for char in text):
+            previous = None
+            continue
+        if previous is not None and previous[1] == size and top - previous[0] <= size * 2:
+            headings[-1]["text"] = f"{headings[-1]['text']} {text}"
+        else:
+            headings.append({"text": text, "size": size})
+        previous = (top, size)
+    return [heading for heading in headings if len(heading["text"]) <= MAX_HEADING_CHARS]
+
+
+# ========================================
+# BACKENDS
+# ========================================
+
+class PdfExtractor:
+    """Backend interface: iter_pages yields a PageText for every page"""
+
+    name = ""
+
+    def available(self) -> bool:
+        return True
+
+    def iter_pages(self, file_path: str, with_headings: bool = True) -> Iterator[PageText]:
+        raise NotImplementedError
+
+
+class PdfiumExtractor(PdfExtractor):
+    """PDFium via pypdfium2: page text in one native call, headings from text object font sizes"""
+
+    name = "pdfium"
+
+    def available(self) -> bool:
+        return pypdfium2 is not None
+
+    def iter_pages(self, file_path: str, with_headings: bool = True) -> Iterator[PageText]:
+        with _pdfium_lock:
+            pdf = pypdfium2.PdfDocument(file_path)
+            page_count = len(pdf)
+        try:
+            for index in range(page_count):
+                with _pdfium_lock:
+                    text, runs = self._read_page(pdf, index, with_headings)
+                yield PageText(index + 1, text.strip(), find_headings(runs) if with_headings else [])
+        finally:
+            with _pdfium_lock:
+                pdf.close()
+
+    def _read_page(self, pdf, index: int, with_headings: bool) -> Tuple[str, List[Run]]:
+        """Text and (with headings) text runs of one page; the caller holds _pdfium_lock"""
+        page = pdf[index]
+        textpage = page.get_textpage()
+        try:
+            text = textpage.get_text_range().replace("\r\n", "\n").replace("\r", "\n")
+            runs = []
+            if with_headings:
+                for obj in page.get_objects(filter=[pdfium_raw.FPDF_PAGEOBJ_TEXT], textpage=textpage):
+                    # Tf size times the text matrix scale; bounds are (left, bottom, right, top)
+                    a, b, c, d, _, _ = obj.get_matrix().get()
+                    size = obj.get_font_size() * math.sqrt(abs(a * d - b * c))
+                    runs.append((-obj.get_bounds()[3], size, obj.extract()))
+            return text, runs
+        finally:
+            textpage.close()
+            page.close()
+
+
+class PypdfExtractor(PdfExtractor):
+    """pypdf: pure-Python extraction, headings from the text visitor's font sizes"""
+
+    name = "pypdf"
+
+    def available(self) -> bool:
+        return pypdf is not None
+
+    def iter_pages(self, file_path: str, with_headings: bool = True) -> Iterator[PageText]:
+        reader = pypdf.PdfReader(file_path)
+        for index, page in enumerate(reader.pages):
+            runs = []
+
+            def visit(text, cm, tm, font_dict, font_size):
+                # Effective size and baseline of tm x cm
+                scale = math.sqrt(abs((tm[0] * tm[3] - tm[1] * tm[2]) * (cm[0] * cm[3] - cm[1] * cm[2])))
+                baseline = tm[4] * cm[1] + tm[5] * cm[3] + cm[5]
+                runs.append((-baseline, font_size * scale, text))
+
+            text = page.extract_text(visitor_text=visit if with_headings else None) or ""
+            yield PageText(index + 1, text.strip(), find_headings(runs) if with_headings else [])
+
+
+class PdfplumberExtractor(PdfExtractor):
+    """pdfplumber: layout analysis of every character, headings from word font sizes"""
+
+    name = "pdfplumber"
+
+    def iter_pages(self, file_path: str, with_headings: bool = True) -> Iterator[PageText]:
+        with pdfplumber.open(file_path) as pdf:
+            for index, page in enumerate(pdf.pages):
+                text = page.extract_text() or ""
+                headings = []
+                if with_headings:
+                    words = page.extract_words(extra_attrs=["size"])
+                    headings = find_headings([(word["top"], word["size"], word["text"]) for word in words])
+                page.flush_cache()
+                yield PageText(index + 1, text.strip(), headings)
+
+
+EXTRACTORS = {extractor.name: extractor for extractor in (PdfiumExtractor(), PypdfExtractor(), PdfplumberExtractor())}
+
+
+def get_extractors(name: Optional[str] = None) -> List[PdfExtractor]:
+    """
+    Backends to try, in order
+
+    Args:
+        name: Backend name or 'auto' (default: PDF_EXTRACTOR)
+
+    Returns:
+        [that backend], or every installed backend in EXTRACTOR_PREFERENCE order for 'auto'
+    """
+    name = name or PDF_EXTRACTOR
+    if name == "auto":
+        return [EXTRACTORS[key] for key in EXTRACTOR_PREFERENCE if EXTRACTORS[key].available()]
+    extractor = EXTRACTORS.get(name)
+    if extractor is None:
+        raise ValueError(f"Unknown PDF extractor '{name}'. Use one of: auto, {', '.join(EXTRACTORS)}")
+    if not extractor.available():
+        raise ValueError(f"PDF extractor '{name}' is not installed")
+    return [extractor]
+
+
+def _extract_with(extractor: PdfExtractor, file_path: str, with_headings: bool) -> ExtractedPdf:
+    pages = []
+    started = time.perf_counter()
+    page_start = started
+    for page in extractor.iter_pages(file_path, with_headings):
+        now = time.perf_counter()
+        metrics.pdf_page_duration.observe(now - page_start, extractor.name)
+        metrics.pdf_pages.inc(extractor.name)
+        pages.append(page)
+        page_start = now
+    return ExtractedPdf(extractor.name, pages, time.perf_counter() - started)
+
+
+def extract(file_path: str, backend: Optional[str] = None, with_headings: bool = True) -> ExtractedPdf:
+    """
+    Extract a PDF with the first backend that succeeds
+
+    Args:
+        file_path: Path to PDF file
+        backend: Backend name or 'auto' (default: PDF_EXTRACTOR)
+        with_headings: Also collect headings (costs extra time on every backend)
+
+    Returns:
+        ExtractedPdf; if every backend fails or finds too little text, the last
+        result (or error) is returned (or raised)
+    """
+    extractors = get_extractors(backend)
+    result = None
+    error = None
+    for extractor in extractors:
+        try:
+            result = _extract_with(extractor, file_path, with_headings)
+        except Exception as e:
+            error = e
+            tracing.log_event("pdf.extractor.failed", logging.WARNING, backend=extractor.name, error=str(e))
+            continue
+
+        chars = sum(len(page.text) for page in result.pages)
+        if chars >= MIN_CHARS_PER_PAGE * max(len(result.pages), 1) or extractor is extractors[-1]:
+            return result
+        tracing.log_event("pdf.extractor.little_text", logging.WARNING, backend=extractor.name,
+                          pages=len(result.pages), chars=chars)
+
+    if result is not None:
+        return result
+    raise error
@@ -1,30 +1,50 @@
-import pdfplumber
-from typing import List
+from typing import Iterator, List, Optional
 
-def extract_text_from_pdf(file_path: str) -> str:
+import pdf_extractors
+import text_processing
+
+def extract_pdf(file_path: str, backend: Optional[str] = None) -> pdf_extractors.ExtractedPdf:
     """
-    Extract text from PDF file
+    Extract text and headings (slide titles) from a PDF file
     
     Args:
         file_path: Path to PDF file
+        backend: Extractor backend or 'auto' (default: pdf_extractors.PDF_EXTRACTOR)
         
     Returns:
-        Extracted text as string
+        ExtractedPdf with per-page text and headings, and the backend used
     """
     try:
-        text_parts = []
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text_parts.append(page_text)
-        
-        full_text = "\n\n".join(text_parts)
-        return full_text.strip()
+        return pdf_extractors.extract(file_path, backend)
     
     except Exception as e:
         raise Exception(f"Error extracting text from PDF: {str(e)}")
 
+def iter_pdf_pages(file_path: str, backend: Optional[str] = None) -> Iterator[str]:
+    """
+    Yield the text of each PDF page as it is extracted (pages without text are skipped)
+    
+    Args:
+        file_path: Path to PDF file
+        backend: Extractor backend (default: the first in pdf_extractors.get_extractors())
+    """
+    extractor = pdf_extractors.get_extractors(backend)[0]
+    for page in extractor.iter_pages(file_path, with_headings=False):
+        if page.text:
+            yield page.text
+
+def extract_text_from_pdf(file_path: str) -> str:
+    """
+    Extract text from PDF file
+    
+    Args:
+        file_path: Path to PDF file
+        
+    Returns:
+        Extracted text as string
+    """
+    return extract_pdf(file_path).text
+
 def chunk_text(text: str, max_length: int = 4000) -> List[str]:
     """
     Split text into chunks if it exceeds max_length
@@ -34,34 +54,13 @@ def chunk_text(text: str, max_length: int = 4000) -> List[str]:
         max_length: Maximum length per chunk
         
     Returns:
-        List of text chunks
+        List of text chunks (see text_processing for sentence/paragraph boundaries and overlap)
     """
-    if len(text) <= max_length:
-        return [text]
-    
-    chunks = []
-    words = text.split()
-    current_chunk = []
-    current_length = 0
-    
-    for word in words:
-        word_length = len(word) + 1  # +1 for space
-        if current_length + word_length > max_length:
-            chunks.append(" ".join(current_chunk))
-            current_chunk = [word]
-            current_length = word_length
-        else:
-            current_chunk.append(word)
-            current_length += word_length
-    
-    if current_chunk:
-        chunks.append(" ".join(current_chunk))
-    
-    return chunks
+    return text_processing.chunk_text(text, max_length)
 
 def clean_text(text: str) -> str:
     """
-    Clean extracted text by removing extra whitespace and special characters
+    Clean extracted text by collapsing all whitespace (including newlines) to single spaces
     
     Args:
         text: Text to clean
@@ -69,11 +68,4 @@ def clean_text(text: str) -> str:
     Returns:
         Cleaned text
     """
-    # Remove multiple newlines
-    text = "\n".join(line.strip() for line in text.split("\n") if line.strip())
-    
-    # Remove multiple spaces
-    text = " ".join(text.split())
-    
-    return text
-
+    return text_processing.clean_text(text)
@@ -0,0 +1,269 @@
+"""
+Profiler - Opt-in wall-clock sampling profiler and slow-request capture
+A background thread samples every thread's stack (sys._current_frames) at a
+fixed interval, so nothing is instrumented and the cost is one stack walk per
+thread per tick. Profiles are written in folded-stack format, which
+flamegraph.pl, inferno and speedscope all read directly.
+
+Two modes, both off by default:
+- on demand: POST /api/profiler/start, then /api/profiler/stop saves the profile
+  (admin endpoints: send X-Admin-Token matching the ADMIN_TOKEN setting)
+- slow requests: with PROFILE_SLOW_REQUEST_MS set, recent samples are kept
+  in a ring buffer and every request slower than the
+  threshold is saved with only the threads (and time ranges) that worked on it
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Dict, List, Optional
+
+import executor
+import tracing
+
+# Configuration
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+PROFILE_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", "10"))
+PROFILE_SLOW_REQUEST_MS = float(os.environ.get("PROFILE_SLOW_REQUEST_MS", "0"))
+PROFILE_BUFFER_SECONDS = float(os.environ.get("PROFILE_BUFFER_SECONDS", "120"))
+PROFILE_MAX_SLOW_CAPTURES = int(os.environ.get("PROFILE_MAX_SLOW_CAPTURES", "50"))
+
+# Stacks deeper than this are truncated at the root end
+MAX_STACK_DEPTH = 128
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Samples all thread stacks on a daemon thread while any consumer needs them"""
+
+    def __init__(self, interval: float, buffer_seconds: float):
+        self.interval = interval
+        # One entry per tick: (perf_counter time, [(thread name, folded stack), ...])
+        self.recent = deque(maxlen=max(1, int(buffer_seconds / interval)))
+        self.keep_recent = False
+        self.session: Optional[Counter] = None
+        self.session_started = None
+        self.session_deadline = None
+        self.samples = 0
+        self._labels = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def _folded_stack(self, frame) -> str:
+        labels = []
+        while frame is not None and len(labels) < MAX_STACK_DEPTH:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                label = self._labels[code] = _frame_label(code)
+            labels.append(label)
+            frame = frame.f_back
+        labels.reverse()
+        return ";".join(labels)
+
+    def sample(self):
+        """Take one sample of every thread except the sampler itself"""
+        now = time.perf_counter()
+        own_ident = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        stacks = [
+            (names.get(ident, f"thread-{ident}"), self._folded_stack(frame))
+            for ident, frame in sys._current_frames().items()
+            if ident != own_ident
+        ]
+        expired = None
+        with self._lock:
+            self.samples += 1
+            if self.keep_recent:
+                self.recent.append((now, stacks))
+            if self.session is not None:
+                for thread_name, stack in stacks:
+                    self.session[f"{thread_name};{stack}"] += 1
+                if self.session_deadline is not None and now >= self.session_deadline:
+                    expired = self._end_session()
+        if expired is not None:
+            save_profile("session", expired)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                # Exit once nobody needs samples; ensure_running starts a fresh thread
+                if self.session is None and not self.keep_recent:
+                    self._thread = None
+                    return
+            self.sample()
+
+    def ensure_running(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+            self._thread.start()
+
+    def start_session(self, seconds: Optional[float] = None) -> bool:
+        """Begin aggregating samples; returns False if a session is already active"""
+        with self._lock:
+            if self.session is not None:
+                return False
+            self.session = Counter()
+            self.session_started = time.perf_counter()
+            self.session_deadline = self.session_started + seconds if seconds else None
+        self.ensure_running()
+        return True
+
+    def _end_session(self) -> Counter:
+        session = self.session
+        self.session = None
+        self.session_started = None
+        self.session_deadline = None
+        return session
+
+    def stop_session(self) -> Optional[Counter]:
+        """End the on-demand session and return its folded stack counts"""
+        with self._lock:
+            return self._end_session() if self.session is not None else None
+
+    def window(self, start: float, end: float, threads: Dict[str, List[tuple]]) -> Counter:
+        """
+        Fold the buffered samples that belong to one request
+
+        Args:
+            start: Request start (perf_counter)
+            end: Request end (perf_counter)
+            threads: Thread name -> list of (start, end) ranges during which that thread worked on the request
+        """
+        folded = Counter()
+        with self._lock:
+            ticks = [tick for tick in self.recent if start <= tick[0] <= end]
+        for when, stacks in ticks:
+            for thread_name, stack in stacks:
+                ranges = threads.get(thread_name)
+                if ranges and any(begin <= when <= finish for begin, finish in ranges):
+                    folded[f"{thread_name};{stack}"] += 1
+        return folded
+
+
+_profiler = SamplingProfiler(PROFILE_INTERVAL_MS / 1000, PROFILE_BUFFER_SECONDS)
+_captures = deque(maxlen=PROFILE_MAX_SLOW_CAPTURES)
+_captures_lock = threading.Lock()
+
+
+def save_profile(kind: str, folded: Counter, request_id: str = "") -> str:
+    """Write folded stacks ("frame;frame;frame count" per line) and return the file path"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    suffix = f"-{request_id}" if request_id else ""
+    path = os.path.join(PROFILE_DIR, f"{kind}-{stamp}-{os.getpid()}{suffix}.folded")
+    with open(path, "w") as handle:
+        for stack, count in folded.most_common():
+            handle.write(f"{stack} {count}\n")
+    tracing.log_event("profile.saved", kind=kind, path=path, samples=sum(folded.values()))
+    return path
+
+
+# ========================================
+# ON-DEMAND PROFILING
+# ========================================
+
+def start(seconds: Optional[float] = None) -> bool:
+    """Start an on-demand profile (saved by stop(), or automatically after seconds)"""
+    return _profiler.start_session(seconds)
+
+
+def stop() -> Optional[Dict]:
+    """Stop the on-demand profile and save it; None if none was running"""
+    started = _profiler.session_started
+    folded = _profiler.stop_session()
+    if folded is None:
+        return None
+    return {
+        "path": save_profile("session", folded),
+        "samples": sum(folded.values()),
+        "duration_s": round(time.perf_counter() - started, 3) if started else None
+    }
+
+
+def get_status() -> Dict:
+    """Profiler state and the most recent slow-request captures"""
+    return {
+        "sampler_running": _profiler.running,
+        "session_active": _profiler.session is not None,
+        "interval_ms": PROFILE_INTERVAL_MS,
+        "samples_taken": _profiler.samples,
+        "slow_request_ms": PROFILE_SLOW_REQUEST_MS or None,
+        "slow_captures": list(_captures),
+        "profile_dir": os.path.abspath(PROFILE_DIR)
+    }
+
+
+# ========================================
+# SLOW-REQUEST CAPTURE
+# ========================================
+
+def _request_threads(trace: tracing.Trace, loop_thread: str, start: float, end: float) -> Dict[str, List[tuple]]:
+    """Threads that worked on a request: the event loop for its whole span, pool threads for their spans"""
+    threads = {loop_thread: [(start, end)]}
+    for span in list(trace.spans):
+        if span.thread != loop_thread:
+            threads.setdefault(span.thread, []).append((span.start, span.end or end))
+    return threads
+
+
+def _save_capture(folded: Counter, capture: Dict):
+    """Save a slow-request profile, deleting the oldest one beyond PROFILE_MAX_SLOW_CAPTURES"""
+    capture["path"] = save_profile("slow", folded, capture["request_id"])
+    with _captures_lock:
+        if len(_captures) == _captures.maxlen:
+            try:
+                os.remove(_captures[0]["path"])
+            except OSError:
+                pass
+        _captures.append(capture)
+
+
+class SlowRequestMiddleware:
+    """
+    ASGI middleware saving a profile of every request slower than PROFILE_SLOW_REQUEST_MS.
+    Must sit inside TracingMiddleware so the request's spans are available.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        if PROFILE_SLOW_REQUEST_MS > 0:
+            _profiler.keep_recent = True
+            _profiler.ensure_running()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or PROFILE_SLOW_REQUEST_MS <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        loop_thread = threading.current_thread().name
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            end = time.perf_counter()
+            duration_ms = (end - start) * 1000
+            trace = tracing.current_trace()
+            if duration_ms >= PROFILE_SLOW_REQUEST_MS and trace is not None:
+                threads = _request_threads(trace, loop_thread, start, end)
+                folded = _profiler.window(start, end, threads)
+                if folded:
+                    route = getattr(scope.get("route"), "path", scope["path"])
+                    await executor.run_blocking(_save_capture, folded, {
+                        "request_id": trace.request_id,
+                        "route": f"{scope['method']} {route}",
+                        "duration_ms": round(duration_ms, 3),
+                        "samples": sum(folded.values())
+                    })
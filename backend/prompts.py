@@ -3,6 +3,8 @@ Modular prompts for LLM interactions
 All prompts are centralized here for easy maintenance and customization
 """
 
+from typing import List
+
 # ========================================
 # TOPIC EXTRACTION PROMPTS
 # ========================================
@@ -37,6 +39,51 @@ Course text:
 Extract 2-6 topics (2-6 words each):"""
 
 
+def get_topic_selection_prompt(headings: List[str], keyphrases: List[str]) -> str:
+    """Generate prompt for choosing topics from locally extracted headings and keyphrases"""
+    headings_text = "\n".join(f"- {heading}" for heading in headings) or "(none found)"
+    keyphrases_text = "\n".join(f"- {phrase}" for phrase in keyphrases) or "(none found)"
+    return f"""{TOPIC_EXTRACTION_RULES}
+
+Section headings and slide titles from the course material:
+{headings_text}
+
+Key phrases from the course material (most important first):
+{keyphrases_text}
+
+Choose or refine 2-6 topics from these (2-6 words each):"""
+
+
+CHUNK_TOPIC_RULES = """
+IMPORTANT RULES:
+- Extract 1-4 topics covered in this part
+- Each topic: 2-6 words maximum
+- Be specific and descriptive
+- Output only numbered list
+- No explanations
+"""
+
+def get_chunk_topics_prompt(chunk_text: str, part: int, total_parts: int) -> str:
+    """Generate prompt for the topics of one part of a long document (map step)"""
+    return f"""{CHUNK_TOPIC_RULES}
+
+Course text (part {part} of {total_parts}):
+{chunk_text}
+
+Extract 1-4 topics (2-6 words each):"""
+
+
+def get_topic_merge_prompt(topics: List[str]) -> str:
+    """Generate prompt for merging topics found across a document's parts (reduce step)"""
+    topics_text = "\n".join(f"- {topic}" for topic in topics)
+    return f"""{TOPIC_EXTRACTION_RULES}
+
+Topics found in different parts of the course material (most frequent first, with the number of parts):
+{topics_text}
+
+Merge duplicates and choose 2-6 topics that cover the whole material (2-6 words each):"""
+
+
 # ========================================
 # STUDENT Q&A PROMPTS (AI as TA)
 # ========================================
@@ -161,28 +208,109 @@ Conversation:
 
 Summary:"""
 
+INCREMENTAL_SUMMARIZATION_INSTRUCTIONS = """Update the summary of this discussion with the new messages below.
+Keep it to 2-3 sentences covering the whole discussion, not just the new messages.
+Highlight the main questions asked, key points discussed and anything still unresolved."""
+
+def get_incremental_summarization_prompt(previous_summary: str, conversation_text: str) -> str:
+    """Generate prompt folding new messages into an existing thread summary"""
+    return f"""{INCREMENTAL_SUMMARIZATION_INSTRUCTIONS}
+
+Summary so far:
+{previous_summary}
+
+New messages:
+{conversation_text}
+
+Updated summary:"""
+
+
+# ========================================
+# TEACHER DIGEST PROMPTS
+# ========================================
+
+DIGEST_INSTRUCTIONS = """You are helping a teacher review discussion threads where students report low understanding.
+For EACH thread below, write 1-2 sentences on what students are confused about.
+Answer with exactly one line per thread, in this format:
+[Thread <id>] <what students are confused about>"""
+
+def get_digest_section(thread_id: int, topic: str, conversation_text: str) -> str:
+    """Format one thread's condensed history for a digest prompt"""
+    return f"""### Thread {thread_id}: {topic}
+{conversation_text}"""
+
+def get_digest_prompt(sections: List[str]) -> str:
+    """Generate prompt summarizing several threads in one pass"""
+    threads_text = "\n\n".join(sections)
+    return f"""{DIGEST_INSTRUCTIONS}
+
+{threads_text}
+
+Digest:"""
+
 
 # ========================================
 # CONFIGURATION
 # ========================================
 
-# AI triggers for @AI mention system
-AI_TRIGGERS = ['@ai', '@ ai', '@AI', '@ AI', '@ai-assistant', '@ai-ta']
+# Mention aliases (lowercase, without '@') and the command each one triggers (see mentions.py)
+MENTION_COMMANDS = {
+    "ai": "ai",
+    "ai-ta": "ai",
+    "ai-assistant": "ai",
+    "summary": "summary",
+    "quiz": "quiz"
+}
+
+# Topic extraction (see topic_candidates.py and llm_service.map_reduce_topics)
+MIN_TOPIC_CANDIDATES = 4             # fewer than this: read the text with map-reduce instead
+MAX_TOPIC_HEADINGS = 25
+MAX_TOPIC_KEYPHRASES = 25
+TOPIC_CHUNK_LENGTH = 24000           # characters per map step (one call for documents up to this)
+MAX_MERGE_TOPICS = 40                # distinct chunk topics passed to the reduce step
 
 # Context limits
-MAX_COURSE_TEXT_LENGTH = 20000
 MAX_HISTORY_MESSAGES = 5
-MAX_MESSAGE_HISTORY_LENGTH = 400
 MAX_TOTAL_PROMPT_LENGTH = 30000
 
-# Response limits based on model size
-MODEL_RESPONSE_LIMITS = {
-    '70b': 3000,
-    '405b': 3000,
-    '8b': 2000,
-    '13b': 2000,
-    '3b': 1500,
-    '1b': 1000,
-    'default': 1000
+# Token budget for answer prompts (see llm_service.build_answer_prompt)
+MAX_MESSAGE_HISTORY_TOKENS = 100     # per previous message
+HISTORY_BUDGET_SHARE = 0.15          # history may use this share of the prompt budget
+QUESTION_BUDGET_SHARE = 0.25         # longer questions are cut to this share
+MIN_COURSE_TEXT_TOKENS = 512         # history is dropped before material goes below this
+PROMPT_SAFETY_TOKENS = 64            # slack for token-count approximation error
+
+# Thread summaries: newest messages folded into one update, characters kept per message
+MAX_SUMMARY_DELTA_MESSAGES = 30
+MAX_SUMMARY_MESSAGE_LENGTH = 200
+
+# Teacher digest: latest messages included per thread
+MAX_DIGEST_MESSAGES_PER_THREAD = 12
+
+# Response limits (tokens) by model size: (minimum parameters in billions, limit), largest first
+MODEL_RESPONSE_LIMITS = [
+    (60, 3000),
+    (7, 2000),
+    (3, 1500),
+    (0, 1000)
+]
+
+# Model families: (context window in tokens, average characters per token within a word).
+# Names are matched by longest prefix, so 'llama3.1' wins over 'llama3'.
+# 128k-vocabulary tokenizers (Llama 3, Qwen 2, Gemma) pack more characters per token
+# than 32k SentencePiece ones (Llama 2, Mistral, Phi-3).
+MODEL_FAMILIES = {
+    'llama3.3': (131072, 6.0),
+    'llama3.2': (131072, 6.0),
+    'llama3.1': (131072, 6.0),
+    'llama3': (8192, 6.0),
+    'llama2': (4096, 4.5),
+    'mistral': (32768, 4.5),
+    'mixtral': (32768, 4.5),
+    'qwen2.5': (32768, 6.0),
+    'qwen2': (32768, 6.0),
+    'gemma2': (8192, 6.0),
+    'gemma': (8192, 6.0),
+    'phi3': (4096, 4.5),
+    'default': (4096, 4.5)
 }
-
@@ -0,0 +1,232 @@
+"""
+Query stats - Timing for every SQL statement run through database.py
+get_connection() opens connections with TimedConnection, whose cursors time
+each statement (execute plus the fetches that drain it) and aggregate the
+results by normalized statement text. Statements slower than SLOW_QUERY_MS
+are logged with EXPLAIN QUERY PLAN and the types (never the values) of their
+parameters, which include emails, phone numbers and message text.
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Dict, List, Optional
+
+import tracing
+
+# Configuration
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", "200"))
+
+# Number of recent timings kept per statement for percentiles
+LATENCY_WINDOW = 512
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w?])-?\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN \(\?(?:, ?\?)*\)", re.IGNORECASE)
+
+# Raw SQL -> normalized text; statements are mostly constants so this stays small
+_normalized = {}
+_NORMALIZED_CACHE_SIZE = 2048
+
+
+def normalize(sql: str) -> str:
+    """Collapse whitespace and replace literals and IN lists with placeholders"""
+    key = _normalized.get(sql)
+    if key is None:
+        key = _WHITESPACE.sub(" ", sql).strip()
+        key = _STRING_LITERAL.sub("?", key)
+        key = _NUMBER_LITERAL.sub("?", key)
+        key = _IN_LIST.sub("IN (?...)", key)
+        if len(_normalized) >= _NORMALIZED_CACHE_SIZE:
+            _normalized.clear()
+        _normalized[sql] = key
+    return key
+
+
+class StatementStats:
+    """Counters for one normalized statement (times in seconds)"""
+
+    def __init__(self):
+        self.count = 0
+        self.slow = 0
+        self.rows = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, elapsed: float, rows: int, slow: bool):
+        self.count += 1
+        self.slow += int(slow)
+        self.rows += rows
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        self.recent.append(elapsed)
+
+    def summary(self) -> Dict:
+        recent = sorted(self.recent)
+        p95 = recent[int(len(recent) * 0.95) - 1] if recent else 0.0
+        return {
+            "count": self.count,
+            "slow_count": self.slow,
+            "rows": self.rows,
+            "total_ms": round(self.total * 1000, 3),
+            "avg_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p95_ms": round(p95 * 1000, 3),
+            "max_ms": round(self.max * 1000, 3)
+        }
+
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _describe_params(params) -> Optional[list]:
+    """Parameter types for the slow-query log, e.g. ['int', 'str(24)', 'None']"""
+    if params is None:
+        return None
+    values = params.values() if isinstance(params, dict) else params
+    described = []
+    for value in values:
+        if isinstance(value, (str, bytes)):
+            described.append(f"{type(value).__name__}({len(value)})")
+        else:
+            described.append(type(value).__name__)
+    return described
+
+
+def _explain(connection: sqlite3.Connection, sql: str, params) -> Optional[List[str]]:
+    """EXPLAIN QUERY PLAN for a read statement; None if it cannot be explained"""
+    if not sql.lstrip().upper().startswith(("SELECT", "WITH")):
+        return None
+    try:
+        rows = sqlite3.Connection.execute(connection, f"EXPLAIN QUERY PLAN {sql}", params or ())
+        return [row[-1] for row in rows.fetchall()]
+    except sqlite3.Error:
+        return None
+
+
+def _record(connection: sqlite3.Connection, sql: str, params, elapsed: float, rows: int):
+    key = normalize(sql)
+    slow = elapsed * 1000 >= SLOW_QUERY_MS
+    with _stats_lock:
+        if key not in _stats:
+            _stats[key] = StatementStats()
+        _stats[key].record(elapsed, rows, slow)
+
+    if slow:
+        tracing.log_event(
+            "db.slow_query",
+            logging.WARNING,
+            duration_ms=round(elapsed * 1000, 3),
+            statement=key,
+            param_types=_describe_params(params),
+            rows=rows,
+            plan=_explain(connection, sql, params)
+        )
+
+
+class TimedCursor(sqlite3.Cursor):
+    """
+    Cursor timing each statement from execute until its rows are drained.
+    A statement is recorded on fetchall(), on the next execute, or on close().
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pending = None
+
+    def _finish(self):
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            sql, params, elapsed, rows = pending
+            _record(self.connection, sql, params, elapsed, rows)
+
+    def _add_fetch(self, started: float, rows: int):
+        if self._pending is not None:
+            sql, params, elapsed, total_rows = self._pending
+            self._pending = (sql, params, elapsed + time.perf_counter() - started, total_rows + rows)
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._pending = (sql, parameters, time.perf_counter() - started, 0)
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            _record(self.connection, sql, None, time.perf_counter() - started, max(self.rowcount, 0))
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._add_fetch(started, int(row is not None))
+        return row
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._add_fetch(started, len(rows))
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._add_fetch(started, len(rows))
+        self._finish()
+        return rows
+
+    def close(self):
+        self._finish()
+        super().close()
+
+
+class TimedConnection(sqlite3.Connection):
+    """Connection whose cursors (including conn.execute shortcuts) are TimedCursors"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cursors = weakref.WeakSet()
+
+    def cursor(self, factory=TimedCursor):
+        cursor = super().cursor(factory)
+        if isinstance(cursor, TimedCursor):
+            self._cursors.add(cursor)
+        return cursor
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def close(self):
+        # Record statements read with fetchone() whose cursors were never closed
+        for cursor in list(self._cursors):
+            cursor._finish()
+        super().close()
+
+
+def get_stats(sort: str = "total_ms", limit: int = 20) -> List[Dict]:
+    """Top statements ordered by a summary field (total_ms, max_ms, p95_ms, avg_ms, count, slow_count)"""
+    with _stats_lock:
+        rows = [{"statement": key, **stats.summary()} for key, stats in _stats.items()]
+    rows.sort(key=lambda row: row[sort], reverse=True)
+    return rows[:limit]
+
+
+def reset_stats():
+    """Clear all statement counters"""
+    with _stats_lock:
+        _stats.clear()
@@ -0,0 +1,174 @@
+"""
+Records - Compact row types returned by database.py
+Each record is a slotted dataclass: no per-row dict, built straight from the
+SQLite row tuple by row_factory, and encoded natively by orjson. Records keep
+the dict-style read access (record["id"], record.get("x"), {**record}) the
+endpoints already use, but are shared (e.g. by the row caches) and must not be
+mutated: build a new dict to attach related rows, {**announcement, "threads": ...}.
+A record only has the fields its query selected (see narrowed), so responses
+keep the keys they had as dict rows.
+"""
+
+import dataclasses
+import functools
+import operator
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+
+class Record:
+    """Dict-style read access for the slotted dataclasses below"""
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__slots__
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
+    def keys(self) -> Sequence[str]:
+        return self.__slots__
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Shallow copy as a plain dict"""
+        return {key: getattr(self, key) for key in self.__slots__}
+
+
+@dataclass(slots=True)
+class User(Record):
+    id: int
+    name: str
+    role: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    created_at: Optional[str] = None
+
+
+@dataclass(slots=True)
+class Announcement(Record):
+    id: int
+    teacher_id: int
+    title: str
+    content: str
+    pdf_text: Optional[str] = None
+    pdf_path: Optional[str] = None
+    pdf_filename: Optional[str] = None
+    has_topics: int = 0
+    created_at: Optional[str] = None
+    teacher_name: Optional[str] = None
+
+
+@dataclass(slots=True)
+class Thread(Record):
+    id: int
+    announcement_id: int
+    title: str
+    topic: str
+    created_at: Optional[str] = None
+    message_count: Optional[int] = None
+
+
+@dataclass(slots=True)
+class Message(Record):
+    id: int
+    thread_id: int
+    user_id: Optional[int]
+    sender_type: str
+    content: str
+    created_at: Optional[str] = None
+    created_at_epoch: Optional[int] = None
+    user_name: Optional[str] = None
+    user_role: Optional[str] = None
+
+
+@dataclass(slots=True)
+class PollResult(Record):
+    """A thread with its message count and poll counts per understanding level"""
+    id: int
+    announcement_id: int
+    title: str
+    topic: str
+    created_at: Optional[str] = None
+    message_count: int = 0
+    complete_count: int = 0
+    partial_count: int = 0
+    none_count: int = 0
+    total_votes: int = 0
+
+
+@functools.lru_cache(maxsize=None)
+def narrowed(record_class: type, fields: Tuple[str, ...]) -> type:
+    """
+    record_class restricted to these fields (in class order), for queries that
+    select only some columns: the unselected fields are left out of the record,
+    so it encodes to the same keys the query's dict rows had instead of nulls
+    """
+    if fields == record_class.__slots__:
+        return record_class
+    types = {field.name: field.type for field in dataclasses.fields(record_class)}
+    narrow = dataclasses.make_dataclass(
+        record_class.__name__, [(name, types[name]) for name in fields], bases=(Record,), slots=True,
+        namespace={"_record_class": record_class, "__reduce__": _reduce_narrowed}
+    )
+    narrow.__module__ = record_class.__module__
+    narrow.__qualname__ = record_class.__qualname__
+    return narrow
+
+
+def _reduce_narrowed(record: Record) -> tuple:
+    """
+    Pickle a narrowed record by its base class and fields (the shared cache pickles
+    values), since the narrowed class itself cannot be found by name
+    """
+    values = tuple(getattr(record, key) for key in record.__slots__)
+    return _unpickle_narrowed, (record._record_class, record.__slots__, values)
+
+
+def _unpickle_narrowed(record_class: type, fields: Tuple[str, ...], values: tuple) -> Record:
+    return narrowed(record_class, fields)(*values)
+
+
+def _builder(record_class: type, columns: Sequence[str]) -> Callable[[tuple], Record]:
+    """Function turning a row with these columns into a record; unknown columns are dropped"""
+    if tuple(columns) == record_class.__slots__:
+        return lambda row: record_class(*row)
+
+    index = {name: position for position, name in enumerate(columns)}
+    present = tuple(name for name in record_class.__slots__ if name in index)
+    build = narrowed(record_class, present)
+    if len(present) == 1:
+        position = index[present[0]]
+        return lambda row: build(row[position])
+    getter = operator.itemgetter(*(index[name] for name in present))
+    return lambda row: build(*getter(row))
+
+
+@functools.lru_cache(maxsize=None)
+def row_factory(record_class: type) -> Callable:
+    """
+    sqlite3 row factory building record_class instances
+
+    Columns are matched to fields by name, so SELECT * keeps working on tables
+    whose migrated columns come in a different order. The mapping is worked out
+    once per statement, from the cursor's description.
+    """
+    layout = (None, None)
+
+    def factory(cursor, row):
+        nonlocal layout
+        description, build = layout
+        if cursor.description is not description:
+            description = cursor.description
+            build = _builder(record_class, [column[0] for column in description])
+            layout = (description, build)
+        return build(row)
+
+    return factory
+
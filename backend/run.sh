@@ -17,5 +17,10 @@ fi
 echo ""
 echo "💡 Share the Network URL with others on the same WiFi!"
 echo ""
+# Production mode: WORKERS=4 ./run.sh starts 4 worker processes
+if [ "${WORKERS:-1}" -gt 1 ]; then
+    echo "⚙️  Starting $WORKERS workers"
+    echo ""
+fi
 python main.py
 
@@ -0,0 +1,110 @@
+"""
+Serialization - Fast JSON encoding and response compression
+Large read endpoints return FastJSONResponse directly so rows that are already
+plain JSON types (or records, which orjson encodes natively) skip FastAPI's
+jsonable_encoder pass and are encoded once
+"""
+
+import json
+from typing import Any, Dict, Iterable, Iterator
+
+import records
+
+from fastapi import FastAPI
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library encoder
+    orjson = None
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:  # Fall back to gzip only
+    BrotliMiddleware = None
+
+# Responses smaller than this are sent uncompressed
+COMPRESSION_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+
+
+# Rows encoded per chunk by the streaming encoders
+STREAM_BATCH_ROWS = 500
+
+
+def _default(value: Any) -> Any:
+    """Standard library fallback for records (orjson encodes dataclasses itself)"""
+    if isinstance(value, records.Record):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(payload: Any) -> bytes:
+    """Encode a payload of plain JSON types and records to UTF-8 bytes"""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+def iter_ndjson(rows: Iterable[Any], batch_rows: int = STREAM_BATCH_ROWS) -> Iterator[bytes]:
+    """Encode rows as newline-delimited JSON, one chunk per batch_rows rows"""
+    batch = []
+    for row in rows:
+        batch.append(dumps(row))
+        if len(batch) >= batch_rows:
+            batch.append(b"")
+            yield b"\n".join(batch)
+            batch = []
+    if batch:
+        batch.append(b"")
+        yield b"\n".join(batch)
+
+
+def iter_json_array(rows: Iterable[Any], batch_rows: int = STREAM_BATCH_ROWS) -> Iterator[bytes]:
+    """Encode rows as one JSON array, one chunk per batch_rows rows (memory bounded by the batch)"""
+    yield b"["
+    separator = b""
+    batch = []
+    for row in rows:
+        batch.append(dumps(row))
+        if len(batch) >= batch_rows:
+            yield separator + b",".join(batch)
+            separator = b","
+            batch = []
+    if batch:
+        yield separator + b",".join(batch)
+    yield b"]"
+
+
+def iter_json_document(head: Dict[str, Any], key: str, rows: Iterable[Any],
+                       batch_rows: int = STREAM_BATCH_ROWS) -> Iterator[bytes]:
+    """Encode {**head, key: [rows]} as one JSON object, streaming the rows as iter_json_array does"""
+    opening = dumps({**{name: value for name, value in head.items() if name != key}, key: []})
+    items = iter_json_array(rows, batch_rows)
+    next(items)
+    yield opening[:-2]  # up to and including the array's "["
+    yield from items
+    yield b"}"
+
+
+class FastJSONResponse(Response):
+    """JSON response encoded with orjson when available"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def add_compression(app: FastAPI):
+    """Compress responses above COMPRESSION_MIN_SIZE with brotli (if installed) or gzip"""
+    if BrotliMiddleware is not None:
+        app.add_middleware(
+            BrotliMiddleware,
+            quality=BROTLI_QUALITY,
+            minimum_size=COMPRESSION_MIN_SIZE,
+            gzip_fallback=True
+        )
+    else:
+        from fastapi.middleware.gzip import GZipMiddleware
+        app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MIN_SIZE, compresslevel=GZIP_LEVEL)
@@ -2,6 +2,12 @@
 
 echo "🔧 Setting up IITGN Discussion Forum Backend..."
 
+# Python 3.10+ is required (slotted dataclasses in records.py, numpy 2.1)
+if ! python3 -c 'import sys; sys.exit(sys.version_info < (3, 10))'; then
+    echo "❌ Python 3.10 or newer is required (found $(python3 --version 2>&1))"
+    exit 1
+fi
+
 # Create virtual environment
 echo "Creating virtual environment..."
 python3 -m venv venv
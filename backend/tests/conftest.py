@@ -0,0 +1,51 @@
+"""
+Shared test fixtures: a temporary database, a TestClient and seed helpers
+The database path and an unreachable Ollama URL are set before main is imported.
+
+Usage (from backend/, needs pytest and httpx):
+    python -m pytest tests
+"""
+
+import itertools
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIR)
+
+WORKDIR = tempfile.mkdtemp(prefix="forum-tests-")
+os.environ["DATABASE_PATH"] = os.path.join(WORKDIR, "test.db")
+os.environ["OLLAMA_API_URL"] = "http://127.0.0.1:9/api/generate"
+os.chdir(WORKDIR)
+
+import database as db  # noqa: E402
+import main  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+_names = itertools.count()
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def teacher_id(client) -> int:
+    return db.get_user_by_name("Teacher")["id"]
+
+
+@pytest.fixture
+def student_id(client) -> int:
+    return db.create_user(f"student{next(_names)}", "student")
+
+
+@pytest.fixture
+def thread_id(teacher_id) -> int:
+    """A thread of a fresh announcement with topics"""
+    created = db.create_announcement_with_threads(teacher_id, "Lecture", "Slides", ["Routing"], pdf_text="Routing. " * 50)
+    return created["threads"][0]["id"]
@@ -0,0 +1,77 @@
+"""
+Admin endpoints: disabled without ADMIN_TOKEN, and need a matching X-Admin-Token
+The slow-query log behind /api/db/query-stats must not expose parameter values
+"""
+
+import pytest
+
+import main
+import query_stats
+import tracing
+
+TOKEN = "test-admin-token"
+
+
+@pytest.fixture
+def admin_token(monkeypatch):
+    monkeypatch.setattr(main, "ADMIN_TOKEN", TOKEN)
+    return {"X-Admin-Token": TOKEN}
+
+
+def test_profiler_disabled_without_admin_token(client, monkeypatch):
+    monkeypatch.setattr(main, "ADMIN_TOKEN", None)
+    assert client.post("/api/profiler/start", headers={"X-Admin-Token": ""}).status_code == 403
+    assert client.get("/api/profiler/status").status_code == 403
+
+
+def test_profiler_rejects_wrong_token(client, admin_token):
+    assert client.post("/api/profiler/start").status_code == 401
+    assert client.post("/api/profiler/start", headers={"X-Admin-Token": "guess"}).status_code == 401
+    assert client.get("/api/profiler/status").status_code == 401
+
+
+def test_profiler_with_token(client, admin_token):
+    assert client.post("/api/profiler/start", headers=admin_token).status_code == 200
+    stopped = client.post("/api/profiler/stop", headers=admin_token)
+    assert stopped.status_code == 200
+    assert client.get("/api/profiler/status", headers=admin_token).status_code == 200
+
+
+def test_metrics_need_admin_token(client, admin_token):
+    assert client.get("/metrics").status_code == 401
+    scraped = client.get("/metrics", headers=admin_token)
+    assert scraped.status_code == 200
+    assert "http_requests_total" in scraped.text
+
+
+def test_cache_stats_need_admin_token(client, admin_token):
+    assert client.get("/api/cache/stats").status_code == 401
+    assert "caches" in client.get("/api/cache/stats", headers=admin_token).json()
+
+
+def test_executor_stats_need_admin_token(client, admin_token):
+    assert client.get("/api/executor/stats").status_code == 401
+    assert "calls" in client.get("/api/executor/stats", headers=admin_token).json()
+
+
+def test_query_stats_need_admin_token(client, admin_token):
+    assert client.get("/api/db/query-stats").status_code == 401
+    assert client.delete("/api/db/query-stats").status_code == 401
+    assert client.get("/api/db/query-stats", headers=admin_token).status_code == 200
+    assert client.delete("/api/db/query-stats", headers=admin_token).status_code == 200
+
+
+def test_slow_query_log_has_no_parameter_values(client, admin_token, monkeypatch):
+    logged = []
+    monkeypatch.setattr(query_stats, "SLOW_QUERY_MS", 0)
+    monkeypatch.setattr(tracing, "log_event", lambda event, *args, **fields: logged.append((event, fields)))
+
+    signup = client.post("/api/auth/signup", json={"name": "Priya", "email": "priya@example.edu", "phone": "9876543210"})
+    assert signup.status_code == 200
+    stats = client.get("/api/db/query-stats", params={"limit": 500}, headers=admin_token)
+
+    slow = [fields for event, fields in logged if event == "db.slow_query"]
+    assert slow and any(fields["param_types"] for fields in slow)
+    for text in (str(logged), stats.text):
+        assert "priya@example.edu" not in text
+        assert "9876543210" not in text
@@ -0,0 +1,56 @@
+"""
+Analytics export: full runs replace earlier parts, and untimestamped poll rows are not lost
+"""
+
+import csv
+import os
+
+import pytest
+
+import analytics_export
+import database as db
+
+
+@pytest.fixture
+def no_lag(monkeypatch):
+    monkeypatch.setattr(analytics_export, "WATERMARK_LAG_SECONDS", -1)
+
+
+def part_rows(out_dir: str, name: str) -> list:
+    table_dir = os.path.join(out_dir, name)
+    rows = []
+    for filename in sorted(os.listdir(table_dir)):
+        with open(os.path.join(table_dir, filename), newline="") as f:
+            rows.extend(csv.DictReader(f))
+    return rows
+
+
+def table_count(name: str) -> int:
+    conn = db.get_connection()
+    count = conn.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0]
+    conn.close()
+    return count
+
+
+def test_full_run_replaces_earlier_parts(client, thread_id, student_id, tmp_path, no_lag):
+    out_dir = str(tmp_path)
+    for question in ["Question", "Follow-up"]:
+        db.create_message(thread_id, "student", question, student_id)
+        analytics_export.export_analytics(out_dir, tables=["messages"])
+    assert len(os.listdir(os.path.join(out_dir, "messages"))) == 2
+
+    run = analytics_export.export_analytics(out_dir, tables=["messages"], full=True)
+    assert os.listdir(os.path.join(out_dir, "messages")) == [os.path.basename(run["tables"]["messages"]["file"])]
+    assert len(part_rows(out_dir, "messages")) == table_count("messages")
+
+
+def test_polls_without_timestamp_are_exported(client, thread_id, student_id, tmp_path, no_lag):
+    poll_id = db.create_or_update_poll(thread_id, student_id, "partial")
+    conn = db.get_connection()
+    conn.execute("UPDATE topic_polls SET updated_at_epoch = NULL WHERE id = ?", (poll_id,))
+    conn.commit()
+    conn.close()
+
+    analytics_export.export_analytics(str(tmp_path), tables=["topic_polls"])
+    exported = [row for row in part_rows(str(tmp_path), "topic_polls") if row["id"] == str(poll_id)]
+    assert len(exported) == 1
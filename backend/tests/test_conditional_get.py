@@ -0,0 +1,91 @@
+"""
+Conditional GETs: ETags follow the resource versions bumped on every write
+"""
+
+import types
+from email.utils import formatdate
+
+import database as db
+import http_cache
+
+
+def test_unchanged_resource_is_not_modified(client, thread_id):
+    first = client.get(f"/api/threads/{thread_id}/messages")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    again = client.get(f"/api/threads/{thread_id}/messages", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["etag"] == etag
+    assert again.content == b""
+
+
+def clock(now: float) -> types.SimpleNamespace:
+    """Stand-in for http_cache's time module, stopped at now"""
+    return types.SimpleNamespace(time=lambda: now)
+
+
+def written_at(thread_id: int) -> int:
+    return db.get_resource_versions([f"thread:{thread_id}:messages"])[f"thread:{thread_id}:messages"][1]
+
+
+def test_last_modified_is_not_modified(client, thread_id, student_id, monkeypatch):
+    client.post(f"/api/threads/{thread_id}/ask", json={"question": "Hello", "user_id": student_id})
+    monkeypatch.setattr(http_cache, "time", clock(written_at(thread_id) + 1.5))
+    first = client.get(f"/api/threads/{thread_id}/messages")
+    again = client.get(f"/api/threads/{thread_id}/messages",
+                       headers={"If-Modified-Since": first.headers["last-modified"]})
+    assert again.status_code == 304
+
+
+def test_write_changes_etag(client, thread_id, student_id):
+    etag = client.get(f"/api/threads/{thread_id}/messages").headers["etag"]
+
+    posted = client.post(f"/api/threads/{thread_id}/ask", json={"question": "What is routing?", "user_id": student_id})
+    assert posted.status_code == 200
+
+    after = client.get(f"/api/threads/{thread_id}/messages", headers={"If-None-Match": etag})
+    assert after.status_code == 200
+    assert after.headers["etag"] != etag
+    assert after.json()["messages"][-1]["content"] == "What is routing?"
+
+
+def test_vote_changes_analytics_etag(client, thread_id, student_id):
+    etag = client.get("/api/analytics").headers["etag"]
+    assert client.get("/api/analytics", headers={"If-None-Match": etag}).status_code == 304
+
+    client.post(f"/api/topics/{thread_id}/poll", json={"student_id": student_id, "understanding_level": "partial"})
+    after = client.get("/api/analytics", headers={"If-None-Match": etag})
+    assert after.status_code == 200
+    assert after.headers["etag"] != etag
+
+
+def test_etag_varies_per_student(client, thread_id, student_id):
+    mine = client.get(f"/api/topics/{thread_id}/poll", params={"student_id": student_id})
+    other = client.get(f"/api/topics/{thread_id}/poll", params={"student_id": student_id + 1000})
+    assert mine.headers["etag"] != other.headers["etag"]
+
+
+def test_same_second_write_is_not_hidden_by_last_modified(client, thread_id, student_id, monkeypatch):
+    client.post(f"/api/threads/{thread_id}/ask", json={"question": "Hello", "user_id": student_id})
+    first_write = written_at(thread_id)
+    client.post(f"/api/threads/{thread_id}/ask", json={"question": "Hello again", "user_id": student_id})
+    monkeypatch.setattr(http_cache, "time", clock(first_write + 0.5))
+
+    # Still within the second of the write: no date a later write in that second could leave unchanged
+    response = client.get(f"/api/threads/{thread_id}/messages")
+    assert "last-modified" not in response.headers
+    again = client.get(f"/api/threads/{thread_id}/messages",
+                       headers={"If-Modified-Since": formatdate(first_write, usegmt=True)})
+    assert again.status_code == 200
+    assert again.json()["messages"][-1]["content"] == "Hello again"
+
+
+def test_etag_is_weak_and_shared_across_encodings(client, thread_id):
+    plain = client.get(f"/api/threads/{thread_id}/messages", headers={"Accept-Encoding": "identity"})
+    gzipped = client.get(f"/api/threads/{thread_id}/messages", headers={"Accept-Encoding": "gzip"})
+    assert plain.headers["etag"].startswith('W/"')
+    assert gzipped.headers["etag"] == plain.headers["etag"]
+    # A client may send it back without the weak prefix
+    strong = plain.headers["etag"][2:]
+    assert client.get(f"/api/threads/{thread_id}/messages", headers={"If-None-Match": strong}).status_code == 304
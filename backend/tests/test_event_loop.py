@@ -0,0 +1,75 @@
+"""
+Event-loop latency: slow database and LLM calls must not hold up other requests
+"""
+
+import asyncio
+import time
+
+import httpx
+
+import database as db
+import executor
+import llm_service
+import main
+
+SLOW_SECONDS = 1.0
+FAST_BOUND_SECONDS = 0.3
+
+
+def sleeping(func):
+    """func delayed by SLOW_SECONDS of blocking sleep (the GIL is released, as in SQLite or a socket read)"""
+    def slow(*args, **kwargs):
+        time.sleep(SLOW_SECONDS)
+        return func(*args, **kwargs)
+    slow.__name__ = func.__name__
+    return slow
+
+
+async def slowest_fast_request(slow_paths: list, fast_path: str, fast_count: int = 20) -> float:
+    """Start the slow requests, then time fast requests one by one while they run"""
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=30) as client:
+        slow = [asyncio.create_task(client.get(path)) for path in slow_paths]
+        await asyncio.sleep(0.05)
+        slowest = 0.0
+        for _ in range(fast_count):
+            start = time.perf_counter()
+            response = await client.get(fast_path)
+            assert response.status_code == 200
+            slowest = max(slowest, time.perf_counter() - start)
+        assert not all(task.done() for task in slow), "slow requests finished before the fast ones were timed"
+        for response in await asyncio.gather(*slow):
+            assert response.status_code == 200
+    return slowest
+
+
+def test_slow_query_does_not_block_fast_requests(client, thread_id, monkeypatch):
+    monkeypatch.setattr(db, "get_analytics_data", sleeping(db.get_analytics_data))
+    slowest = asyncio.run(slowest_fast_request(["/api/analytics"] * 3, f"/api/topics/{thread_id}/poll"))
+    assert slowest < FAST_BOUND_SECONDS
+
+
+def test_queued_llm_calls_leave_blocking_pool_free(client):
+    async def scenario():
+        # Twice as many Ollama calls as there are generation slots: half of them queue
+        llm_calls = [
+            asyncio.create_task(executor.run_llm(sleeping(llm_service.parse_topics), "1. Routing"))
+            for _ in range(executor.LLM_POOL_SIZE * 2)
+        ]
+        await asyncio.sleep(0.05)
+
+        start = time.perf_counter()
+        await executor.run_blocking(time.perf_counter)
+        blocking_wait = time.perf_counter() - start
+
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        loop_lag = time.perf_counter() - start - 0.01
+
+        assert not any(task.done() for task in llm_calls)
+        assert await asyncio.gather(*llm_calls) == [["Routing"]] * len(llm_calls)
+        return blocking_wait, loop_lag
+
+    blocking_wait, loop_lag = asyncio.run(scenario())
+    assert blocking_wait < FAST_BOUND_SECONDS
+    assert loop_lag < FAST_BOUND_SECONDS
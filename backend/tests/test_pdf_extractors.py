@@ -0,0 +1,96 @@
+"""
+PDF extraction: PDFium is used under one lock, so concurrent uploads are safe
+"""
+
+import os
+import sys
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import pdf_extractors
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+import pdf_fixtures  # noqa: E402
+
+pytestmark = pytest.mark.skipif(pdf_extractors.pypdfium2 is None, reason="pypdfium2 not installed")
+
+
+class LockChecked:
+    """Proxy for a pypdfium2 object that fails if it is used without the PDFium lock"""
+
+    def __init__(self, target):
+        self._target = target
+
+    @staticmethod
+    def check(name: str):
+        assert pdf_extractors._pdfium_lock.locked(), f"pypdfium2 {name} used without the PDFium lock"
+
+    @classmethod
+    def wrap(cls, value):
+        if isinstance(value, types.GeneratorType):
+            return cls.wrap_iterator(value)
+        if type(value).__module__.startswith("pypdfium2"):
+            return cls(value)
+        return value
+
+    @classmethod
+    def wrap_iterator(cls, iterator):
+        while True:
+            cls.check("iteration")
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            yield cls.wrap(item)
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            self.check(name)
+            args = [arg._target if isinstance(arg, LockChecked) else arg for arg in args]
+            kwargs = {key: value._target if isinstance(value, LockChecked) else value for key, value in kwargs.items()}
+            return self.wrap(attr(*args, **kwargs))
+        return call
+
+    def __len__(self):
+        self.check("len")
+        return len(self._target)
+
+    def __getitem__(self, index):
+        self.check("getitem")
+        return self.wrap(self._target[index])
+
+
+@pytest.fixture(scope="module")
+def corpus(tmp_path_factory):
+    return pdf_fixtures.make_corpus(str(tmp_path_factory.mktemp("pdfs")), documents=4, pages=6)
+
+
+def extract_pages(path: str) -> list:
+    extracted = pdf_extractors.extract(path, backend="pdfium")
+    return [(page.text, page.headings) for page in extracted.pages]
+
+
+def test_pdfium_calls_hold_the_lock(corpus, monkeypatch):
+    real_document = pdf_extractors.pypdfium2.PdfDocument
+
+    def checked_document(*args, **kwargs):
+        LockChecked.check("PdfDocument")
+        return LockChecked(real_document(*args, **kwargs))
+
+    expected = extract_pages(corpus[0]["path"])
+    monkeypatch.setattr(pdf_extractors.pypdfium2, "PdfDocument", checked_document)
+    assert extract_pages(corpus[0]["path"]) == expected
+
+
+def test_concurrent_extraction_matches_serial(corpus):
+    paths = [document["path"] for document in corpus] * 4
+    serial = [extract_pages(path) for path in paths]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        concurrent = list(pool.map(extract_pages, paths))
+    assert concurrent == serial
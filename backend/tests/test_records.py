@@ -0,0 +1,69 @@
+"""
+Records: narrowed records (only the selected columns) survive pickling, so the
+shared cache can hold them
+"""
+
+import os
+import pickle
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+import cache
+import database as db
+import records
+from conftest import BACKEND_DIR
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def cache_server(monkeypatch):
+    """python cache.py serve on a free port, with the client settings pointed at it"""
+    port = free_port()
+    server = subprocess.Popen([sys.executable, "cache.py", "serve"], cwd=BACKEND_DIR,
+                              env={**os.environ, "CACHE_SERVER_PORT": str(port)}, stdout=subprocess.DEVNULL)
+    monkeypatch.setattr(cache, "CACHE_SERVER_PORT", port)
+    deadline = time.monotonic() + 10
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            break
+        except OSError:
+            if time.monotonic() > deadline:
+                server.kill()
+                pytest.fail("cache server did not start")
+            time.sleep(0.05)
+    yield
+    server.kill()
+    server.wait()
+
+
+def narrowed_rows(thread_id: int) -> list:
+    thread = db._fetch_thread(thread_id)
+    announcement = db._fetch_announcement(thread["announcement_id"])
+    assert type(thread) is not records.Thread and type(announcement) is not records.Announcement
+    return [thread, announcement]
+
+
+def test_narrowed_records_pickle(thread_id):
+    for row in narrowed_rows(thread_id):
+        restored = pickle.loads(pickle.dumps(row))
+        assert type(restored) is type(row)
+        assert restored == row
+
+
+def test_shared_cache_stores_narrowed_records(thread_id, cache_server):
+    shared = cache.SharedCache("records-test")
+    for key, row in enumerate(narrowed_rows(thread_id)):
+        shared.set(key, row)
+        assert shared.get(key) == row
+    assert shared.errors == 0
+    assert shared.stats()["hits"] == 2
@@ -0,0 +1,23 @@
+"""
+Response shapes: records carry only the columns their query selected, so no
+endpoint gains null keys for fields it never returned
+"""
+
+
+def test_students_by_level_has_contact_fields_only(client, thread_id, student_id):
+    client.post(f"/api/topics/{thread_id}/poll", json={"student_id": student_id, "understanding_level": "none"})
+    students = client.get(f"/api/topics/{thread_id}/students/none").json()["students"]
+    assert students
+    assert all(set(student) == {"id", "name", "email", "phone"} for student in students)
+
+
+def test_thread_export_has_no_message_count(client, thread_id):
+    thread = client.get(f"/api/export/threads/{thread_id}").json()["thread"]
+    assert set(thread) == {"id", "announcement_id", "title", "topic", "created_at"}
+
+
+def test_announcement_list_has_no_pdf_text(client, thread_id):
+    announcements = client.get("/api/announcements").json()["announcements"]
+    assert announcements
+    assert all("pdf_text" not in announcement for announcement in announcements)
+    assert all("message_count" in thread for announcement in announcements for thread in announcement["threads"])
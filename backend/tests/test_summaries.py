@@ -0,0 +1,30 @@
+"""
+Thread summaries: the stored message count only covers messages folded into the summary
+"""
+
+import asyncio
+
+import database as db
+import llm_service
+import main
+import prompts
+
+
+def test_backlog_counts_only_summarized_messages(client, thread_id, student_id, monkeypatch):
+    folded = []
+
+    def update_thread_summary(previous_summary, new_messages):
+        folded.extend(message["id"] for message in new_messages)
+        return "Summary"
+
+    monkeypatch.setattr(llm_service, "update_thread_summary", update_thread_summary)
+    backlog = prompts.MAX_SUMMARY_DELTA_MESSAGES + 7
+    message_ids = [db.create_message(thread_id, "student", f"Question {i}", student_id) for i in range(backlog)]
+
+    asyncio.run(main.refresh_thread_summary(thread_id))
+
+    stored = db.get_thread_summary(thread_id)
+    assert folded == message_ids[-prompts.MAX_SUMMARY_DELTA_MESSAGES:]
+    assert stored["message_count"] == len(folded)
+    assert stored["last_message_id"] == message_ids[-1]
+    assert stored["pending_messages"] == 0
@@ -0,0 +1,29 @@
+"""
+Topic extraction: the LLM and fallback paths return topics finalized the same way
+"""
+
+import llm_service
+import topic_candidates
+
+CANDIDATES = ["Routing", "routing.", "TCP Congestion Control", "UDP", "DNS", "IP Addressing", "NAT", "BGP", "ARP"]
+
+
+def failing_ollama(prompt: str) -> str:
+    raise Exception("Cannot connect to Ollama")
+
+
+def test_finalize_dedupes_and_caps():
+    assert llm_service.finalize_topics(CANDIDATES) == [
+        "Routing", "TCP Congestion Control", "UDP", "DNS", "IP Addressing", "NAT"
+    ]
+    assert llm_service.finalize_topics(["Key topics", "KEY TOPICS!"]) == ["Key topics", "Core Concepts"]
+
+
+def test_fallback_topics_are_finalized(monkeypatch):
+    monkeypatch.setattr(llm_service, "TOPIC_EXTRACTION_MODE", "candidates")
+    monkeypatch.setattr(llm_service, "call_ollama", failing_ollama)
+    monkeypatch.setattr(topic_candidates, "offline_topics", lambda candidates: list(CANDIDATES))
+    assert llm_service.extract_topics("Routing. " * 50) == llm_service.finalize_topics(CANDIDATES)
+
+    monkeypatch.setattr(topic_candidates, "offline_topics", lambda candidates: [])
+    assert llm_service.extract_topics("Routing. " * 50) == ["Core Concepts", "Key Topics"]
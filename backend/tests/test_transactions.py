@@ -0,0 +1,89 @@
+"""
+Units of work: an announcement, its threads and artifacts are written together or not at all
+Writes timestamp their rows once they hold the write lock
+"""
+
+import threading
+import time
+
+import pytest
+
+import database as db
+
+ARTIFACTS = {"version": 1, "model_family": "llama", "cleaned_text": "Routing. " * 20, "total_tokens": 40,
+             "chunks": [{"start": 0, "end": 180, "tokens": 40, "keywords": ["routing"]}]}
+
+
+def table_counts() -> dict:
+    conn = db.get_connection()
+    counts = {
+        table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        for table in ("announcements", "threads", "announcement_artifacts")
+    }
+    conn.close()
+    return counts
+
+
+def test_failure_inside_unit_of_work_rolls_back(client, teacher_id):
+    before = table_counts()
+    versions = db.get_resource_versions(["announcements", "analytics"])
+
+    with pytest.raises(RuntimeError):
+        with db.transaction() as uow:
+            announcement = uow.add_announcement(teacher_id, "Lecture", "Slides", pdf_text="Routing. " * 50, has_topics=True)
+            uow.add_threads(announcement.id, [("Discussion: Routing", "Routing"), ("Discussion: TCP", "TCP")])
+            uow.save_artifacts(announcement.id, ARTIFACTS)
+            raise RuntimeError("crash after the last write")
+
+    assert table_counts() == before
+    assert db.get_announcement(announcement.id) is None
+    assert db.get_resource_versions(["announcements", "analytics"]) == versions
+
+
+def test_failing_write_leaves_no_partial_announcement(client, teacher_id):
+    before = table_counts()
+    broken = {key: value for key, value in ARTIFACTS.items() if key != "chunks"}
+
+    with pytest.raises(KeyError):
+        db.create_announcement_with_threads(teacher_id, "Lecture", "Slides", ["Routing", "TCP"],
+                                            pdf_text="Routing. " * 50, artifacts=broken)
+
+    assert table_counts() == before
+
+
+def test_commit_writes_everything(client, teacher_id):
+    before = table_counts()
+    versions = db.get_resource_versions(["announcements"])
+
+    created = db.create_announcement_with_threads(teacher_id, "Lecture", "Slides", ["Routing", "TCP"],
+                                                  pdf_text="Routing. " * 50, artifacts=ARTIFACTS)
+
+    after = table_counts()
+    assert after["announcements"] == before["announcements"] + 1
+    assert after["threads"] == before["threads"] + 2
+    assert after["announcement_artifacts"] == before["announcement_artifacts"] + 1
+    assert db.get_resource_versions(["announcements"])["announcements"][0] > versions["announcements"][0]
+    announcement_id = created["announcement"]["id"]
+    assert [thread["id"] for thread in db.get_threads_by_announcement(announcement_id)] == \
+        [thread["id"] for thread in created["threads"]]
+    assert db.get_announcement_artifacts(announcement_id)["cleaned_text"] == ARTIFACTS["cleaned_text"]
+
+
+def test_vote_timestamp_is_taken_after_the_write_lock(client, thread_id, student_id):
+    blocker = db.get_connection()
+    blocker.execute("BEGIN IMMEDIATE")
+    voting = threading.Thread(target=db.create_or_update_poll, args=(thread_id, student_id, "complete"))
+    voting.start()
+    time.sleep(1.5)
+    released_at = db.get_epoch_time()
+    blocker.rollback()
+    blocker.close()
+    voting.join()
+
+    conn = db.get_connection()
+    updated_at_epoch = conn.execute(
+        "SELECT updated_at_epoch FROM topic_polls WHERE thread_id = ? AND student_id = ?", (thread_id, student_id)
+    ).fetchone()[0]
+    conn.close()
+    # Stamped before the wait, the vote would be older than the lock release and could fall behind an export watermark
+    assert updated_at_epoch >= released_at
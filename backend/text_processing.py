@@ -0,0 +1,182 @@
+"""
+Text processing - Whitespace cleaning and chunking for extracted course text
+Works on spans of the input instead of word lists: cleaning runs block by
+block so peak memory stays near the size of the output, and chunking finds
+boundaries with str.rfind / precompiled patterns and slices the input once per
+chunk. Both also accept page generators so a PDF never has to be held as one
+string just to be chunked.
+"""
+
+import re
+from typing import Iterable, Iterator, List, Tuple
+
+# Characters processed per block by clean_text
+CLEAN_BLOCK_SIZE = 1 << 18
+
+# Boundary preference for chunk_text: each level also falls back to the ones after it
+BOUNDARIES = ("paragraph", "sentence", "word")
+
+_WHITESPACE = re.compile(r"\s")
+_NON_WHITESPACE = re.compile(r"\S")
+_PARAGRAPH_END = re.compile(r"\n[ \t]*\n")
+_SENTENCE_END = re.compile(r"[.!?][\"')\]]?(?=\s)")
+_WORD_SEPARATORS = (" ", "\n", "\t", "\r", "\f", "\v")
+
+
+# ========================================
+# CLEANING
+# ========================================
+
+def clean_text(text: str) -> str:
+    """
+    Collapse every run of whitespace (including newlines) to one space and strip the ends.
+    Same result as " ".join(text.split()), without materializing a list of every word.
+    """
+    parts = []
+    position = 0
+    length = len(text)
+    while position < length:
+        end = position + CLEAN_BLOCK_SIZE
+        if end < length:
+            # Extend the block to the next whitespace so no word is split across blocks
+            match = _WHITESPACE.search(text, end)
+            end = match.start() if match else length
+        part = " ".join(text[position:end].split())
+        if part:
+            parts.append(part)
+        position = end
+    return " ".join(parts)
+
+
+def clean_pages(pages: Iterable[str]) -> Iterator[str]:
+    """Clean each page of a page generator, skipping pages with no text"""
+    for page in pages:
+        cleaned = clean_text(page)
+        if cleaned:
+            yield cleaned
+
+
+# ========================================
+# CHUNKING
+# ========================================
+
+def _last_separator(text: str, start: int, end: int) -> int:
+    """Index of the last whitespace character in text[start:end], or -1"""
+    return max(text.rfind(separator, start, end) for separator in _WORD_SEPARATORS)
+
+
+def _last_match_end(pattern: re.Pattern, text: str, start: int, end: int) -> int:
+    """End of the last pattern match inside text[start:end], or -1"""
+    last = -1
+    for match in pattern.finditer(text, start, end):
+        last = match.end()
+    return last
+
+
+def _find_cut(text: str, start: int, max_length: int, boundary: str) -> int:
+    """Where the chunk beginning at start should end (exclusive)"""
+    limit = start + max_length
+    levels = BOUNDARIES[BOUNDARIES.index(boundary):]
+
+    # Paragraph and sentence ends are only used if the chunk stays at least half full
+    floor = start + max_length // 2
+    if "paragraph" in levels:
+        cut = _last_match_end(_PARAGRAPH_END, text, floor, limit)
+        if cut != -1:
+            return cut
+    if "sentence" in levels:
+        cut = _last_match_end(_SENTENCE_END, text, floor, limit)
+        if cut != -1:
+            return cut
+
+    # Word boundary: the chunk (without trailing whitespace) must be shorter than max_length
+    cut = _last_separator(text, start + 1, limit)
+    if cut != -1:
+        return cut
+
+    # A single word longer than max_length becomes a chunk of its own
+    match = _WHITESPACE.search(text, start)
+    return match.start() if match else len(text)
+
+
+def _skip_whitespace(text: str, position: int) -> int:
+    match = _NON_WHITESPACE.search(text, position)
+    return match.start() if match else len(text)
+
+
+def iter_chunk_spans(text: str, max_length: int = 4000, overlap: int = 0,
+                     boundary: str = "word") -> Iterator[Tuple[int, int]]:
+    """
+    Yield (start, end) spans of text covering it in chunks shorter than max_length
+
+    Args:
+        text: Text to split
+        max_length: Chunks are at most max_length - 1 characters, except single words longer than that
+        overlap: Characters of context repeated at the start of the next chunk (rounded to a word start)
+        boundary: 'word', 'sentence' or 'paragraph' - preferred place to end a chunk
+
+    Yields:
+        Spans with no leading or trailing whitespace
+    """
+    if boundary not in BOUNDARIES:
+        raise ValueError(f"Invalid boundary '{boundary}'. Use one of: {', '.join(BOUNDARIES)}")
+    if overlap >= max_length // 2:
+        raise ValueError("overlap must be less than half of max_length")
+
+    length = len(text)
+    start = _skip_whitespace(text, 0)
+    while start < length:
+        if length - start < max_length:
+            end = length
+        else:
+            end = _find_cut(text, start, max_length, boundary)
+        chunk_end = end
+        while chunk_end > start and text[chunk_end - 1].isspace():
+            chunk_end -= 1
+        if chunk_end > start:
+            yield start, chunk_end
+        if end >= length:
+            return
+
+        next_start = _skip_whitespace(text, end)
+        if overlap and chunk_end - start > overlap:
+            # Back up to the start of the word containing chunk_end - overlap
+            back = _last_separator(text, start, chunk_end - overlap)
+            if back != -1 and back + 1 > start:
+                next_start = min(next_start, _skip_whitespace(text, back + 1))
+        start = next_start
+
+
+def chunk_text(text: str, max_length: int = 4000, overlap: int = 0, boundary: str = "word") -> List[str]:
+    """
+    Split text into chunks if it exceeds max_length
+
+    With the defaults, chunks of cleaned text are identical to joining its words
+    greedily; see iter_chunk_spans for the options.
+    """
+    if len(text) <= max_length:
+        return [text]
+    return [text[start:end] for start, end in iter_chunk_spans(text, max_length, overlap, boundary)]
+
+
+def iter_chunks_from_pages(pages: Iterable[str], max_length: int = 4000, overlap: int = 0,
+                           boundary: str = "word", separator: str = "\n\n") -> Iterator[str]:
+    """
+    Chunk a page generator without joining all pages first
+
+    Pages are joined with separator. Only the unfinished tail of the text seen so
+    far is kept between pages, so memory stays near one page plus max_length.
+    """
+    buffer = ""
+    for page in pages:
+        buffer = f"{buffer}{separator}{page}" if buffer else page
+        spans = list(iter_chunk_spans(buffer, max_length, overlap, boundary))
+        # The last span may still grow with the next page; emit everything before it
+        for start, end in spans[:-1]:
+            yield buffer[start:end]
+        if spans:
+            # With overlap, the last span's start already includes the repeated context
+            buffer = buffer[spans[-1][0]:]
+    if buffer:
+        for start, end in iter_chunk_spans(buffer, max_length, overlap, boundary):
+            yield buffer[start:end]
@@ -0,0 +1,133 @@
+"""
+Tokenizer - Local token-count approximation and model profiles
+Ollama only reports token counts after a generation, so prompts are budgeted
+with a BPE-like estimate: text is split into words, punctuation and newlines,
+and long words cost one token per few characters (the ratio depends on the
+model family's vocabulary). Model names are parsed into family, parameter
+count and context window instead of substring-matched.
+"""
+
+import math
+import re
+from array import array
+from bisect import bisect_right
+from typing import Optional
+
+import cache
+import prompts
+
+# Pieces as most BPE pre-tokenizers see them: words (with a leading space), digits, punctuation, newlines
+_PIECES = re.compile(r" ?[A-Za-z]+| ?\d{1,3}| ?[^\sA-Za-z\d]+|\n+|\s+")
+_MODEL_SIZE = re.compile(r"(?:(\d+)x)?(\d+(?:\.\d+)?)b(?![a-z])")
+
+# Tokenized course material, reused across questions on the same announcement
+_tokenized = cache.LRUCache("tokenized_text", maxsize=64, ttl=3600)
+
+
+class ModelProfile:
+    """What prompt budgeting needs to know about a model"""
+
+    def __init__(self, name: str, family: str, params_b: Optional[float], context_tokens: int, chars_per_token: float):
+        self.name = name
+        self.family = family
+        self.params_b = params_b
+        self.context_tokens = context_tokens
+        self.chars_per_token = chars_per_token
+
+
+_profiles = {}
+
+
+def get_model_profile(model: str) -> ModelProfile:
+    """
+    Parse an Ollama model name such as 'llama3.1:8b-instruct-q4_K_M' or 'mixtral:8x7b'
+
+    Args:
+        model: Model name, optionally with registry/namespace prefix and tag
+
+    Returns:
+        ModelProfile with family (longest known prefix), parameter count in billions
+        (None if the tag has no size) and the family's context window
+    """
+    profile = _profiles.get(model)
+    if profile is not None:
+        return profile
+
+    name, _, tag = model.lower().rsplit("/", 1)[-1].partition(":")
+    family = max(
+        (known for known in prompts.MODEL_FAMILIES if known != "default" and name.startswith(known)),
+        key=len,
+        default="default"
+    )
+    context_tokens, chars_per_token = prompts.MODEL_FAMILIES[family]
+
+    params_b = None
+    match = _MODEL_SIZE.search(tag) or _MODEL_SIZE.search(name[len(family):] if family != "default" else name)
+    if match:
+        experts = int(match.group(1)) if match.group(1) else 1
+        params_b = experts * float(match.group(2))
+
+    profile = _profiles[model] = ModelProfile(model, family, params_b, context_tokens, chars_per_token)
+    return profile
+
+
+def _piece_tokens(piece: str, chars_per_token: float) -> int:
+    if piece.isascii():
+        if piece[0] == "\n" or piece.isspace():
+            return 1
+        return max(1, math.ceil(len(piece.lstrip(" ")) / chars_per_token))
+    # Non-Latin text and emoji: roughly one token per character
+    return len(piece.strip())
+
+
+def count_tokens(text: str, model: str) -> int:
+    """Approximate number of tokens text occupies for model"""
+    chars_per_token = get_model_profile(model).chars_per_token
+    return sum(_piece_tokens(piece, chars_per_token) for piece in _PIECES.findall(text))
+
+
+class TokenizedText:
+    """Text with cumulative token counts at every piece boundary, for cheap truncation"""
+
+    def __init__(self, text: str, model: str):
+        chars_per_token = get_model_profile(model).chars_per_token
+        self.text = text
+        self.ends = array("I")
+        self.cumulative = array("I")
+        total = 0
+        for match in _PIECES.finditer(text):
+            total += _piece_tokens(match.group(), chars_per_token)
+            self.ends.append(match.end())
+            self.cumulative.append(total)
+        self.tokens = total
+
+    def truncate(self, max_tokens: int) -> str:
+        """
+        Longest prefix within max_tokens, cut at a paragraph or sentence end when one
+        is close (within the last 10% of the prefix)
+        """
+        if max_tokens >= self.tokens:
+            return self.text
+        if max_tokens <= 0:
+            return ""
+
+        count = bisect_right(self.cumulative, max_tokens)
+        end = self.ends[count - 1] if count else 0
+        prefix = self.text[:end]
+        floor = int(end * 0.9)
+        for boundary in ("\n\n", ". ", "\n"):
+            cut = prefix.rfind(boundary, floor)
+            if cut != -1:
+                return prefix[:cut + 1].rstrip()
+        return prefix
+
+
+def tokenize(text: str, model: str) -> TokenizedText:
+    """TokenizedText for text, cached so the same course material is only tokenized once per model family"""
+    family = get_model_profile(model).family
+    key = (family, len(text), hash(text))
+    tokenized = _tokenized.get(key)
+    if tokenized is None or tokenized.text != text:
+        tokenized = TokenizedText(text, model)
+        _tokenized.set(key, tokenized)
+    return tokenized
@@ -0,0 +1,231 @@
+"""
+Topic candidates - Local topic candidate extraction for course PDFs (no LLM)
+Ranks two kinds of candidates: section headings / slide titles found by the
+PDF extractor, and keyphrases (runs of content words between stopwords and
+punctuation) scored by TF-IDF over chunks of the document. Topic extraction
+then asks the LLM to pick from this short list instead of reading the raw
+text, and falls back to the top candidates when Ollama is unavailable.
+"""
+
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+import artifacts
+import text_processing
+
+# Characters per chunk; chunks are the "documents" for inverse document frequency
+CANDIDATE_CHUNK_LENGTH = 3000
+
+# Longest keyphrase in words, and fewest occurrences for a keyphrase to count
+MAX_PHRASE_WORDS = 3
+MIN_PHRASE_COUNT = 2
+
+# A phrase is dropped in favour of a longer phrase containing it if the longer
+# one accounts for at least this share of its occurrences
+DOMINANCE_SHARE = 0.5
+
+# Candidates returned by extract_candidates
+CANDIDATE_LIMIT = 40
+
+STOPWORDS = artifacts.STOPWORDS | frozenset("""
+    a an and are as at be but by can for how if in is it its may not of on or so the to use used using
+    via was we why you all any new one two three first second next also e.g i.e etc slide page lecture
+    chapter figure table example examples note notes based called known shown given following different
+    various several many well like make makes need needs important provides allows covers
+""".split())
+
+# Headings that name a part of the lecture rather than a topic
+GENERIC_HEADINGS = frozenset({
+    "introduction", "outline", "agenda", "overview", "summary", "conclusion", "conclusions", "questions",
+    "references", "thank you", "thanks", "recap", "review", "contents", "table of contents",
+    "objectives", "learning objectives", "acknowledgements", "appendix", "exercises", "homework"
+})
+
+# Pieces of text a keyphrase cannot span
+_FRAGMENT_BREAK = re.compile(r"[.,;:!?()\[\]{}\"'‘’“”•–—|=<>\n]+")
+_WORD = re.compile(r"[A-Za-z][A-Za-z0-9\-+/]*")
+# "2.1 Routing", "Routing (cont.)", "Routing - Part 2", "Routing: II"
+_HEADING_NOISE = re.compile(
+    r"^\s*\d+(?:\.\d+)*[.)]?\s+"
+    r"|\s*\((?:cont(?:'d|inued)?\.?)\)\s*$"
+    r"|\s*[-:,]?\s*part\s+(?:\d+|[ivx]+)\s*$"
+    r"|\s*[-:]\s*(?:\d+|[ivx]+)\s*$",
+    re.IGNORECASE
+)
+
+
+def _is_content_word(word: str) -> bool:
+    lower = word.lower()
+    if lower in STOPWORDS:
+        return False
+    # Short words only count as acronyms (IP, TCP)
+    return len(word) >= 3 or word.isupper()
+
+
+def _phrases(text: str) -> List[tuple]:
+    """Every 1..MAX_PHRASE_WORDS gram of consecutive content words, as tuples of surface words"""
+    grams = []
+    for fragment in _FRAGMENT_BREAK.split(text):
+        run = []
+        for word in _WORD.findall(fragment) + [""]:
+            if word and _is_content_word(word):
+                run.append(word)
+                continue
+            for size in range(1, MAX_PHRASE_WORDS + 1):
+                for start in range(len(run) - size + 1):
+                    grams.append(tuple(run[start:start + size]))
+            run = []
+    return grams
+
+
+def _display(forms: Counter) -> str:
+    """Most common surface form of a phrase"""
+    return " ".join(forms.most_common(1)[0][0])
+
+
+def clean_heading(text: str) -> str:
+    """Heading without numbering and continuation markers: '2.1 Routing (cont.)' -> 'Routing'"""
+    return " ".join(_HEADING_NOISE.sub("", text).split())
+
+
+def score_keyphrases(text: str) -> List[Dict]:
+    """
+    Keyphrases of text ranked by TF-IDF over chunks
+
+    Score = occurrences * log(1 + chunks / chunks containing the phrase), with
+    longer phrases weighted up since they make better topic names. Phrases
+    mostly seen inside a longer phrase, or inside a better-scoring one, are
+    dropped.
+
+    Returns:
+        [{"phrase", "score", "count"}] best first, scores normalized to the best = 1
+    """
+    counts = Counter()
+    document_frequency = Counter()
+    forms = defaultdict(Counter)
+    chunk_count = 0
+    for start, end in text_processing.iter_chunk_spans(text, CANDIDATE_CHUNK_LENGTH, boundary="paragraph"):
+        chunk_count += 1
+        seen = set()
+        for gram in _phrases(text[start:end]):
+            key = tuple(word.lower() for word in gram)
+            counts[key] += 1
+            forms[key][gram] += 1
+            seen.add(key)
+        document_frequency.update(seen)
+
+    # A phrase mostly seen inside a longer one ("congestion" in "congestion window") is left to it
+    dominated = set()
+    for key, count in counts.items():
+        if len(key) < 2 or count < MIN_PHRASE_COUNT:
+            continue
+        for size in range(1, len(key)):
+            for start in range(len(key) - size + 1):
+                sub = key[start:start + size]
+                if count >= counts[sub] * DOMINANCE_SHARE:
+                    dominated.add(sub)
+
+    scored = []
+    for key, count in counts.items():
+        if count < MIN_PHRASE_COUNT or key in dominated:
+            continue
+        idf = math.log(1 + chunk_count / document_frequency[key])
+        scored.append((count * idf * (1 + 0.5 * (len(key) - 1)), key))
+    scored.sort(key=lambda item: (-item[0], item[1]))
+
+    # Skip phrases inside a better one ("control" once "congestion control" is in)
+    selected = []
+    for score, key in scored:
+        if len(selected) >= CANDIDATE_LIMIT:
+            break
+        padded = f" {' '.join(key)} "
+        if any(padded in other for _, _, other in selected):
+            continue
+        selected.append((score, key, padded))
+
+    best = selected[0][0] if selected else 1.0
+    return [
+        {"phrase": _display(forms[key]), "score": round(score / best, 3), "count": counts[key]}
+        for score, key, _ in selected
+    ]
+
+
+def extract_candidates(text: str, headings: Optional[List[Dict]] = None, limit: int = CANDIDATE_LIMIT) -> List[Dict]:
+    """
+    Ranked topic candidates for a document
+
+    Args:
+        text: Extracted PDF text (newlines kept, they separate phrases)
+        headings: [{"text", "page"}] from pdf_processor.extract_pdf, if available
+        limit: Number of candidates to return
+
+    Returns:
+        [{"phrase", "score", "count", "source": "heading" | "keyphrase"}] best first.
+        A heading scores log2(1 + pages it titles) plus the scores of the
+        keyphrases it contains, so a title repeated over several slides or built
+        from frequent terms ranks above a one-off keyphrase.
+    """
+    keyphrases = score_keyphrases(text)
+
+    pages = defaultdict(set)
+    heading_forms = defaultdict(Counter)
+    for heading in headings or []:
+        cleaned = clean_heading(heading["text"])
+        key = cleaned.lower()
+        if not cleaned or key in GENERIC_HEADINGS or not any(_is_content_word(word) for word in _WORD.findall(cleaned)):
+            continue
+        pages[key].add(heading.get("page"))
+        heading_forms[key][cleaned] += 1
+
+    candidates = []
+    for key, heading_pages in pages.items():
+        padded = f" {key} "
+        contained = sum(phrase["score"] for phrase in keyphrases if f" {phrase['phrase'].lower()} " in padded)
+        candidates.append({
+            "phrase": heading_forms[key].most_common(1)[0][0],
+            "score": round(math.log2(1 + len(heading_pages)) + contained, 3),
+            "count": len(heading_pages),
+            "source": "heading"
+        })
+
+    heading_keys = [f" {key} " for key in pages]
+    for phrase in keyphrases:
+        # Keyphrases that are a whole heading are already represented by it
+        if f" {phrase['phrase'].lower()} " in heading_keys:
+            continue
+        candidates.append({**phrase, "source": "keyphrase"})
+
+    candidates.sort(key=lambda candidate: -candidate["score"])
+    return candidates[:limit]
+
+
+def _title_case(phrase: str) -> str:
+    """Capitalize words except inner stopwords, leaving acronyms and mixed-case words (TCP, IPv6) alone"""
+    words = phrase.split()
+    return " ".join(
+        word.capitalize() if word.islower() and (index == 0 or word not in STOPWORDS) else word
+        for index, word in enumerate(words)
+    )
+
+
+def offline_topics(candidates: List[Dict], max_topics: int = 6, max_words: int = 6) -> List[str]:
+    """
+    Topics chosen from candidates without an LLM
+
+    Multi-word candidates of at most max_words are preferred; single words are
+    used only when there are not enough of those.
+    """
+    preferred = [c["phrase"] for c in candidates if 2 <= len(c["phrase"].split()) <= max_words]
+    single = [c["phrase"] for c in candidates if len(c["phrase"].split()) == 1]
+    topics = []
+    seen = set()
+    for phrase in preferred + single:
+        key = phrase.lower()
+        if key not in seen:
+            seen.add(key)
+            topics.append(_title_case(phrase))
+        if len(topics) >= max_topics:
+            break
+    return topics
@@ -0,0 +1,320 @@
+"""
+Tracing - Per-request ids, nested span timings and structured JSON logs
+Spans opened inside executor threads attach to the request that submitted
+the work, so an @AI answer breaks down into DB, prompt building and Ollama
+stages. Set TRACE_EXPORT_PATH to append every finished trace as one JSON line
+(written by a background thread, never on the event loop); summarize that file
+with: python tracing.py summarize traces.jsonl
+"""
+
+import argparse
+import atexit
+import contextvars
+import itertools
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# Configuration
+TRACE_EXPORT_PATH = os.environ.get("TRACE_EXPORT_PATH")
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+
+REQUEST_ID_HEADER = "x-request-id"
+
+logger = logging.getLogger("forum")
+
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+_current_span = contextvars.ContextVar("current_span", default=None)
+_export_queue = queue.SimpleQueue()
+_export_thread = None
+_export_lock = threading.Lock()
+
+
+class Span:
+    """A timed stage within a trace"""
+    __slots__ = ("span_id", "parent_id", "name", "start", "end", "attrs", "thread")
+
+    def __init__(self, span_id: int, parent_id: Optional[int], name: str, attrs: Dict):
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.start = time.perf_counter()
+        self.end = None
+        self.attrs = attrs
+        self.thread = threading.current_thread().name
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end or time.perf_counter()) - self.start) * 1000
+
+
+class Trace:
+    """All spans recorded for one request"""
+
+    def __init__(self, request_id: str, name: str):
+        self.request_id = request_id
+        self.name = name
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.spans: List[Span] = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def new_span(self, parent_id: Optional[int], name: str, attrs: Dict) -> Span:
+        with self._lock:
+            span = Span(next(self._ids), parent_id, name, attrs)
+            self.spans.append(span)
+            return span
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            spans = list(self.spans)
+        return {
+            "request_id": self.request_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": round((time.perf_counter() - self.start) * 1000, 3),
+            "spans": [
+                {
+                    "id": span.span_id,
+                    "parent_id": span.parent_id,
+                    "name": span.name,
+                    "offset_ms": round((span.start - self.start) * 1000, 3),
+                    "duration_ms": round(span.duration_ms, 3),
+                    "thread": span.thread,
+                    "attrs": span.attrs
+                }
+                for span in spans
+            ]
+        }
+
+
+# ========================================
+# SPANS
+# ========================================
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def current_request_id() -> Optional[str]:
+    trace = _current_trace.get()
+    return trace.request_id if trace else None
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """
+    Time a stage of the current request (no-op outside a request)
+
+    Usage:
+        with tracing.span("llm.generate", model=model) as s:
+            ...
+            if s: s.attrs["tokens"] = n
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+
+    parent = _current_span.get()
+    current = trace.new_span(parent.span_id if parent else None, name, attrs)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except Exception as e:
+        current.attrs["error"] = type(e).__name__
+        raise
+    finally:
+        current.end = time.perf_counter()
+        _current_span.reset(token)
+
+
+@contextmanager
+def start_trace(name: str, request_id: Optional[str] = None):
+    """Begin a trace (one per request), export it when the block exits"""
+    trace = Trace(request_id or uuid.uuid4().hex[:16], name)
+    trace_token = _current_trace.set(trace)
+    span_token = _current_span.set(None)
+    try:
+        yield trace
+    finally:
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+        export(trace)
+
+
+def export(trace: Trace):
+    """Queue a finished trace for the writer thread (if TRACE_EXPORT_PATH is configured)"""
+    global _export_thread
+    if not TRACE_EXPORT_PATH:
+        return
+    if _export_thread is None:
+        with _export_lock:
+            if _export_thread is None:
+                _export_thread = threading.Thread(target=_write_traces, name="trace-export", daemon=True)
+                _export_thread.start()
+                atexit.register(_stop_export)
+    if _export_thread.is_alive():
+        _export_queue.put(trace.to_dict())
+
+
+def _write_traces():
+    """Writer thread: append queued traces to TRACE_EXPORT_PATH, one JSON line each"""
+    try:
+        handle = open(TRACE_EXPORT_PATH, "a")
+    except OSError as e:
+        log_event("trace.export.failed", logging.WARNING, path=TRACE_EXPORT_PATH, error=str(e))
+        return
+    with handle:
+        while True:
+            batch = [_export_queue.get()]
+            # Whatever else is queued goes out in the same write
+            while not _export_queue.empty() and batch[-1] is not None:
+                batch.append(_export_queue.get())
+            lines = [json.dumps(item, default=str) + "\n" for item in batch if item is not None]
+            handle.write("".join(lines))
+            handle.flush()
+            if batch[-1] is None:
+                return
+
+
+def _stop_export(timeout: float = 5.0):
+    """Write out the traces still queued (runs at interpreter exit)"""
+    _export_queue.put(None)
+    _export_thread.join(timeout)
+
+
+# ========================================
+# STRUCTURED LOGGING
+# ========================================
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per log line, tagged with the current request id and span"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "event": record.getMessage()
+        }
+        request_id = current_request_id()
+        if request_id:
+            entry["request_id"] = request_id
+        current = _current_span.get()
+        if current:
+            entry["span"] = current.name
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging():
+    """Send the 'forum' logger to stdout as JSON lines"""
+    if logger.handlers:
+        return
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JsonFormatter())
+    logger.addHandler(handler)
+    logger.setLevel(LOG_LEVEL)
+    logger.propagate = False
+
+
+def log_event(event: str, level: int = logging.INFO, **fields):
+    """Log a structured event, e.g. log_event("message.saved", message_id=5)"""
+    logger.log(level, event, extra={"fields": fields})
+
+
+# ========================================
+# ASGI MIDDLEWARE
+# ========================================
+
+class TracingMiddleware:
+    """Starts a trace per HTTP request and returns its id in X-Request-ID"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        incoming_id = headers.get(REQUEST_ID_HEADER.encode())
+        request_id = incoming_id.decode("latin-1")[:64] if incoming_id else None
+        status = {"code": 500}
+
+        with start_trace(f"{scope['method']} {scope['path']}", request_id) as trace:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    status["code"] = message["status"]
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (REQUEST_ID_HEADER.encode(), trace.request_id.encode())
+                    ]
+                await send(message)
+
+            start = time.perf_counter()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = getattr(scope.get("route"), "path", scope["path"])
+                log_event(
+                    "request.complete",
+                    method=scope["method"],
+                    route=route,
+                    status=status["code"],
+                    duration_ms=round((time.perf_counter() - start) * 1000, 3),
+                    spans=len(trace.spans)
+                )
+
+
+# ========================================
+# CLI: SUMMARIZE EXPORTED TRACES
+# ========================================
+
+def summarize(path: str, top: int = 15):
+    """Print per-span-name statistics and the slowest individual spans from an export file"""
+    by_name = {}
+    slowest = []
+    traces = 0
+    with open(path) as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            trace = json.loads(line)
+            traces += 1
+            for item in trace["spans"]:
+                by_name.setdefault(item["name"], []).append(item["duration_ms"])
+                slowest.append((item["duration_ms"], item["name"], trace["request_id"], trace["name"]))
+
+    print(f"{traces} traces from {path}\n")
+    print(f"{'span':40} {'count':>7} {'total ms':>11} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    rows = sorted(by_name.items(), key=lambda item: sum(item[1]), reverse=True)
+    for name, durations in rows[:top]:
+        durations.sort()
+        p50 = durations[len(durations) // 2]
+        p95 = durations[max(0, int(len(durations) * 0.95) - 1)]
+        print(f"{name:40} {len(durations):7d} {sum(durations):11.1f} {p50:9.1f} {p95:9.1f} {durations[-1]:9.1f}")
+
+    print(f"\nSlowest spans:")
+    for duration, name, request_id, trace_name in sorted(slowest, reverse=True)[:top]:
+        print(f"  {duration:10.1f} ms  {name:40} {request_id}  {trace_name}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize exported request traces")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    summarize_parser = subparsers.add_parser("summarize", help="slowest spans in a TRACE_EXPORT_PATH file")
+    summarize_parser.add_argument("path")
+    summarize_parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+    summarize(args.path, args.top)
@@ -27,10 +27,37 @@ api.interceptors.response.use(
   }
 );
 
+// Conditional GET: remember each response's ETag and reuse the cached body on 304
+const etagCache = new Map();
+
+const conditionalGet = async (url, config = {}) => {
+  const key = api.getUri({ url, params: config.params });
+  const cached = etagCache.get(key);
+  const headers = { ...(config.headers || {}) };
+  if (cached) {
+    headers['If-None-Match'] = cached.etag;
+  }
+
+  const response = await api.get(url, {
+    ...config,
+    headers,
+    validateStatus: (status) => (status >= 200 && status < 300) || status === 304,
+  });
+
+  if (response.status === 304 && cached) {
+    return cached.data;
+  }
+
+  const etag = response.headers.etag;
+  if (etag) {
+    etagCache.set(key, { etag, data: response.data });
+  }
+  return response.data;
+};
+
 // Thread & Discussion APIs
 export const getThreadMessages = async (threadId) => {
-  const response = await api.get(`/api/threads/${threadId}/messages`);
-  return response.data;
+  return conditionalGet(`/api/threads/${threadId}/messages`);
 };
 
 export const askQuestion = async (threadId, question, userId) => {
@@ -85,8 +112,7 @@ export const createAnnouncementWithPDF = async (teacherId, title, content, file)
 };
 
 export const getAllAnnouncements = async () => {
-  const response = await api.get('/api/announcements');
-  return response.data;
+  return conditionalGet('/api/announcements');
 };
 
 export const getAnnouncement = async (announcementId) => {
@@ -105,8 +131,7 @@ export const voteOnTopic = async (threadId, studentId, understandingLevel) => {
 
 export const getPollResults = async (threadId, studentId = null) => {
   const params = studentId ? { student_id: studentId } : {};
-  const response = await api.get(`/api/topics/${threadId}/poll`, { params });
-  return response.data;
+  return conditionalGet(`/api/topics/${threadId}/poll`, { params });
 };
 
 export const getTopicHelpers = async (threadId) => {
@@ -121,8 +146,7 @@ export const getStudentsByLevel = async (threadId, understandingLevel) => {
 
 // Analytics APIs
 export const getAnalytics = async () => {
-  const response = await api.get('/api/analytics');
-  return response.data;
+  return conditionalGet('/api/analytics');
 };
 
 export default api;